@@ -6,8 +6,14 @@
 import logging
 
 from app.api import api_bp
-from app.utils.db import close_db, init_db
-from app.utils.float32json import Float32FlaskEncoder
+from app.commands import register_commands
+from app.services.media_queue import init_media_queue
+from app.services.retention import init_janitor
+from app.utils.db import close_db, init_db, init_storage
+from app.utils.json_provider import AppJSONProvider
+from app.utils.metrics import init_metrics
+from app.utils.profiler import init_profiling
+from app.utils.tracing import init_tracing
 from config import config
 from flask import Flask, jsonify
 from flask_cors import CORS
@@ -26,8 +32,8 @@ def create_app(config_name="default"):
     # 创建应用
     app = Flask(__name__)
 
-    # 设置自定义JSON编码器
-    app.json_encoder = Float32FlaskEncoder
+    # 设置JSON序列化（支持numpy类型，安装了orjson时使用orjson）
+    app.json = AppJSONProvider(app)
 
     # 加载配置
     app.config.from_object(config[config_name])
@@ -41,9 +47,17 @@ def create_app(config_name="default"):
     # 设置CORS
     CORS(app)
 
+    # 记录请求耗时和并发数
+    init_metrics(app)
+    # 链路追踪（按配置启用）
+    init_tracing(app)
+
     # 注册蓝图
     app.register_blueprint(api_bp)
 
+    # 创建存储后端
+    init_storage(app)
+
     # 注册数据库关闭函数
     app.teardown_appcontext(close_db)
 
@@ -51,6 +65,18 @@ def create_app(config_name="default"):
     with app.app_context():
         init_db()
 
+    # 媒体分析队列（按配置启用）
+    init_media_queue(app)
+
+    # 注册命令行命令
+    register_commands(app)
+
+    # 后台定期清理遗留的临时媒体文件
+    init_janitor(app)
+
+    # 领取其他工作进程提交的采样剖析任务
+    init_profiling(app)
+
     # 添加错误处理器
     @app.errorhandler(404)
     def not_found(e):
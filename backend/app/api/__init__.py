@@ -2,9 +2,16 @@
 API蓝图模块
 """
 
-from app.api import admin, analysis, auth, health, interview, position
+from app.api import (admin, analytics, auth, bulk, health, interview,
+                     metrics, position, profiling, search)
+from app.utils.lazy import LazyView
 from flask import Blueprint
 
+try:
+    from flask_sock import Sock
+except ImportError:  # flask-sock 为可选依赖，未安装时不提供实时分析接口
+    Sock = None
+
 # 创建API蓝图
 api_bp = Blueprint('api', __name__, url_prefix='/')
 
@@ -14,6 +21,9 @@ api_bp = Blueprint('api', __name__, url_prefix='/')
 api_bp.add_url_rule('/health', view_func=health.health_check)
 api_bp.add_url_rule('/', view_func=health.health_check)
 
+# 注册监控指标路由
+api_bp.add_url_rule('/metrics', view_func=metrics.metrics)
+
 # 注册用户认证相关路由
 api_bp.add_url_rule(
     '/auth/register', view_func=auth.register, methods=['POST'])
@@ -40,7 +50,24 @@ api_bp.add_url_rule('/interview_presets/<int:preset_id>',
 
 # 注册分析相关路由
 api_bp.add_url_rule('/multimodal_analysis',
-                    view_func=analysis.multimodal_analysis, methods=['POST'])
+                    view_func=LazyView('app.api.analysis.multimodal_analysis'),
+                    methods=['POST'])
+api_bp.add_url_rule('/multimodal_analysis/jobs/<job_id>',
+                    view_func=LazyView('app.api.analysis.media_job_status'))
+api_bp.add_url_rule('/multimodal_analysis/uploads',
+                    view_func=LazyView('app.api.analysis.create_upload'),
+                    methods=['POST'])
+api_bp.add_url_rule('/multimodal_analysis/uploads/<upload_id>',
+                    view_func=LazyView('app.api.analysis.get_upload'))
+api_bp.add_url_rule('/multimodal_analysis/uploads/<upload_id>',
+                    view_func=LazyView('app.api.analysis.append_upload'),
+                    methods=['PATCH'])
+api_bp.add_url_rule('/multimodal_analysis/uploads/<upload_id>/complete',
+                    view_func=LazyView('app.api.analysis.complete_upload'),
+                    methods=['POST'])
+if Sock is not None:
+    Sock().route('/live_analysis', bp=api_bp)(
+        LazyView('app.api.analysis.live_analysis'))
 
 # 注册职位类型相关路由
 api_bp.add_url_rule('/position_types', view_func=position.get_position_types)
@@ -52,7 +79,18 @@ api_bp.add_url_rule('/admin/sessions/<session_id>',
 api_bp.add_url_rule('/admin/sessions/<session_id>',
                     view_func=admin.delete_session, methods=['DELETE'])
 
-# 注册管理员相关路由 - 职位类型管理
+# 注册管理员相关路由 - 批量操作
+api_bp.add_url_rule('/admin/bulk/sessions/delete',
+                    view_func=bulk.bulk_delete_sessions, methods=['POST'])
+api_bp.add_url_rule('/admin/bulk/sessions/rescore',
+                    view_func=bulk.bulk_rescore_sessions, methods=['POST'])
+api_bp.add_url_rule('/admin/bulk/sessions/export',
+                    view_func=bulk.bulk_export_sessions, methods=['POST'])
+api_bp.add_url_rule('/admin/bulk/users/deactivate',
+                    view_func=bulk.bulk_deactivate_users, methods=['POST'])
+api_bp.add_url_rule('/admin/bulk/users/delete',
+                    view_func=bulk.bulk_delete_users, methods=['POST'])
+
 api_bp.add_url_rule('/admin/position_types',
                     view_func=admin.get_admin_position_types)
 api_bp.add_url_rule('/admin/position_types',
@@ -81,3 +119,18 @@ api_bp.add_url_rule('/admin/users/<int:user_id>/reset-password',
 api_bp.add_url_rule('/admin/presets', view_func=admin.create_preset, methods=['POST'])
 api_bp.add_url_rule('/admin/presets/<int:preset_id>', view_func=admin.update_preset, methods=['PUT'])
 api_bp.add_url_rule('/admin/presets/<int:preset_id>', view_func=admin.delete_preset, methods=['DELETE'])
+
+# 注册管理员相关路由 - 数据分析
+api_bp.add_url_rule('/admin/analytics/daily', view_func=analytics.get_daily_analytics)
+api_bp.add_url_rule('/admin/analytics/summary', view_func=analytics.get_analytics_summary)
+
+# 注册管理员相关路由 - 全文搜索
+api_bp.add_url_rule('/admin/search', view_func=search.search_questions)
+
+# 注册管理员相关路由 - 性能剖析
+api_bp.add_url_rule('/admin/profiling',
+                    view_func=profiling.list_profiling_workers)
+api_bp.add_url_rule('/admin/profiling/sample',
+                    view_func=profiling.start_sampling, methods=['POST'])
+api_bp.add_url_rule('/admin/profiling/profiles/<profile_id>',
+                    view_func=profiling.download_profile)
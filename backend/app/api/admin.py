@@ -11,6 +11,7 @@ from app.models.interview import (InterviewPreset, InterviewQuestion,
                                   InterviewSession, MultimodalAnalysis)
 from app.models.position import PositionType
 from app.models.user import User
+from app.utils.json_provider import stream_json_list
 from flask import jsonify, request
 
 # 配置日志
@@ -26,14 +27,12 @@ def get_all_sessions():
         offset = request.args.get('offset', default=0, type=int)
         user_id = request.args.get('userId', default=None, type=int)
 
-        sessions = InterviewSession.get_all(
+        # 逐条序列化输出，不在内存中构建完整列表
+        sessions = InterviewSession.iter_all(
             limit=limit, offset=offset, user_filter=user_id)
-        return jsonify({
-            "sessions": sessions,
-            "total": len(sessions),
-            "limit": limit,
-            "offset": offset
-        })
+        return stream_json_list(
+            "sessions", sessions, count_key="total", limit=limit, offset=offset
+        )
     except Exception as e:
         logger.exception(f"获取会话列表失败: {str(e)}")
         return jsonify({"error": f"获取会话列表失败: {str(e)}"}), 500
@@ -226,8 +225,8 @@ def delete_position_type(position_id):
 def get_all_users():
     """获取所有用户列表"""
     try:
-        users = User.get_all_users()
-        return jsonify({"users": users})
+        users = User.iter_all_users()
+        return stream_json_list("users", users)
     except Exception as e:
         logger.exception(f"获取用户列表失败: {str(e)}")
         return jsonify({"error": f"获取用户列表失败: {str(e)}"}), 500
@@ -2,314 +2,408 @@
 多模态分析API模块
 """
 
+import io
+import json
 import logging
 import os
 import uuid
 
-import cv2
-import ffmpeg
-import numpy as np
-from app.api.auth import token_required
-from app.models.interview import MultimodalAnalysis
-from app.services.audio import extract_and_evaluate_audio
+from app.api.auth import authenticate, token_required
+from app.models.upload import FINALIZED, UPLOADING, VideoUpload
+from app.services.media_cache import hash_file, link_cached, save_hashed
+from app.services.media_queue import DONE, FAILED, media_queue
+from app.services.upload import (ChunkTooLarge, analyze_upload, append_chunk,
+                                 create_file, discard_upload, schedule_advance)
+from app.utils.metrics import MEDIA_REJECTED, StageTimer
 from flask import current_app, jsonify, request
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 命中媒体分析缓存时的响应
+_CACHED_RESULT = {"msg": "分析完成", "cached": True}
+
 
 @token_required
 def multimodal_analysis():
     """
     多模态分析接口
     接收视频文件和会话ID，分析视频中的面部表情、眼神接触、肢体语言等
+
+    启用媒体分析队列时视频由独立的媒体工作进程分析，本接口只负责接收上传和等待结果；
+    队列积压过多时返回 429，没有可用的媒体工作进程时返回 503，均带有 Retry-After。
+    同一段视频（内容哈希相同）已经分析过时直接复用缓存的结果
     """
+    queue = media_queue()
+    user_id = request.user.get('user_id')
+
+    # 在读取上传内容之前做准入检查，被拒绝的请求不必落盘
+    if queue is not None:
+        rejection = queue.admit(user_id)
+        if rejection is not None:
+            return _rejected(rejection)
+
     if 'video' not in request.files:
         return jsonify({"error": "没有提供视频文件"}), 400
 
     try:
         video_file = request.files['video']
         session_id = request.form.get('session_id')
+        stages = StageTimer('video')
 
         # 创建临时文件夹保存视频（如果不存在）
         temp_dir = os.path.join(os.getcwd(), 'temp', 'videos')
         os.makedirs(temp_dir, exist_ok=True)
 
-        # 生成唯一文件名并保存视频
+        # 生成唯一文件名，保存视频的同时计算内容哈希
         filename = f"{uuid.uuid4()}.webm"
         video_path = os.path.join(temp_dir, filename)
-        video_file.save(video_path)
-
-        # 验证视频文件完整性
-        try:
-            # 使用 ffmpeg 探测视频文件
-            probe = ffmpeg.probe(video_path, v='error')
-            if not probe or 'streams' not in probe or not probe['streams']:
-                logger.warning(f"视频文件 {video_path} 无效或不完整")
-                return jsonify({"error": "视频文件无效或不完整"}), 400
-        except ffmpeg.Error as e:
-            logger.error(
-                f"视频文件验证失败: {e.stderr.decode() if hasattr(e, 'stderr') else str(e)}"
-            )
-            return jsonify({"error": "无法处理视频文件，格式可能不受支持或文件已损坏"}), 400
-
-        # 使用OpenCV分析视频
-        cap = cv2.VideoCapture(video_path)
-
-        # 检查视频是否成功打开
-        if not cap.isOpened():
-            logger.error(f"OpenCV无法打开视频文件: {video_path}")
-            return jsonify({"error": "无法打开视频文件进行分析"}), 400
-
-        # 加载人脸检测器和面部特征检测器
-        face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        )
-        eye_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_eye.xml'
-        )
-
-        # 分析指标初始化
-        frame_count = 0
-        face_detected_frames = 0
-        eye_contact_frames = 0
-        facial_expression_variance = []
-
-        # 肢体语言分析指标
-        face_positions = []  # 记录人脸位置
-        head_poses = []      # 记录头部姿势
-        frame_diffs = []     # 记录帧间差异
-        prev_frame = None    # 上一帧
-        upper_body_regions = []  # 上半身区域
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            # 转换为灰度图像
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-            # 帧间差异计算（用于评估动作频率）
-            if prev_frame is not None:
-                frame_diff = cv2.absdiff(prev_frame, gray)
-                frame_diffs.append(np.mean(frame_diff))
-            prev_frame = gray.copy()
-
-            # 人脸检测
-            faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-            if len(faces) > 0:
-                face_detected_frames += 1
-
-                for (x, y, w, h) in faces:
-                    # 记录人脸位置（中心点）
-                    face_center = (x + w//2, y + h//2)
-                    face_positions.append(face_center)
-
-                    # 截取脸部区域
-                    roi_gray = gray[y:y+h, x:x+w]
-
-                    # 计算头部姿势（简化版，通过脸部矩形的宽高比来估计）
-                    head_pose = w / h if h > 0 else 1.0
-                    head_poses.append(head_pose)
-
-                    # 估计上半身区域（面部下方区域）
-                    upper_body_y = y + h
-                    upper_body_h = int(h * 1.5)  # 假设上半身高度是脸部高度的1.5倍
-                    # 确保不超出图像边界
-                    if upper_body_y + upper_body_h < frame.shape[0]:
-                        upper_body = gray[upper_body_y:upper_body_y +
-                                          upper_body_h, x-w//2:x+w+w//2]
-                        upper_body_regions.append(
-                            np.std(upper_body))  # 上半身区域的标准差作为稳定性指标
-
-                    # 眼睛检测
-                    eyes = eye_cascade.detectMultiScale(roi_gray)
-                    if len(eyes) >= 2:  # 检测到双眼
-                        eye_contact_frames += 1
-
-                    # 计算面部表情变化（使用像素值标准差作为简单指标）
-                    face_variance = np.std(roi_gray)
-                    facial_expression_variance.append(face_variance)
-
-            # 每100帧检查一次，避免处理过大的视频
-            frame_count += 1
-            if frame_count > 300:
-                break
-
-        cap.release()
-
-        # 如果没有成功处理任何帧，返回默认值
-        if frame_count == 0:
-            logger.warning(f"无法从视频中提取任何有效帧: {video_path}")
-
-            # 清理临时文件
-            if not current_app.config.get("DEBUG"):
-                try:
-                    os.remove(video_path)
-                except:
-                    logger.warning(f"无法删除临时视频文件: {video_path}")
-
-            return jsonify({"error": "视频中没有检测到有效的面部或眼睛"}), 400
-
-        logger.info(
-            "视频分析完成: "
-            f"frame_count: {frame_count}, "
-            f"face_detected_frames: {face_detected_frames}, "
-            f"eye_contact_frames: {eye_contact_frames}"
-        )
-
-        # 计算分析指标
-        eye_contact_rate = eye_contact_frames / \
-            face_detected_frames if face_detected_frames > 0 else 0
-        expression_variability = np.mean(
-            facial_expression_variance
-        ) if facial_expression_variance else 0        # 计算评分（简化版）
-        eye_contact_score = min(10, eye_contact_rate * 10)
-        facial_expressions_score = min(
-            10, (expression_variability / 50) * 10
-        )  # 假设50是较好的变化值
-
-        # 计算肢体语言得分
-        body_language_score = 7.0  # 默认初始值
-        body_language_details = {}
-
-        # 1. 姿态稳定性评分（通过人脸位置的稳定性来评估）
-        if len(face_positions) > 1:
-            # 计算人脸位置的标准差（x和y方向）
-            face_pos_x = [pos[0] for pos in face_positions]
-            face_pos_y = [pos[1] for pos in face_positions]
-            face_stability_x = np.std(face_pos_x)
-            face_stability_y = np.std(face_pos_y)
-
-            # 归一化稳定性得分（标准差越小越稳定，得分越高）
-            # 理想的轻微移动范围在10-30像素之间
-            stability_score_x = 10 - \
-                min(10, max(0, (face_stability_x - 10) / 5))
-            stability_score_y = 10 - \
-                min(10, max(0, (face_stability_y - 10) / 5))
-            stability_score = (stability_score_x + stability_score_y) / 2
-            body_language_details['stability'] = round(stability_score, 1)
-        else:
-            body_language_details['stability'] = 5.0  # 默认中等值
-
-        # 2. 头部姿势评分
-        if head_poses:
-            # 头部姿势的平均值和变异性
-            head_pose_mean = np.mean(head_poses)
-            head_pose_std = np.std(head_poses)
-
-            # 头部姿势分数（理想的宽高比接近1.0，表示正面朝向）
-            head_pose_score = 10 - min(10, abs(head_pose_mean - 1.0) * 10)
-
-            # 头部姿势变化（适度变化是好的，但过度变化不好）
-            head_movement_score = 10 - \
-                min(10, max(0, (head_pose_std - 0.05) * 20))
-
-            head_score = (head_pose_score + head_movement_score) / 2
-            body_language_details['headPose'] = round(head_score, 1)
-        else:
-            body_language_details['headPose'] = 5.0  # 默认中等值
-
-        # 3. 上半身稳定性
-        if upper_body_regions:
-            # 上半身区域的变异性（适度的变化是好的，表示自然的手势）
-            upper_body_std = np.mean(upper_body_regions)
-
-            # 理想的上半身变化在10-30之间
-            upper_body_score = 10 if 10 <= upper_body_std <= 30 else 10 - \
-                min(10, abs(upper_body_std - 20) / 3)
-            body_language_details['upperBody'] = round(upper_body_score, 1)
-        else:
-            body_language_details['upperBody'] = 5.0  # 默认中等值
-
-        # 4. 动作频率评分
-        if frame_diffs:
-            # 计算动作频率的均值
-            motion_mean = np.mean(frame_diffs)
-
-            # 理想的动作变化在5-15之间（太少表示僵硬，太多表示不稳定）
-            motion_score = 10 if 5 <= motion_mean <= 15 else 10 - \
-                min(10, abs(motion_mean - 10) / 2)
-            body_language_details['motion'] = round(motion_score, 1)
-        else:
-            body_language_details['motion'] = 5.0  # 默认中等值
-
-        # 综合肢体语言得分（各部分权重可以调整）
-        if face_detected_frames > 0:
-            body_language_score = (
-                body_language_details['stability'] * 0.3 +
-                body_language_details['headPose'] * 0.3 +
-                body_language_details['upperBody'] * 0.2 +
-                body_language_details['motion'] * 0.2
-            )
-        # 否则保持默认值
-
-        # 记录详细评分到日志
-        logger.info(f"肢体语言详细评分: {body_language_details}")
-
-        # 自信度评分综合考虑眼神接触和肢体语言
-        confidence_score = 0.5 * eye_contact_score + 0.3 * \
-            body_language_score + 0.2 * facial_expressions_score
-
-        # 生成建议
-        recommendations = []
-        if eye_contact_score < 7:
-            recommendations.append("增加与面试官的眼神接触")
-        if facial_expressions_score < 6:
-            recommendations.append("尝试展示更多自然的面部表情")
-
-        # 根据肢体语言的各个方面提供具体建议
-        if 'stability' in body_language_details:
-            if body_language_details['stability'] < 6:
-                recommendations.append("面试时保持身体稳定，减少不必要的晃动")
-
-        if 'headPose' in body_language_details:
-            if body_language_details['headPose'] < 6:
-                recommendations.append("保持头部正面朝向面试官，适当点头示意")
-
-        if 'upperBody' in body_language_details:
-            if body_language_details['upperBody'] < 6:
-                recommendations.append("注意上半身姿态，保持挺胸自然的坐姿")
-
-        if 'motion' in body_language_details:
-            if body_language_details['motion'] < 5:
-                recommendations.append("适当增加手势动作，避免过于僵硬")
-            elif body_language_details['motion'] > 8:
-                recommendations.append("减少过度频繁的动作，保持沉稳大方")        # 最终分析结果
-
-        analysis = {
-            "eyeContact": round(eye_contact_score, 1),  # 眼神接触评分(1-10)
-            "facialExpressions": round(facial_expressions_score, 1),  # 面部表情评分
-            "bodyLanguage": round(body_language_score, 1),  # 肢体语言评分
-            "confidence": round(confidence_score, 1),  # 自信程度
-            "recommendations": "、".join(recommendations) if recommendations else "保持良好的眼神接触和面部表情。"
-        }
-
-        # 处理同一视频的音频分析
-        audio_analysis = None
-
-        try:
-            # 从视频文件提取音频
-            audio_analysis = extract_and_evaluate_audio(video_path)
-        except Exception as audio_error:
-            # 音频分析失败不影响视频分析结果的返回
-            logger.warning(f"从视频提取并分析音频失败: {str(audio_error)}")
-
-        # 清理临时文件
-        if not current_app.config.get("DEBUG"):
-            try:
-                os.remove(video_path)
-            except:
-                logger.warning(f"无法删除临时视频文件: {video_path}")
-
-        # 保存分析结果
-        MultimodalAnalysis.create_or_update(
-            session_id, analysis, audio_analysis
-        )
-
-        return jsonify({"msg": "分析完成"})
+        content_hash = save_hashed(video_file.stream, video_path)
+        stages.mark('save')
 
+        if link_cached(content_hash, session_id):
+            os.remove(video_path)
+            return jsonify(_CACHED_RESULT), 200
     except Exception as e:
-        logger.exception(f"视频分析失败: {str(e)}")
+        logger.exception(f"保存视频失败: {str(e)}")
         return jsonify({"error": f"视频分析失败: {str(e)}"}), 500
+
+    if queue is None:
+        # 只有在本进程中分析时才加载 OpenCV、librosa 等依赖
+        from app.services.video import analyze_video
+
+        body, status = analyze_video(video_path, session_id, stages,
+                                     content_hash=content_hash)
+        return jsonify(body), status
+
+    job_id, rejection = queue.enqueue(
+        session_id, user_id, video_path, content_hash=content_hash)
+    if rejection is not None:
+        os.remove(video_path)
+        return _rejected(rejection)
+
+    job = queue.wait(job_id, current_app.config['MEDIA_JOB_TIMEOUT'])
+    stages.mark('queue')
+    return _job_response(job)
+
+
+@token_required
+def media_job_status(job_id):
+    """查询排队分析的任务状态，完成后返回与分析接口相同的结果"""
+    queue = media_queue()
+    if queue is None:
+        return jsonify({"error": "未启用媒体分析队列"}), 404
+
+    job = queue.get(job_id)
+    if job is None or (job['user_id'] != request.user.get('user_id')
+                       and not request.user.get('is_admin')):
+        return jsonify({"error": "分析任务不存在"}), 404
+    return _job_response(job)
+
+
+@token_required
+def create_upload():
+    """
+    创建视频分片上传
+
+    请求体为 JSON：session_id 和视频总字节数 size（可选，提供时预先分配磁盘空间）。
+    之后按顺序用 PATCH 追加分片（请求头 Upload-Offset 为分片起始位置），
+    连接中断后用 GET 查询已接收的字节数继续上传，全部上传后调用 complete 获取分析结果
+    """
+    data = request.get_json(silent=True) or {}
+    session_id = data.get('session_id')
+    size = data.get('size')
+    max_bytes = current_app.config['UPLOAD_MAX_BYTES']
+
+    if size is not None and (not isinstance(size, int) or size <= 0):
+        return jsonify({"error": "size 必须是正整数"}), 400
+    if size is not None and size > max_bytes:
+        return jsonify({"error": f"视频不能超过 {max_bytes} 字节"}), 413
+
+    queue = media_queue()
+    user_id = request.user.get('user_id')
+    if queue is not None:
+        rejection = queue.admit(user_id)
+        if rejection is not None:
+            return _rejected(rejection)
+
+    try:
+        path = create_file(size)
+        upload_id = VideoUpload.create(user_id, session_id, path, size)
+    except Exception as e:
+        logger.exception(f"创建上传失败: {str(e)}")
+        return jsonify({"error": f"创建上传失败: {str(e)}"}), 500
+
+    return jsonify({
+        "uploadId": upload_id,
+        "offset": 0,
+        "chunkSize": current_app.config['UPLOAD_CHUNK_MAX_BYTES']
+    }), 201
+
+
+@token_required
+def get_upload(upload_id):
+    """查询分片上传的进度，客户端从返回的 offset 处继续上传"""
+    upload = _own_upload(upload_id)
+    if upload is None:
+        return jsonify({"error": "上传不存在或已过期"}), 404
+    return _upload_response(upload)
+
+
+@token_required
+def append_upload(upload_id):
+    """追加一个分片，请求体为分片内容，请求头 Upload-Offset 为分片起始位置"""
+    upload = _own_upload(upload_id)
+    if upload is None:
+        return jsonify({"error": "上传不存在或已过期"}), 404
+    if upload['status'] != UPLOADING:
+        return jsonify({"error": "上传已完成"}), 409
+
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+    except ValueError:
+        return jsonify({"error": "缺少 Upload-Offset 请求头"}), 400
+    if offset != upload['received']:
+        # 上一个分片的响应可能丢失了，客户端按返回的 offset 重新发送
+        return _upload_response(upload, 409)
+
+    upload, error = _append(upload, offset, request.stream)
+    if error is not None:
+        body, status = error
+        if status == 409:
+            return _upload_response(upload, 409)
+        return jsonify(body), status
+    return _upload_response(upload)
+
+
+@token_required
+def complete_upload(upload_id):
+    """完成分片上传并返回分析结果，结果与 multimodal_analysis 接口相同"""
+    upload = _own_upload(upload_id)
+    if upload is None:
+        return jsonify({"error": "上传不存在或已过期"}), 404
+    if upload['received'] == 0 or (upload['total_size'] is not None
+                                   and upload['received'] != upload['total_size']):
+        return _upload_response(upload, 409)
+    body, status = _finalize(upload)
+    response = jsonify(body)
+    if status in (429, 503):
+        response.headers['Retry-After'] = str(body['retryAfter'])
+    return response, status
+
+
+def live_analysis(ws):
+    """
+    实时分析接口（WebSocket）
+    面试过程中客户端把 MediaRecorder 产生的分片实时发送过来，服务端边接收边进行逐帧采样
+    和已完整接收的音频片段的语音识别，面试结束后只需处理最后一小段
+
+    1. 发送 {"type": "start", "token": 令牌, "session_id": 会话ID}，断线重连时带上 upload_id 继续，
+       返回 {"type": "ready", "uploadId": 上传ID, "offset": 已接收的字节数}
+    2. 以二进制消息依次发送分片，每个分片返回 {"type": "progress", ...}（已接收的字节数和增量分析进度）
+    3. 发送 {"type": "end"}，返回 {"type": "result", "status": HTTP状态码, "data": 分析结果}
+
+    出错时返回 {"type": "error", "status": HTTP状态码, "error": 错误信息} 并关闭连接
+    """
+    timeout = current_app.config['LIVE_IDLE_TIMEOUT']
+
+    start = _ws_command(ws.receive(timeout=timeout))
+    if start.get('type') != 'start':
+        return _ws_error(ws, {"error": "第一条消息必须是 start"}, 400)
+
+    # 浏览器的 WebSocket 不能设置请求头，令牌放在第一条消息中
+    user, error = authenticate(start.get('token') or '')
+    if error is not None:
+        return _ws_error(ws, *error)
+    request.user = user
+
+    upload, error = _open_live_upload(start)
+    if error is not None:
+        return _ws_error(ws, *error)
+    ws.send(current_app.json.dumps({"type": "ready", "uploadId": upload['upload_id'],
+                        "offset": upload['received']}))
+
+    while True:
+        message = ws.receive(timeout=timeout)
+        if message is None:
+            return _ws_error(ws, {"error": "等待分片超时"}, 408)
+
+        if isinstance(message, bytes):
+            upload, error = _append(upload, upload['received'], io.BytesIO(message))
+            if error is not None:
+                return _ws_error(ws, *error)
+            filler_counts = upload['filler_counts']
+            ws.send(current_app.json.dumps({
+                "type": "progress",
+                "offset": upload['received'],
+                "framesComplete": upload['frames'] is not None,
+                "segments": len(filler_counts),
+                "fillerWordsCount": sum(filler_counts.values())
+            }))
+            continue
+
+        if _ws_command(message).get('type') != 'end':
+            return _ws_error(ws, {"error": "不支持的消息类型"}, 400)
+        if upload['received'] == 0:
+            return _ws_error(ws, {"error": "没有接收到视频数据"}, 400)
+
+        body, status = _finalize(upload)
+        ws.send(current_app.json.dumps({"type": "result", "status": status, "data": body}))
+        return
+
+
+def _open_live_upload(start):
+    """创建实时分析使用的上传，或继续断线前的上传"""
+    upload_id = start.get('upload_id')
+    if upload_id:
+        upload = _own_upload(upload_id)
+        if upload is None:
+            return None, ({"error": "上传不存在或已过期"}, 404)
+        if upload['status'] != UPLOADING:
+            return None, ({"error": "上传已完成"}, 409)
+        return upload, None
+
+    user_id = request.user.get('user_id')
+    queue = media_queue()
+    if queue is not None:
+        rejection = queue.admit(user_id)
+        if rejection is not None:
+            return None, _rejection(rejection)
+
+    try:
+        path = create_file()
+        upload_id = VideoUpload.create(user_id, start.get('session_id'), path)
+    except Exception as e:
+        logger.exception(f"创建上传失败: {str(e)}")
+        return None, ({"error": f"创建上传失败: {str(e)}"}, 500)
+    return VideoUpload.get(upload_id), None
+
+
+def _ws_command(message):
+    """解析 WebSocket 文本消息，无法解析时返回空字典"""
+    if not isinstance(message, str):
+        return {}
+    try:
+        command = json.loads(message)
+    except ValueError:
+        return {}
+    return command if isinstance(command, dict) else {}
+
+
+def _ws_error(ws, body, status):
+    ws.send(current_app.json.dumps({"type": "error", "status": status, **body}))
+
+
+def _append(upload, offset, stream):
+    """
+    写入一个分片并在后台推进增量分析
+
+    Returns:
+        tuple: (最新的上传记录, 错误)，错误为 (错误数据, HTTP状态码)；
+               offset 与已接收的字节数不一致时返回 409 和最新的上传记录
+    """
+    max_bytes = min(current_app.config['UPLOAD_CHUNK_MAX_BYTES'],
+                    current_app.config['UPLOAD_MAX_BYTES'] - offset)
+    try:
+        ok, _ = append_chunk(upload, offset, stream, max_bytes)
+    except ChunkTooLarge:
+        return None, ({"error": "分片过大或超出视频总大小"}, 413)
+    except FileNotFoundError:
+        # 长时间未完成的上传文件已被清理
+        VideoUpload.delete(upload['upload_id'])
+        return None, ({"error": "上传已过期，请重新上传"}, 410)
+    except Exception as e:
+        logger.exception(f"写入分片失败: {str(e)}")
+        return None, ({"error": f"写入分片失败: {str(e)}"}, 500)
+
+    current = VideoUpload.get(upload['upload_id'])
+    if current is None:
+        return None, ({"error": "上传不存在或已过期"}, 404)
+    if not ok:
+        return current, ({"error": "分片位置与已接收的字节数不一致"}, 409)
+
+    try:
+        schedule_advance(current_app._get_current_object(), current)
+    except Exception:
+        # 增量分析只是提前处理，失败时完成上传后仍会完整分析
+        logger.exception(f"上传 {upload['upload_id']} 增量分析调度失败")
+    return current, None
+
+
+def _finalize(upload):
+    """
+    完成上传并分析，启用媒体分析队列时交给媒体工作进程并等待结果
+
+    Returns:
+        tuple: (响应数据, HTTP状态码)
+    """
+    upload_id = upload['upload_id']
+    if not VideoUpload.set_status(upload_id, FINALIZED, UPLOADING):
+        return {"error": "上传已完成"}, 409
+
+    # 分片可能来自多次连接，完成上传后再对整个文件计算内容哈希
+    try:
+        content_hash = hash_file(upload['path'])
+    except FileNotFoundError:
+        VideoUpload.delete(upload_id)
+        return {"error": "上传已过期，请重新上传"}, 410
+    if link_cached(content_hash, upload['session_id']):
+        discard_upload(upload)
+        return _CACHED_RESULT, 200
+
+    queue = media_queue()
+    if queue is None:
+        return analyze_upload(upload_id, content_hash)
+
+    job_id, rejection = queue.enqueue(
+        upload['session_id'], upload['user_id'], upload['path'], upload_id, content_hash)
+    if rejection is not None:
+        # 已接收的数据保留，客户端稍后可以再次完成上传
+        VideoUpload.set_status(upload_id, UPLOADING, FINALIZED)
+        return _rejection(rejection)
+
+    return _job_result(queue.wait(job_id, current_app.config['MEDIA_JOB_TIMEOUT']))
+
+
+def _own_upload(upload_id):
+    upload = VideoUpload.get(upload_id)
+    if upload is None or upload['user_id'] != request.user.get('user_id'):
+        return None
+    return upload
+
+
+def _upload_response(upload, status=200):
+    response = jsonify({
+        "uploadId": upload['upload_id'],
+        "offset": upload['received'],
+        "size": upload['total_size'],
+        "status": upload['status']
+    })
+    response.headers['Upload-Offset'] = str(upload['received'])
+    return response, status
+
+
+def _rejection(rejection):
+    status, message, retry_after = rejection
+    MEDIA_REJECTED.labels(str(status)).inc()
+    return {"error": message, "retryAfter": retry_after}, status
+
+
+def _rejected(rejection):
+    body, status = _rejection(rejection)
+    response = jsonify(body)
+    response.headers['Retry-After'] = str(body['retryAfter'])
+    return response, status
+
+
+def _job_result(job):
+    if job['status'] in (DONE, FAILED):
+        return job['result'], job['http_status']
+
+    # 等待超时，客户端可以通过任务ID继续查询
+    return {"jobId": job['id'], "status": job['status']}, 202
+
+
+def _job_response(job):
+    body, status = _job_result(job)
+    return jsonify(body), status
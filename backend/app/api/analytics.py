@@ -0,0 +1,92 @@
+"""
+数据分析API模块
+基于每日汇总表的管理员报表接口
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+
+from app.api.auth import admin_required
+from app.models.analytics import GROUP_COLUMNS, AnalyticsRollup
+from flask import jsonify, request
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 未指定时间范围时默认统计最近的天数
+DEFAULT_RANGE_DAYS = 30
+
+
+def _parse_range():
+    """
+    解析 from / to 查询参数（YYYY-MM-DD，包含两端）
+
+    Returns:
+        tuple: (开始日期, 结束日期)
+
+    Raises:
+        ValueError: 日期格式错误或开始日期晚于结束日期
+    """
+    end = request.args.get('to')
+    end_day = datetime.strptime(end, '%Y-%m-%d').date() if end else date.today()
+
+    start = request.args.get('from')
+    start_day = datetime.strptime(start, '%Y-%m-%d').date() if start else \
+        end_day - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+
+    if start_day > end_day:
+        raise ValueError("开始日期不能晚于结束日期")
+    return start_day.isoformat(), end_day.isoformat()
+
+
+def _parse_filters():
+    """解析职位类型、难度和预设场景筛选条件"""
+    return {
+        'position_type': request.args.get('positionType'),
+        'difficulty': request.args.get('difficulty'),
+        'preset_id': request.args.get('presetId', type=int),
+    }
+
+
+@admin_required
+def get_daily_analytics():
+    """获取每日开始数、完成数、完成率和平均得分"""
+    try:
+        start_day, end_day = _parse_range()
+    except ValueError as e:
+        return jsonify({"error": f"无效的日期范围: {str(e)}"}), 400
+
+    try:
+        days = AnalyticsRollup.daily(start_day, end_day, **_parse_filters())
+        return jsonify({"from": start_day, "to": end_day, "days": days})
+    except Exception as e:
+        logger.exception(f"获取每日统计失败: {str(e)}")
+        return jsonify({"error": f"获取每日统计失败: {str(e)}"}), 500
+
+
+@admin_required
+def get_analytics_summary():
+    """按职位类型、难度或预设场景分组汇总统计"""
+    group_by = request.args.get('groupBy', 'position_type')
+    if group_by not in GROUP_COLUMNS:
+        return jsonify({
+            "error": f"groupBy 只能是 {', '.join(GROUP_COLUMNS)}"
+        }), 400
+
+    try:
+        start_day, end_day = _parse_range()
+    except ValueError as e:
+        return jsonify({"error": f"无效的日期范围: {str(e)}"}), 400
+
+    try:
+        groups = AnalyticsRollup.summary(
+            start_day, end_day, group_by, **_parse_filters())
+        return jsonify({
+            "from": start_day,
+            "to": end_day,
+            "groupBy": group_by,
+            "groups": groups
+        })
+    except Exception as e:
+        logger.exception(f"获取汇总统计失败: {str(e)}")
+        return jsonify({"error": f"获取汇总统计失败: {str(e)}"}), 500
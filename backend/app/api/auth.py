@@ -8,12 +8,52 @@ from datetime import datetime, timedelta, timezone
 
 import jwt
 from app.models.user import User
+from app.utils.password import PasswordHasherBusy
+from app.utils.profiler import PROFILE_HEADER, profile_request
 from flask import current_app, jsonify, request
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
 
+def authenticate(token):
+    """
+    验证令牌并检查用户状态
+
+    Args:
+        token (str): JWT 令牌
+
+    Returns:
+        tuple: (用户信息, None)；验证失败时返回 (None, (错误数据, HTTP状态码))
+    """
+    try:
+        payload = jwt.decode(
+            token, current_app.config['SECRET_KEY'], algorithms=['HS256']
+        )
+    except jwt.ExpiredSignatureError:
+        return None, ({"error": "令牌已过期"}, 401)
+    except jwt.InvalidTokenError:
+        return None, ({"error": "无效的令牌"}, 401)
+
+    # 检查用户状态（优先使用进程内缓存）
+    state = User.get_auth_state(payload.get('user_id'))
+    if not state:
+        return None, ({"error": "用户不存在"}, 401)
+
+    if state["status"] == "inactive":
+        return None, ({"error": "账户已被停用", "status": "inactive"}, 403)
+
+    # 检查令牌是否已被吊销（未携带版本号的旧令牌视为版本0）
+    if payload.get('epoch', 0) < state["token_epoch"]:
+        return None, ({"error": "令牌已失效，请重新登录"}, 401)
+
+    return {
+        "user_id": payload.get('user_id'),
+        "username": payload.get('username'),
+        "is_admin": payload.get('is_admin')
+    }, None
+
+
 # 权限验证装饰器
 def token_required(f):
     @functools.wraps(f)
@@ -22,41 +62,35 @@ def token_required(f):
         if not auth_header:
             return jsonify({"error": "未提供认证令牌"}), 401
 
-        try:
-            # 提取令牌
-            token = auth_header.split(
-                " ")[1] if " " in auth_header else auth_header
-
-            # 验证令牌
-            payload = jwt.decode(
-                token, current_app.config['SECRET_KEY'], algorithms=['HS256']
-            )
-            user_id = payload.get('user_id')
-
-            # 检查用户状态
-            user = User.get_by_id(user_id)
-            if not user:
-                return jsonify({"error": "用户不存在"}), 401
-
-            if user.get("status") == "inactive":
-                return jsonify({"error": "账户已被停用", "status": "inactive"}), 403
-
-            # 设置当前用户信息
-            request.user = {
-                "user_id": payload.get('user_id'),
-                "username": payload.get('username'),
-                "is_admin": payload.get('is_admin')
-            }
-
-            return f(*args, **kwargs)
-        except jwt.ExpiredSignatureError:
-            return jsonify({"error": "令牌已过期"}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({"error": "无效的令牌"}), 401
+        # 提取令牌
+        token = auth_header.split(
+            " ")[1] if " " in auth_header else auth_header
+
+        # 验证令牌
+        user, error = authenticate(token)
+        if error is not None:
+            body, status = error
+            return jsonify(body), status
+
+        # 设置当前用户信息
+        request.user = user
+
+        # 管理员可以通过请求头对本次请求启用 cProfile
+        if request.user["is_admin"] and request.headers.get(PROFILE_HEADER):
+            return profile_request(current_app.config['PROFILE_DIR'], f, *args, **kwargs)
+
+        return f(*args, **kwargs)
 
     return decorated
 
 
+def _hasher_busy_response():
+    """密码哈希线程池繁忙时的响应"""
+    response = jsonify({"error": "请求过多，请稍后重试"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
 # 管理员权限验证装饰器
 def admin_required(f):
     @functools.wraps(f)
@@ -80,7 +114,10 @@ def register():
         return jsonify({"error": "用户名和密码不能为空"}), 400
 
     # 创建新用户（默认为普通用户）
-    user_id = User.create(username, password, email, is_admin=0)
+    try:
+        user_id = User.create(username, password, email, is_admin=0)
+    except PasswordHasherBusy:
+        return _hasher_busy_response()
 
     if not user_id:
         return jsonify({"error": "用户名已存在"}), 409
@@ -102,7 +139,10 @@ def login():
         return jsonify({"error": "用户名和密码不能为空"}), 400
 
     # 验证用户身份
-    user = User.authenticate(username, password)
+    try:
+        user = User.authenticate(username, password)
+    except PasswordHasherBusy:
+        return _hasher_busy_response()
 
     if not user:
         return jsonify({"error": "用户名或密码错误"}), 401
@@ -112,6 +152,7 @@ def login():
         "user_id": user["id"],
         "username": user["username"],
         "is_admin": user["is_admin"],
+        "epoch": user["token_epoch"],  # 令牌吊销版本号
         "exp": datetime.now(timezone.utc) + timedelta(days=7)  # 令牌有效期7天
     }
     token = jwt.encode(
@@ -191,15 +232,18 @@ def change_password():
 
     user_id = request.user.get('user_id')
 
-    # 验证旧密码
-    user = User.get_by_id(user_id)
-    auth_result = User.authenticate(user["username"], old_password)
+    try:
+        # 验证旧密码
+        user = User.get_by_id(user_id)
+        auth_result = User.authenticate(user["username"], old_password)
 
-    if not auth_result:
-        return jsonify({"error": "旧密码不正确"}), 400
+        if not auth_result:
+            return jsonify({"error": "旧密码不正确"}), 400
 
-    # 更新密码
-    success = User.update_password(user_id, new_password)
+        # 更新密码
+        success = User.update_password(user_id, new_password)
+    except PasswordHasherBusy:
+        return _hasher_busy_response()
 
     if success:
         return jsonify({"message": "密码已成功更新"})
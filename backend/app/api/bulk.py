@@ -0,0 +1,226 @@
+"""
+批量操作API模块
+管理员按ID列表或筛选条件批量删除、停用、导出和重新评分
+
+批量操作分块执行，每块在一个独立的事务中提交，避免长时间持有写锁；
+响应以 NDJSON 流式输出，每完成一块输出一行进度
+"""
+
+import logging
+from datetime import datetime
+
+from app.api.auth import admin_required
+from app.models.archive import SessionArchive
+from app.models.interview import InterviewQuestion, InterviewSession
+from app.models.user import User
+from app.utils.db import transaction
+from flask import current_app, jsonify, request, stream_with_context
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 流式响应的内容类型，每行一个 JSON 对象
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def _parse_time(value, name):
+    """解析 ISO 格式的日期或时间"""
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} 必须是 ISO 格式的日期或时间")
+
+
+def _session_filters(data):
+    """将请求中的会话筛选条件转换为模型参数"""
+    return {
+        'user_id': data.get('userId'),
+        'username_prefix': data.get('usernamePrefix'),
+        'status': data.get('status'),
+        'position_type': data.get('positionType'),
+        'difficulty': data.get('difficulty'),
+        'started_before': _parse_time(data.get('startedBefore'), 'startedBefore'),
+        'started_after': _parse_time(data.get('startedAfter'), 'startedAfter'),
+    }
+
+
+def _user_filters(data):
+    """将请求中的用户筛选条件转换为模型参数"""
+    return {
+        'username_prefix': data.get('usernamePrefix'),
+        'status': data.get('status'),
+        'created_before': _parse_time(data.get('createdBefore'), 'createdBefore'),
+    }
+
+
+def _select(model, ids_key, parse_filters, exclude_id=None):
+    """
+    解析请求中的 ID 列表或筛选条件
+
+    Args:
+        model: 提供 count_matching / find_ids 的模型类
+        ids_key (str): 请求中 ID 列表的字段名
+        parse_filters (callable): 筛选条件解析函数
+        exclude_id (optional): 始终排除的 ID（当前登录的管理员）
+
+    Returns:
+        tuple: (总数, 按块产出 ID 列表的迭代器)
+
+    Raises:
+        ValueError: 未提供 ID 列表或筛选条件，或参数格式错误
+    """
+    data = request.get_json(silent=True) or {}
+    chunk_size = current_app.config['BULK_CHUNK_SIZE']
+
+    ids = data.get(ids_key)
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or \
+                not all(isinstance(i, (str, int)) for i in ids):
+            raise ValueError(f"{ids_key} 必须是非空的ID列表")
+        ids = [i for i in dict.fromkeys(ids) if str(i) != str(exclude_id)]
+        chunks = (ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size))
+        return len(ids), chunks
+
+    filter_data = data.get('filter') or {}
+    if not isinstance(filter_data, dict):
+        raise ValueError("filter 必须是对象")
+    filters = parse_filters(filter_data)
+    # 不允许无条件的批量操作
+    if all(value is None or value == '' for value in filters.values()):
+        raise ValueError(f"必须提供 {ids_key} 或至少一个筛选条件 filter")
+    filters['exclude_id'] = exclude_id
+
+    def chunks():
+        # 键集分页：上一块的数据被删除或修改都不影响后续分页
+        after = None
+        while True:
+            page = model.find_ids(filters, after=after, limit=chunk_size)
+            if not page:
+                return
+            yield page
+            after = page[-1]
+
+    return model.count_matching(filters), chunks()
+
+
+def _ndjson_line(obj):
+    return current_app.json.dumps_bytes(obj) + b'\n'
+
+
+def _run_chunked(operation, total, chunks, apply):
+    """
+    分块执行批量操作，以流式响应输出进度
+
+    每块在一个事务中提交；某一块失败时回滚该块并停止，之前的块保持已提交
+
+    Args:
+        operation (str): 操作名称
+        total (int): 预计处理的数量
+        chunks (iterable): 按块产出 ID 列表
+        apply (callable): 处理一块 ID，返回受影响的数量
+
+    Returns:
+        Response: NDJSON 流式响应
+    """
+    def generate():
+        progress = {'operation': operation, 'total': total, 'processed': 0, 'affected': 0}
+        try:
+            for ids in chunks:
+                with transaction():
+                    progress['affected'] += apply(ids)
+                progress['processed'] += len(ids)
+                yield _ndjson_line(progress)
+        except Exception as e:
+            logger.exception(f"批量操作 {operation} 失败: {str(e)}")
+            yield _ndjson_line({**progress, 'error': f"批量操作失败: {str(e)}"})
+            return
+        yield _ndjson_line({**progress, 'done': True})
+
+    return current_app.response_class(
+        stream_with_context(generate()), mimetype=NDJSON_MIMETYPE
+    )
+
+
+def _current_user_id():
+    return request.user.get('user_id')
+
+
+@admin_required
+def bulk_delete_sessions():
+    """批量删除会话及相关数据"""
+    try:
+        total, chunks = _select(InterviewSession, 'sessionIds', _session_filters)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return _run_chunked(
+        'deleteSessions', total, chunks,
+        lambda ids: sum(InterviewSession.delete(session_id) for session_id in ids)
+    )
+
+
+@admin_required
+def bulk_rescore_sessions():
+    """批量重新解析会话中问题的评估文本，更新得分并使结果文档失效"""
+    try:
+        total, chunks = _select(InterviewSession, 'sessionIds', _session_filters)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return _run_chunked(
+        'rescoreSessions', total, chunks, InterviewQuestion.rescore_sessions
+    )
+
+
+@admin_required
+def bulk_export_sessions():
+    """批量导出会话的全部明细数据，每行一个会话（格式与归档文件相同）"""
+    try:
+        total, chunks = _select(InterviewSession, 'sessionIds', _session_filters)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def generate():
+        for ids in chunks:
+            yield b''.join(
+                _ndjson_line(record) for record in SessionArchive.export(ids)
+                if record['tables']
+            )
+
+    response = current_app.response_class(
+        stream_with_context(generate()), mimetype=NDJSON_MIMETYPE
+    )
+    response.headers['X-Total-Count'] = str(total)
+    return response
+
+
+@admin_required
+def bulk_deactivate_users():
+    """批量停用用户（不包括当前登录的管理员）"""
+    try:
+        total, chunks = _select(
+            User, 'userIds', _user_filters, exclude_id=_current_user_id())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return _run_chunked(
+        'deactivateUsers', total, chunks,
+        lambda ids: sum(User.update_user(user_id, {'status': 'inactive'}) for user_id in ids)
+    )
+
+
+@admin_required
+def bulk_delete_users():
+    """批量删除用户，有关联会话的用户改为停用（不包括当前登录的管理员）"""
+    try:
+        total, chunks = _select(
+            User, 'userIds', _user_filters, exclude_id=_current_user_id())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return _run_chunked(
+        'deleteUsers', total, chunks,
+        lambda ids: sum(User.delete_user(user_id) for user_id in ids)
+    )
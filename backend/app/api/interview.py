@@ -2,19 +2,20 @@
 面试相关API模块
 """
 
-import json
 import logging
 from datetime import datetime
 
 from app.api.auth import token_required
 from app.models.interview import (FinalEvaluation, InterviewPreset,
-                                  InterviewQuestion, InterviewSession,
-                                  MultimodalAnalysis)
+                                  InterviewQuestion, InterviewResult,
+                                  InterviewSession, MultimodalAnalysis,
+                                  interview_presets_cache)
 from app.models.user import User
-from app.schemas.validation import (extract_evaluation_from_text,
-                                    fix_evaluation_data,
+from app.schemas.validation import (fix_evaluation_data,
                                     validate_evaluation_result)
 from app.services.ai import ai_service
+from app.utils.cache import conditional_gzip_json, conditional_json
+from app.utils.db import transaction
 from flask import current_app, jsonify, request
 
 # 配置日志
@@ -40,6 +41,9 @@ def start_interview():
     )  # 是否包含行为问题
     include_stress_test = data.get('includeStressTest', False)  # 是否包含压力测试
     custom_prompt = data.get('customPrompt')  # 自定义提示词
+    preset_id = data.get('presetId')  # 使用的预设场景
+    if not isinstance(preset_id, int) or isinstance(preset_id, bool):
+        preset_id = None
 
     # 更新配置
     current_app.config['INTERVIEW_QUESTION_COUNT'] = question_count
@@ -60,18 +64,7 @@ def start_interview():
             'custom_prompt': custom_prompt
         }
 
-        # 创建会话，添加额外参数
-        session_id = InterviewSession.create(
-            position_type,
-            difficulty,
-            interviewer_style=interviewer_style,
-            interview_params=interview_params  # 将完整的面试参数传递给create方法
-        )
-
-        # 关联用户和会话
-        User.associate_session(user_id, session_id)
-
-        # 生成第一个面试问题
+        # 生成第一个面试问题（先调用模型，再在一个事务中写入，避免留下没有问题的空会话）
         question_response = ai_service.generate_interview_question(
             position_type, difficulty, interview_params=interview_params
         )
@@ -81,8 +74,21 @@ def start_interview():
 
         first_question = question_response.get("question")
 
-        # 保存问题到数据库
-        InterviewQuestion.create(session_id, first_question, 0)
+        with transaction():
+            # 创建会话，添加额外参数
+            session_id = InterviewSession.create(
+                position_type,
+                difficulty,
+                interviewer_style=interviewer_style,
+                interview_params=interview_params,  # 将完整的面试参数传递给create方法
+                preset_id=preset_id
+            )
+
+            # 关联用户和会话
+            User.associate_session(user_id, session_id)
+
+            # 保存问题到数据库
+            InterviewQuestion.create(session_id, first_question, 0)
 
         return jsonify({
             "session_id": session_id,
@@ -134,18 +140,17 @@ def answer_question():
 
         evaluation = evaluation_response.get("evaluation")
 
-        # 更新回答和评估
-        InterviewQuestion.update_answer_and_evaluation(
-            current_question["id"], answer, evaluation
-        )
-
         # 判断是否结束面试
-        question_count = InterviewQuestion.count_for_session(session_id)
         all_questions = InterviewQuestion.get_all_for_session(session_id)
+        question_count = len(all_questions)
 
-        # 提取问题和回答
+        # 提取问题和回答（当前回答在本请求结束时才写入数据库）
         questions = [q["question"] for q in all_questions]
-        answers = [q["answer"] for q in all_questions if q["answer"]]
+        answers = [
+            answer if q["id"] == current_question["id"] else q["answer"]
+            for q in all_questions
+        ]
+        answers = [a for a in answers if a]
 
         # 进入面试完成分支，生成最终评估
         if question_count >= current_app.config['INTERVIEW_QUESTION_COUNT']:
@@ -178,34 +183,44 @@ def answer_question():
                 # 尝试修复数据
                 data = fix_evaluation_data(data)
 
-            if data:
-                # 从验证后的数据中获取评估信息
-                overall_score = data.get('overallScore', 0)
-                content_score = data.get('contentScore', 0)
-                delivery_score = data.get('deliveryScore', 0)
-                nonverbal_score = data.get('nonVerbalScore', 0)
-                strengths = data.get('strengths', [])
-                improvements = data.get('improvements', [])
-                recommendations = data.get('recommendations', "")
-
-                # 保存最终评估
-                FinalEvaluation.create(
-                    session_id,
-                    overall_score,
-                    content_score,
-                    delivery_score,
-                    nonverbal_score,
-                    strengths,
-                    improvements,
-                    recommendations
+            # 本轮的所有写操作在一个事务中提交
+            with transaction():
+                # 更新回答和评估
+                InterviewQuestion.update_answer_and_evaluation(
+                    current_question["id"], answer, evaluation
                 )
-            else:
-                logger.error("无法从评估结果中提取有效数据")
 
-            # 更新会话状态为已完成
-            InterviewSession.update_status(
-                session_id, "completed", datetime.now()
-            )
+                if data:
+                    # 从验证后的数据中获取评估信息
+                    overall_score = data.get('overallScore', 0)
+                    content_score = data.get('contentScore', 0)
+                    delivery_score = data.get('deliveryScore', 0)
+                    nonverbal_score = data.get('nonVerbalScore', 0)
+                    strengths = data.get('strengths', [])
+                    improvements = data.get('improvements', [])
+                    recommendations = data.get('recommendations', "")
+
+                    # 保存最终评估
+                    FinalEvaluation.create(
+                        session_id,
+                        overall_score,
+                        content_score,
+                        delivery_score,
+                        nonverbal_score,
+                        strengths,
+                        improvements,
+                        recommendations
+                    )
+                else:
+                    logger.error("无法从评估结果中提取有效数据")
+
+                # 更新会话状态为已完成
+                InterviewSession.update_status(
+                    session_id, "completed", datetime.now()
+                )
+
+                # 会话结束后结果不再变化，生成一次结果文档供结果接口直接返回
+                InterviewResult.materialize(session_id)
 
             return jsonify({
                 "message": "面试已完成",
@@ -230,8 +245,15 @@ def answer_question():
 
         next_question = next_question_response.get("question")
 
-        # 保存下一个问题
-        InterviewQuestion.create(session_id, next_question, question_count)
+        # 本轮的所有写操作在一个事务中提交
+        with transaction():
+            # 更新回答和评估
+            InterviewQuestion.update_answer_and_evaluation(
+                current_question["id"], answer, evaluation
+            )
+
+            # 保存下一个问题
+            InterviewQuestion.create(session_id, next_question, question_count)
 
         return jsonify({
             "evaluation": evaluation,
@@ -263,79 +285,14 @@ def get_interview_results(session_id):
         if not session:
             return jsonify({"error": "无效的会话ID"}), 400
 
-        # 获取最终评估
-        final_eval_record = FinalEvaluation.get_for_session(session_id)
-
-        # 获取所有问题、回答和评估
-        all_questions = InterviewQuestion.get_all_for_session(session_id)
-
-        # 提取问题得分
-        question_scores = []
-
-        for q in all_questions:
-            if q['answer'] and q['evaluation']:
-                # 从评估文本中提取结构化数据
-                score = 75  # 默认分数
-                try:
-                    # 尝试提取JSON数据
-                    eval_data = extract_evaluation_from_text(q['evaluation'])
-                    if eval_data and isinstance(eval_data, dict):
-                        # 如果成功提取到JSON数据，直接获取score字段
-                        if 'score' in eval_data and isinstance(eval_data['score'], (int, float)):
-                            raw_score = float(eval_data['score'])
-                            # 将1-10分转换为百分制
-                            score = int(raw_score * 10)
-                except Exception as e:
-                    logger.warning(f"提取评分失败: {str(e)}")
-
-                question_scores.append({
-                    'question': q['question'],
-                    'answer': q['answer'],
-                    'score': score,
-                    'feedback': q['evaluation']
-                })
-
-        # 获取多模态分析数据
-        analyses = MultimodalAnalysis.get_for_session(session_id)
-
-        video_analysis = None
-        audio_analysis = None
-
-        # 如果有多模态分析数据，获取最新的一条
-        if analyses:
-            latest_analysis = analyses[-1]
-            video_analysis = latest_analysis.get('videoAnalysis')
-            audio_analysis = latest_analysis.get('audioAnalysis')
-
-        # 构建结果对象，使用数据库中保存的最终评估结果
-        if final_eval_record:
-            # 从数据库记录中获取评估数据
-            strengths = json.loads(
-                final_eval_record['strengths']
-            ) if final_eval_record['strengths'] else []
-
-            improvements = json.loads(
-                final_eval_record['improvements']
-            ) if final_eval_record['improvements'] else []
-
-            recommendations = final_eval_record['recommendations']
-
-            results = {
-                'overallScore': final_eval_record['overall_score'],
-                'contentScore': final_eval_record['content_score'],
-                'deliveryScore': final_eval_record['delivery_score'],
-                'nonVerbalScore': final_eval_record['nonverbal_score'],
-                'strengths': strengths,
-                'improvements': improvements,
-                'questionScores': question_scores,
-                'videoAnalysis': video_analysis,
-                'audioAnalysis': audio_analysis,
-                'recommendations': recommendations
-            }
-        else:
+        # 已完成的会话直接返回面试结束时生成的结果文档，文档失效时重新生成并保存
+        result = InterviewResult.get_or_build(
+            session_id, store=session["status"] == "completed"
+        )
+        if not result:
             return jsonify({"error": "未找到面试结果"}), 404
 
-        return jsonify(results)
+        return conditional_gzip_json(result["document"], result["etag"])
 
     except Exception as e:
         logger.exception(f"获取面试结果失败: {str(e)}")
@@ -347,8 +304,10 @@ def get_interview_presets():
     """获取所有面试预设场景"""
     try:
         # 获取所有预设场景
-        presets = InterviewPreset.get_all()
-        return jsonify({"presets": presets})
+        presets, version = interview_presets_cache.entry()
+        return conditional_json(
+            {"presets": presets}, f"interview_presets-{version}"
+        )
     except Exception as e:
         logger.exception(f"获取面试预设场景失败: {str(e)}")
         return jsonify({"error": f"获取面试预设场景失败: {str(e)}"}), 500
@@ -359,10 +318,13 @@ def get_interview_preset_detail(preset_id):
     """获取面试预设场景详情"""
     try:
         # 获取指定预设场景
-        preset = InterviewPreset.get_by_id(preset_id)
+        presets, version = interview_presets_cache.entry()
+        preset = InterviewPreset.find(presets, preset_id)
         if not preset:
             return jsonify({"error": "预设场景不存在"}), 404
-        return jsonify({"preset": preset})
+        return conditional_json(
+            {"preset": preset}, f"interview_presets-{version}-{preset_id}"
+        )
     except Exception as e:
         logger.exception(f"获取面试预设场景详情失败: {str(e)}")
         return jsonify({"error": f"获取面试预设场景详情失败: {str(e)}"}), 500
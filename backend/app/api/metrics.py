@@ -0,0 +1,16 @@
+"""
+监控指标API模块
+"""
+
+from app.utils.metrics import render_metrics
+from flask import current_app, jsonify
+
+
+def metrics():
+    """Prometheus 指标抓取接口"""
+    rendered = render_metrics()
+    if rendered is None:
+        return jsonify({"error": "未安装 prometheus_client，监控指标不可用"}), 501
+
+    body, content_type = rendered
+    return current_app.response_class(body, content_type=content_type)
@@ -3,7 +3,8 @@
 """
 
 from app.api.auth import token_required
-from app.models.position import PositionType
+from app.models.position import position_types_cache
+from app.utils.cache import conditional_json
 from flask import jsonify
 
 
@@ -11,7 +12,7 @@ from flask import jsonify
 def get_position_types():
     """获取所有职位类型"""
     try:
-        position_types = PositionType.get_all()
-        return jsonify(position_types)
+        position_types, version = position_types_cache.entry()
+        return conditional_json(position_types, f"position_types-{version}")
     except Exception as e:
         return jsonify({"error": f"获取职位类型失败: {str(e)}"}), 500
@@ -0,0 +1,115 @@
+"""
+性能剖析API模块
+管理员在指定的工作进程中运行采样剖析器，下载折叠栈或 speedscope 格式的结果，
+以及下载按请求启用 cProfile 得到的 pstats 结果
+"""
+
+import io
+import logging
+import os
+import pstats
+import threading
+
+from app.api.auth import admin_required
+from app.utils import profiler
+from flask import current_app, jsonify, request, send_file
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 结果文件的内容类型
+_MIMETYPES = {
+    '.collapsed.txt': 'text/plain; charset=utf-8',
+    '.speedscope.json': 'application/json',
+    '.prof': 'application/octet-stream',
+}
+
+
+def _profile_dir():
+    return current_app.config['PROFILE_DIR']
+
+
+@admin_required
+def list_profiling_workers():
+    """列出可以采样的工作进程（含内存占用）和已保存的剖析结果"""
+    directory = _profile_dir()
+    return jsonify({
+        "currentPid": os.getpid(),
+        "workers": profiler.worker_status(directory),
+        "profiles": profiler.list_profiles(directory)
+    })
+
+
+@admin_required
+def start_sampling():
+    """
+    在工作进程中运行采样剖析器
+
+    请求体: {"seconds": 10, "pid": 可选, "format": "collapsed" | "speedscope", "interval": 可选}
+    目标为当前进程时采样结束后直接返回结果文件；
+    目标为其他工作进程时返回 202 和剖析结果ID，完成后通过 /admin/profiling/profiles/<ID> 下载
+    """
+    data = request.get_json(silent=True) or {}
+    max_seconds = current_app.config['PROFILE_MAX_SECONDS']
+    fmt = data.get('format', 'collapsed')
+
+    try:
+        seconds = float(data.get('seconds', 10))
+        interval = float(data.get('interval', current_app.config['PROFILE_SAMPLE_INTERVAL']))
+        pid = int(data['pid']) if data.get('pid') is not None else os.getpid()
+    except (TypeError, ValueError):
+        return jsonify({"error": "seconds、interval 和 pid 必须是数字"}), 400
+    if not 0 < seconds <= max_seconds:
+        return jsonify({"error": f"采样时长必须在 0 到 {max_seconds} 秒之间"}), 400
+    if not 0.001 <= interval <= 1:
+        return jsonify({"error": "采样间隔必须在 0.001 到 1 秒之间"}), 400
+    if fmt not in profiler.SAMPLE_FORMATS:
+        return jsonify({"error": f"不支持的格式: {fmt}"}), 400
+
+    directory = _profile_dir()
+
+    if pid != os.getpid():
+        if pid not in profiler.live_workers(directory):
+            return jsonify({"error": "工作进程不存在或尚未处理过请求"}), 404
+        profile_id = profiler.submit_job(directory, pid, seconds, interval, fmt)
+        return jsonify({
+            "profileId": profile_id,
+            "pid": pid,
+            "seconds": seconds,
+            "status": "pending"
+        }), 202
+
+    # 不采样正在等待的当前请求线程
+    result = profiler.sample(seconds, interval, exclude=(threading.get_ident(),))
+    profile_id = profiler.new_profile_id(f"sample-{pid}")
+    path = profiler.save_sample(directory, profile_id, fmt, result)
+    return _send_profile(path)
+
+
+@admin_required
+def download_profile(profile_id):
+    """下载剖析结果，pstats 结果可以用 ?format=text 查看按累计耗时排序的文本"""
+    if not profiler.valid_profile_id(profile_id):
+        return jsonify({"error": "无效的剖析结果ID"}), 400
+
+    directory = _profile_dir()
+    path = profiler.find_profile(directory, profile_id)
+    if path is None:
+        if profiler.job_pending(directory, profile_id):
+            return jsonify({"profileId": profile_id, "status": "pending"}), 202
+        return jsonify({"error": "剖析结果不存在"}), 404
+
+    if path.endswith(profiler.REQUEST_PROFILE_SUFFIX) and request.args.get('format') == 'text':
+        limit = request.args.get('limit', default=50, type=int)
+        output = io.StringIO()
+        pstats.Stats(path, stream=output).sort_stats('cumulative').print_stats(limit)
+        return current_app.response_class(output.getvalue(), mimetype='text/plain')
+
+    return _send_profile(path)
+
+
+def _send_profile(path):
+    filename = os.path.basename(path)
+    suffix = filename[filename.index('.'):]
+    return send_file(path, mimetype=_MIMETYPES[suffix], as_attachment=True,
+                     download_name=filename)
@@ -0,0 +1,45 @@
+"""
+搜索API模块
+管理员按关键词搜索面试问题、回答和评估
+"""
+
+import logging
+
+from app.api.auth import admin_required
+from app.models.search import QuestionSearch
+from flask import jsonify, request
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 每页最大结果数
+MAX_LIMIT = 100
+
+
+@admin_required
+def search_questions():
+    """全文搜索面试问题，返回按相关度排序的结果和高亮摘要"""
+    query = request.args.get('q', '').strip()
+    limit = request.args.get('limit', default=20, type=int)
+    offset = request.args.get('offset', default=0, type=int)
+
+    if not query:
+        return jsonify({"error": "搜索关键词不能为空"}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({"error": "无效的分页参数"}), 400
+    limit = min(limit, MAX_LIMIT)
+
+    try:
+        found = QuestionSearch.search(query, limit=limit, offset=offset)
+        return jsonify({
+            "query": query,
+            "results": found['results'],
+            "total": found['total'],
+            "limit": limit,
+            "offset": offset
+        })
+    except NotImplementedError as e:
+        return jsonify({"error": str(e)}), 501
+    except Exception as e:
+        logger.exception(f"搜索失败: {str(e)}")
+        return jsonify({"error": f"搜索失败: {str(e)}"}), 500
@@ -0,0 +1,94 @@
+"""
+命令行工具模块
+注册通过 flask 命令运行的维护任务，例如：
+
+    flask --app run backfill-evaluations
+"""
+
+import click
+from app.services.retention import (archive_sessions, sweep_temp_media,
+                                    temp_media_root)
+from app.models.analytics import AnalyticsRollup
+from app.models.interview import InterviewQuestion
+from app.models.search import QuestionSearch
+from flask import current_app
+
+
+def register_commands(app):
+    """
+    注册命令行命令
+
+    Args:
+        app (Flask): Flask应用实例
+    """
+
+    @app.cli.command('backfill-evaluations')
+    @click.option('--batch-size', default=500, show_default=True,
+                  help="每批处理的行数")
+    def backfill_evaluations(batch_size):
+        """为历史面试问题补全评估解析结果（得分、优点）"""
+        processed = InterviewQuestion.backfill_evaluations(batch_size)
+        click.echo(f"已回填 {processed} 条问题评估")
+
+    @app.cli.command('rebuild-analytics')
+    @click.option('--since', default=None, metavar='YYYY-MM-DD',
+                  help="只重建该日期及之后的统计，默认全部重建")
+    def rebuild_analytics(since):
+        """根据会话和最终评估明细重建每日统计汇总表"""
+        rows = AnalyticsRollup.rebuild(since)
+        click.echo(f"已重建 {rows} 行每日统计")
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """根据问题表内容重建全文搜索索引"""
+        if QuestionSearch.rebuild():
+            click.echo("已重建全文搜索索引")
+        else:
+            click.echo("当前数据库不支持全文搜索")
+
+    @app.cli.command('archive-sessions')
+    @click.option('--days', type=int, default=None,
+                  help="保留天数，默认使用 RETENTION_DAYS 配置")
+    def archive_sessions_command(days):
+        """将过期的已完成会话归档到压缩的 JSONL 文件并从数据库中移除"""
+        config = current_app.config
+        days = config['RETENTION_DAYS'] if days is None else days
+        if days <= 0:
+            click.echo("未配置保留天数（RETENTION_DAYS），跳过归档")
+            return
+
+        result = archive_sessions(
+            days,
+            config['RETENTION_ARCHIVE_DIR'],
+            batch_size=config['RETENTION_BATCH_SIZE'],
+            vacuum_pages=config['RETENTION_VACUUM_PAGES']
+        )
+        if result['archived']:
+            click.echo(f"已归档 {result['archived']} 个会话到 {result['path']}")
+        else:
+            click.echo("没有需要归档的会话")
+        click.echo(f"回收数据库空闲页 {result['reclaimedPages']} 页")
+
+    @app.cli.command('sweep-temp-media')
+    @click.option('--ttl', type=float, default=None,
+                  help="保留时间（秒），默认使用 TEMP_MEDIA_TTL 配置")
+    def sweep_temp_media_command(ttl):
+        """删除过期的视频、音频临时文件"""
+        ttl = current_app.config['TEMP_MEDIA_TTL'] if ttl is None else ttl
+        removed, freed = sweep_temp_media(temp_media_root(), ttl)
+        click.echo(f"已删除 {removed} 个临时文件，释放 {freed} 字节")
+
+    @app.cli.command('media-worker')
+    @click.option('--processes', type=int, default=None,
+                  help="工作进程数，默认使用 MEDIA_WORKER_PROCESSES 配置（0 表示物理核数）")
+    def media_worker_command(processes):
+        """启动媒体分析工作进程池，处理 /multimodal_analysis 排队的视频"""
+        from app.services.media_worker import physical_cores, run_pool
+
+        app = current_app._get_current_object()
+        if 'media_queue' not in app.extensions:
+            click.echo("未启用媒体分析队列，请设置 MEDIA_WORKER_MODE=queue")
+            return
+
+        processes = app.config['MEDIA_WORKER_PROCESSES'] if processes is None else processes
+        run_pool(app, processes or physical_cores())
@@ -0,0 +1,295 @@
+"""
+数据分析相关的数据库模型
+按天预聚合面试会话统计，报表查询只读取汇总行，不扫描会话和评估明细
+"""
+
+from app.utils.db import get_db
+
+# 可用于分组的维度及对应的汇总表列
+GROUP_COLUMNS = {
+    'position_type': 'position_type',
+    'difficulty': 'difficulty',
+    'preset': 'preset_id',
+}
+
+# 汇总表中的计数和得分列
+_MEASURES = (
+    'sessions_started', 'sessions_completed', 'scored_count',
+    'overall_sum', 'content_sum', 'delivery_sum', 'nonverbal_sum',
+)
+
+_UPSERT_SQL = f"""
+    INSERT INTO analytics_daily (day, position_type, difficulty, preset_id, {', '.join(_MEASURES)})
+    VALUES (?, ?, ?, ?, {', '.join('?' for _ in _MEASURES)})
+    ON CONFLICT (day, position_type, difficulty, preset_id) DO UPDATE SET
+    {', '.join(f'{m} = analytics_daily.{m} + excluded.{m}' for m in _MEASURES)}
+"""
+
+
+def _day(value):
+    """会话开始时间对应的日期（YYYY-MM-DD），会话按开始日期归入队列"""
+    return str(value)[:10]
+
+
+class AnalyticsRollup:
+    """每日汇总模型"""
+
+    @staticmethod
+    def _apply(cursor, session, started=0, completed=0, evaluation=None):
+        """
+        将一个会话的增量累加到对应的汇总行
+
+        Args:
+            cursor (Cursor): 游标
+            session (Row): 会话记录，需包含 start_time, position_type, difficulty, preset_id
+            started (int): 开始会话数增量
+            completed (int): 完成会话数增量
+            evaluation (Row, optional): 最终评估，存在时按 completed 的符号累加得分
+        """
+        scored = completed if evaluation else 0
+        scores = [
+            scored * (evaluation[column] or 0) if evaluation else 0
+            for column in ('overall_score', 'content_score', 'delivery_score', 'nonverbal_score')
+        ]
+
+        cursor.execute(_UPSERT_SQL, (
+            _day(session['start_time']),
+            session['position_type'] or '',
+            session['difficulty'] or '',
+            session['preset_id'] or 0,
+            started, completed, scored, *scores
+        ))
+
+    @staticmethod
+    def _get_session(cursor, session_id):
+        cursor.execute(
+            """SELECT start_time, position_type, difficulty, preset_id, analytics_completed
+            FROM interview_sessions WHERE session_id = ?""",
+            (session_id,)
+        )
+        return cursor.fetchone()
+
+    @staticmethod
+    def _get_evaluation(cursor, session_id):
+        cursor.execute(
+            """SELECT overall_score, content_score, delivery_score, nonverbal_score
+            FROM final_evaluations WHERE session_id = ? ORDER BY id DESC LIMIT 1""",
+            (session_id,)
+        )
+        return cursor.fetchone()
+
+    @staticmethod
+    def record_start(cursor, session_id):
+        """会话创建时调用，计入开始会话数"""
+        session = AnalyticsRollup._get_session(cursor, session_id)
+        if session:
+            AnalyticsRollup._apply(cursor, session, started=1)
+
+    @staticmethod
+    def record_completion(session_id):
+        """
+        会话完成时调用，计入完成数和最终评估得分（同一会话只计一次）
+
+        Args:
+            session_id (str): 会话ID
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute(
+            "UPDATE interview_sessions SET analytics_completed = 1 WHERE session_id = ? AND analytics_completed = 0",
+            (session_id,)
+        )
+        if cursor.rowcount != 1:
+            return
+
+        session = AnalyticsRollup._get_session(cursor, session_id)
+        evaluation = AnalyticsRollup._get_evaluation(cursor, session_id)
+        AnalyticsRollup._apply(cursor, session, completed=1, evaluation=evaluation)
+        db.commit()
+
+    @staticmethod
+    def remove_session(cursor, session_id):
+        """删除会话前调用，从汇总中扣除该会话的贡献"""
+        session = AnalyticsRollup._get_session(cursor, session_id)
+        if not session:
+            return
+
+        if session['analytics_completed']:
+            evaluation = AnalyticsRollup._get_evaluation(cursor, session_id)
+            AnalyticsRollup._apply(
+                cursor, session, started=-1, completed=-1, evaluation=evaluation)
+        else:
+            AnalyticsRollup._apply(cursor, session, started=-1)
+
+    @staticmethod
+    def rebuild(since=None):
+        """
+        根据会话和最终评估明细重建汇总表
+
+        Args:
+            since (str, optional): 只重建该日期（YYYY-MM-DD）及之后的汇总
+
+        Returns:
+            int: 重建的汇总行数
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        day_expr = "SUBSTR(CAST(s.start_time AS TEXT), 1, 10)"
+        where = f"WHERE {day_expr} >= ?" if since else ""
+        session_where = "WHERE SUBSTR(CAST(start_time AS TEXT), 1, 10) >= ?" if since else ""
+        params = (since,) if since else ()
+
+        if since:
+            cursor.execute("DELETE FROM analytics_daily WHERE day >= ?", params)
+        else:
+            cursor.execute("DELETE FROM analytics_daily")
+
+        completed = "CASE WHEN s.status = 'completed' THEN 1 ELSE 0 END"
+        scored = "CASE WHEN s.status = 'completed' AND fe.id IS NOT NULL THEN 1 ELSE 0 END"
+
+        cursor.execute(f"""
+            INSERT INTO analytics_daily (day, position_type, difficulty, preset_id, {', '.join(_MEASURES)})
+            SELECT
+                {day_expr},
+                COALESCE(s.position_type, ''),
+                COALESCE(s.difficulty, ''),
+                COALESCE(s.preset_id, 0),
+                COUNT(*),
+                SUM({completed}),
+                SUM({scored}),
+                SUM({scored} * COALESCE(fe.overall_score, 0)),
+                SUM({scored} * COALESCE(fe.content_score, 0)),
+                SUM({scored} * COALESCE(fe.delivery_score, 0)),
+                SUM({scored} * COALESCE(fe.nonverbal_score, 0))
+            FROM interview_sessions s
+            LEFT JOIN final_evaluations fe ON fe.id = (
+                SELECT MAX(id) FROM final_evaluations WHERE session_id = s.session_id
+            )
+            {where}
+            GROUP BY {day_expr}, COALESCE(s.position_type, ''), COALESCE(s.difficulty, ''), COALESCE(s.preset_id, 0)
+        """, params)
+        rows = cursor.rowcount
+
+        # 同步完成标记，之后的增量更新不会重复计入
+        cursor.execute(f"""
+            UPDATE interview_sessions
+            SET analytics_completed = CASE WHEN status = 'completed' THEN 1 ELSE 0 END
+            {session_where}
+        """, params)
+
+        db.commit()
+        return rows
+
+    @staticmethod
+    def _summarize_row(row):
+        """将汇总结果行转换为报表项"""
+        started = row['sessions_started'] or 0
+        completed = row['sessions_completed'] or 0
+        scored = row['scored_count'] or 0
+
+        def average(column):
+            return round(row[column] / scored, 1) if scored else None
+
+        return {
+            'sessionsStarted': started,
+            'sessionsCompleted': completed,
+            'completionRate': round(completed / started, 4) if started else None,
+            'averageOverallScore': average('overall_sum'),
+            'averageContentScore': average('content_sum'),
+            'averageDeliveryScore': average('delivery_sum'),
+            'averageNonVerbalScore': average('nonverbal_sum'),
+        }
+
+    @staticmethod
+    def _filters(start_day, end_day, position_type=None, difficulty=None, preset_id=None):
+        conditions = ["a.day >= ?", "a.day <= ?"]
+        params = [start_day, end_day]
+
+        if position_type is not None:
+            conditions.append("a.position_type = ?")
+            params.append(position_type)
+        if difficulty is not None:
+            conditions.append("a.difficulty = ?")
+            params.append(difficulty)
+        if preset_id is not None:
+            conditions.append("a.preset_id = ?")
+            params.append(preset_id)
+
+        return " AND ".join(conditions), params
+
+    @staticmethod
+    def daily(start_day, end_day, **filters):
+        """
+        获取每日统计
+
+        Args:
+            start_day (str): 开始日期（YYYY-MM-DD，包含）
+            end_day (str): 结束日期（YYYY-MM-DD，包含）
+            **filters: position_type, difficulty, preset_id 筛选条件
+
+        Returns:
+            list: 每日统计列表
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        where, params = AnalyticsRollup._filters(start_day, end_day, **filters)
+        cursor.execute(f"""
+            SELECT a.day, {', '.join(f'SUM(a.{m}) AS {m}' for m in _MEASURES)}
+            FROM analytics_daily a
+            WHERE {where}
+            GROUP BY a.day
+            ORDER BY a.day
+        """, params)
+
+        return [
+            {'day': row['day'], **AnalyticsRollup._summarize_row(row)}
+            for row in cursor.fetchall()
+        ]
+
+    @staticmethod
+    def summary(start_day, end_day, group_by, **filters):
+        """
+        按维度汇总统计
+
+        Args:
+            start_day (str): 开始日期（YYYY-MM-DD，包含）
+            end_day (str): 结束日期（YYYY-MM-DD，包含）
+            group_by (str): 分组维度，GROUP_COLUMNS 中的键
+            **filters: position_type, difficulty, preset_id 筛选条件
+
+        Returns:
+            list: 各分组的统计列表
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        column = GROUP_COLUMNS[group_by]
+        where, params = AnalyticsRollup._filters(start_day, end_day, **filters)
+
+        # 预设分组时附带预设名称，未使用预设的会话 preset_id 为 0
+        if group_by == 'preset':
+            select_label = "p.name AS label"
+            join = "LEFT JOIN interview_presets p ON p.id = a.preset_id"
+            group = "a.preset_id, p.name"
+        else:
+            select_label = f"a.{column} AS label"
+            join = ""
+            group = f"a.{column}"
+
+        cursor.execute(f"""
+            SELECT a.{column} AS value, {select_label},
+                {', '.join(f'SUM(a.{m}) AS {m}' for m in _MEASURES)}
+            FROM analytics_daily a
+            {join}
+            WHERE {where}
+            GROUP BY {group}
+            ORDER BY SUM(a.sessions_started) DESC
+        """, params)
+
+        return [
+            {'value': row['value'], 'label': row['label'], **AnalyticsRollup._summarize_row(row)}
+            for row in cursor.fetchall()
+        ]
@@ -0,0 +1,122 @@
+"""
+会话归档相关的数据库模型
+导出过期会话的全部明细数据，并在归档后从数据库中移除
+"""
+
+import base64
+from datetime import date, datetime
+
+from app.utils.db import get_db
+
+# 归档的明细表，按删除顺序排列（先删除外键关联的表）
+ARCHIVED_TABLES = (
+    'multimodal_analysis',
+    'multimodal_aggregates',
+    'analysis_time_series',
+    'interview_questions',
+    'final_evaluations',
+    'user_sessions',
+    'interview_sessions',
+)
+
+
+def _encode_value(value):
+    """将数据库值转换为可 JSON 序列化的值，二进制数据使用 base64 编码"""
+    if isinstance(value, (bytes, memoryview)):
+        return {'$base64': base64.b64encode(bytes(value)).decode('ascii')}
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+class SessionArchive:
+    """会话归档模型"""
+
+    @staticmethod
+    def find_expired(cutoff, limit):
+        """
+        查找开始时间早于截止时间的已完成会话
+
+        Args:
+            cutoff (datetime): 截止时间
+            limit (int): 最多返回的数量
+
+        Returns:
+            list: 会话ID列表，按开始时间从早到晚排列
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute(
+            """SELECT session_id FROM interview_sessions
+            WHERE status = 'completed' AND start_time < ?
+            ORDER BY start_time LIMIT ?""",
+            (cutoff, limit)
+        )
+        return [row['session_id'] for row in cursor.fetchall()]
+
+    @staticmethod
+    def export(session_ids):
+        """
+        导出会话的全部明细数据
+
+        Args:
+            session_ids (list): 会话ID列表
+
+        Returns:
+            list: 每个会话一条记录 {'session_id': ..., 'tables': {表名: [行]}}
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        records = {
+            session_id: {'session_id': session_id, 'tables': {}}
+            for session_id in session_ids
+        }
+        placeholders = ', '.join('?' for _ in session_ids)
+
+        for table in ARCHIVED_TABLES:
+            cursor.execute(
+                f"SELECT * FROM {table} WHERE session_id IN ({placeholders})",
+                session_ids
+            )
+            for row in cursor.fetchall():
+                tables = records[row['session_id']]['tables']
+                tables.setdefault(table, []).append(
+                    {key: _encode_value(row[key]) for key in row.keys()}
+                )
+
+        return [records[session_id] for session_id in session_ids]
+
+    @staticmethod
+    def purge(session_ids):
+        """
+        从数据库中移除已归档的会话
+
+        每日统计汇总保留归档会话的贡献，历史报表不受归档影响
+
+        Args:
+            session_ids (list): 会话ID列表
+
+        Returns:
+            int: 移除的会话数量
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        placeholders = ', '.join('?' for _ in session_ids)
+        cursor.execute(
+            f"DELETE FROM interview_results WHERE session_id IN ({placeholders})",
+            session_ids
+        )
+        for table in ARCHIVED_TABLES:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE session_id IN ({placeholders})",
+                session_ids
+            )
+        purged = cursor.rowcount
+
+        db.commit()
+        return purged
@@ -2,12 +2,33 @@
 面试相关的数据库模型
 """
 
+import gzip
+import hashlib
 import json
 import uuid
 from datetime import datetime
 
-from app.utils.db import get_db
-from app.utils.float32json import Float32JSONEncoder
+from app.models.analytics import AnalyticsRollup
+from app.schemas.validation import parse_question_evaluation
+from app.utils.cache import VersionedCache
+from app.utils.db import escape_like, get_db
+from app.utils.metrics_codec import (decode_metrics, decode_series,
+                                     encode_metrics, encode_series, to_number)
+from flask import current_app
+
+# 参与会话聚合的多模态指标
+AGGREGATE_METRICS = {
+    'video': ('eyeContact', 'facialExpressions', 'bodyLanguage', 'confidence'),
+    'audio': ('clarity', 'pace', 'tone', 'fillerWordsCount'),
+}
+
+# 汇总为总和而不是平均值的指标
+SUMMED_METRICS = ('fillerWordsCount',)
+
+# 写入评估解析结果（百分制得分、优点列表）
+_PARSED_UPDATE_SQL = (
+    "UPDATE interview_questions SET score = ?, strengths = ?, evaluation_parsed = 1 WHERE id = ?"
+)
 
 
 class InterviewSession:
@@ -27,6 +48,7 @@ class InterviewSession:
                 industry_focus (str, optional): 行业焦点
                 company_size (str, optional): 公司规模
                 interview_params (dict, optional): 完整的面试参数
+                preset_id (int, optional): 使用的预设场景ID
 
         Returns:
             str: 会话ID
@@ -42,14 +64,18 @@ class InterviewSession:
             position_type,
             difficulty,
             datetime.now(),
-            "active"
+            "active",
+            kwargs.get('preset_id')
         )
 
         cursor.execute(
-            "INSERT INTO interview_sessions (session_id, position_type, difficulty, start_time, status) VALUES (?, ?, ?, ?, ?)",
+            "INSERT INTO interview_sessions (session_id, position_type, difficulty, start_time, status, preset_id) VALUES (?, ?, ?, ?, ?, ?)",
             params
         )
 
+        # 计入每日统计
+        AnalyticsRollup.record_start(cursor, session_id)
+
         if kwargs:
             # 存储完整的面试参数
             interview_params = kwargs.get('interview_params')
@@ -116,6 +142,22 @@ class InterviewSession:
         Returns:
             list: 会话列表
         """
+        return list(InterviewSession.iter_all(limit, offset, user_filter))
+
+    @staticmethod
+    def iter_all(limit=100, offset=0, user_filter=None, batch_size=500):
+        """
+        执行查询并逐条返回会话，用于流式输出大列表
+
+        Args:
+            limit (int, optional): 限制返回数量
+            offset (int, optional): 偏移量
+            user_filter (int, optional): 按用户ID筛选
+            batch_size (int, optional): 每次从数据库读取的行数
+
+        Returns:
+            iterator: 会话迭代器
+        """
         db = get_db()
         cursor = db.cursor()
 
@@ -150,7 +192,7 @@ class InterviewSession:
 
         query += """
             GROUP BY 
-                s.session_id
+                s.session_id, u.id, u.username
             ORDER BY 
                 s.start_time DESC
             LIMIT ? OFFSET ?
@@ -160,34 +202,43 @@ class InterviewSession:
 
         cursor.execute(query, params)
 
-        sessions = []
-        for row in cursor.fetchall():
-            # 计算会话持续时间
-            start_time = datetime.fromisoformat(
-                row['start_time']) if row['start_time'] else None
-            end_time = datetime.fromisoformat(
-                row['end_time']) if row['end_time'] else None
-
-            duration = None
-            if start_time and end_time:
-                duration = (
-                    end_time - start_time).total_seconds() / 60  # 转换为分钟
-
-            sessions.append({
-                'sessionId': row['session_id'],
-                'positionType': row['position_type'],
-                'difficulty': row['difficulty'],
-                'startTime': row['start_time'],
-                'endTime': row['end_time'],
-                'status': row['status'],
-                'questionCount': row['question_count'],
-                'answeredCount': row['answered_count'],
-                'duration': round(duration, 1) if duration else None,
-                'userId': row['user_id'],
-                'username': row['username']
-            })
+        def generate():
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield InterviewSession._summary(row)
 
-        return sessions
+        return generate()
+
+    @staticmethod
+    def _summary(row):
+        """将查询结果行转换为会话摘要"""
+        # 计算会话持续时间
+        start_time = datetime.fromisoformat(
+            row['start_time']) if row['start_time'] else None
+        end_time = datetime.fromisoformat(
+            row['end_time']) if row['end_time'] else None
+
+        duration = None
+        if start_time and end_time:
+            duration = (
+                end_time - start_time).total_seconds() / 60  # 转换为分钟
+
+        return {
+            'sessionId': row['session_id'],
+            'positionType': row['position_type'],
+            'difficulty': row['difficulty'],
+            'startTime': row['start_time'],
+            'endTime': row['end_time'],
+            'status': row['status'],
+            'questionCount': row['question_count'],
+            'answeredCount': row['answered_count'],
+            'duration': round(duration, 1) if duration else None,
+            'userId': row['user_id'],
+            'username': row['username']
+        }
 
     @staticmethod
     def update_status(session_id, status, end_time=None):
@@ -215,9 +266,14 @@ class InterviewSession:
                 "UPDATE interview_sessions SET status = ? WHERE session_id = ?",
                 (status, session_id)
             )
+        updated = cursor.rowcount > 0
+
+        # 会话完成时计入每日统计（需在保存最终评估之后调用）
+        if updated and status == "completed":
+            AnalyticsRollup.record_completion(session_id)
 
         db.commit()
-        return cursor.rowcount > 0
+        return updated
 
     @staticmethod
     def delete(session_id):
@@ -233,18 +289,117 @@ class InterviewSession:
         db = get_db()
         cursor = db.cursor()
 
+        # 从每日统计中扣除该会话
+        AnalyticsRollup.remove_session(cursor, session_id)
+
         # 删除相关记录（先删除外键关联的表）
         cursor.execute(
             "DELETE FROM multimodal_analysis WHERE session_id = ?", (session_id,))
+        cursor.execute(
+            "DELETE FROM multimodal_aggregates WHERE session_id = ?", (session_id,))
+        cursor.execute(
+            "DELETE FROM analysis_time_series WHERE session_id = ?", (session_id,))
         cursor.execute(
             "DELETE FROM interview_questions WHERE session_id = ?", (session_id,))
         cursor.execute(
             "DELETE FROM final_evaluations WHERE session_id = ?", (session_id,))
+        InterviewResult.invalidate(cursor, session_id)
+        cursor.execute(
+            "DELETE FROM user_sessions WHERE session_id = ?", (session_id,))
         cursor.execute(
             "DELETE FROM interview_sessions WHERE session_id = ?", (session_id,))
+        deleted = cursor.rowcount > 0
 
         db.commit()
-        return True
+        return deleted
+
+    @staticmethod
+    def _filter_clause(filters):
+        """
+        根据批量操作的筛选条件构造 WHERE 子句
+
+        Args:
+            filters (dict): 可包含 user_id, username_prefix, status, position_type,
+                difficulty, started_before, started_after
+
+        Returns:
+            tuple: (条件列表, 参数列表)
+        """
+        conditions = []
+        params = []
+
+        if filters.get('user_id') is not None:
+            conditions.append("us.user_id = ?")
+            params.append(filters['user_id'])
+        if filters.get('username_prefix'):
+            conditions.append("u.username LIKE ? ESCAPE '\\'")
+            params.append(escape_like(filters['username_prefix']) + '%')
+        for key in ('status', 'position_type', 'difficulty'):
+            if filters.get(key) is not None:
+                conditions.append(f"s.{key} = ?")
+                params.append(filters[key])
+        if filters.get('started_before') is not None:
+            conditions.append("s.start_time < ?")
+            params.append(filters['started_before'])
+        if filters.get('started_after') is not None:
+            conditions.append("s.start_time >= ?")
+            params.append(filters['started_after'])
+
+        return conditions, params
+
+    @staticmethod
+    def count_matching(filters):
+        """
+        统计符合筛选条件的会话数量
+
+        Args:
+            filters (dict): 筛选条件，见 _filter_clause
+
+        Returns:
+            int: 会话数量
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        conditions, params = InterviewSession._filter_clause(filters)
+        cursor.execute(f"""
+            SELECT COUNT(*) FROM interview_sessions s
+            LEFT JOIN user_sessions us ON us.session_id = s.session_id
+            LEFT JOIN users u ON u.id = us.user_id
+            WHERE {' AND '.join(conditions) or '1 = 1'}
+        """, params)
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def find_ids(filters, after=None, limit=100):
+        """
+        按会话ID顺序分页获取符合筛选条件的会话ID（键集分页，删除数据不影响后续分页）
+
+        Args:
+            filters (dict): 筛选条件，见 _filter_clause
+            after (str, optional): 上一页最后一个会话ID
+            limit (int): 每页数量
+
+        Returns:
+            list: 会话ID列表
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        conditions, params = InterviewSession._filter_clause(filters)
+        if after is not None:
+            conditions.append("s.session_id > ?")
+            params.append(after)
+
+        cursor.execute(f"""
+            SELECT s.session_id FROM interview_sessions s
+            LEFT JOIN user_sessions us ON us.session_id = s.session_id
+            LEFT JOIN users u ON u.id = us.user_id
+            WHERE {' AND '.join(conditions) or '1 = 1'}
+            ORDER BY s.session_id
+            LIMIT ?
+        """, params + [limit])
+        return [row['session_id'] for row in cursor.fetchall()]
 
     @staticmethod
     def get_interview_params(session_id):
@@ -346,6 +501,8 @@ class InterviewQuestion:
                 'question': q['question'],
                 'answer': q['answer'],
                 'evaluation': q['evaluation'],
+                'score': q['score'],
+                'strengths': json.loads(q['strengths']) if q['strengths'] else [],
                 'questionIndex': q['question_index'],
                 'createdAt': q['created_at']
             })
@@ -377,6 +534,8 @@ class InterviewQuestion:
         """
         更新问题的回答和评估
 
+        评估文本在写入时解析一次，得分和优点保存到独立的列中，读取时无需再解析
+
         Args:
             question_id (int): 问题ID
             answer (str): 回答内容
@@ -388,26 +547,123 @@ class InterviewQuestion:
         db = get_db()
         cursor = db.cursor()
 
+        parsed = parse_question_evaluation(evaluation)
+
+        cursor.execute(
+            """UPDATE interview_questions
+            SET answer = ?, evaluation = ?, score = ?, strengths = ?, evaluation_parsed = 1
+            WHERE id = ?""",
+            (answer, evaluation, parsed["score"],
+             json.dumps(parsed["strengths"], ensure_ascii=False), question_id)
+        )
+        updated = cursor.rowcount > 0
+        cursor.execute(
+            """DELETE FROM interview_results WHERE session_id =
+            (SELECT session_id FROM interview_questions WHERE id = ?)""",
+            (question_id,)
+        )
+        db.commit()
+        return updated
+
+    @staticmethod
+    def _parse_evaluations(rows):
+        """解析评估文本，返回 _PARSED_UPDATE_SQL 的参数列表"""
+        updates = []
+        for row in rows:
+            parsed = parse_question_evaluation(row['evaluation'])
+            updates.append((
+                parsed["score"],
+                json.dumps(parsed["strengths"], ensure_ascii=False),
+                row['id']
+            ))
+        return updates
+
+    @staticmethod
+    def backfill_evaluations(batch_size=500):
+        """
+        为历史数据补全评估解析结果（按批提交，避免长时间持有写锁）
+
+        Args:
+            batch_size (int): 每批处理的行数
+
+        Returns:
+            int: 处理的行数
+        """
+        db = get_db()
+        cursor = db.cursor()
+        processed = 0
+        last_id = 0
+
+        while True:
+            cursor.execute(
+                """SELECT id, session_id, evaluation FROM interview_questions
+                WHERE evaluation IS NOT NULL AND evaluation_parsed = 0 AND id > ?
+                ORDER BY id LIMIT ?""",
+                (last_id, batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            cursor.executemany(
+                _PARSED_UPDATE_SQL, InterviewQuestion._parse_evaluations(rows))
+            # 得分变化后，已生成的结果文档需要重建
+            for session_id in {row['session_id'] for row in rows}:
+                InterviewResult.invalidate(cursor, session_id)
+            db.commit()
+
+            processed += len(rows)
+            last_id = rows[-1]['id']
+
+        return processed
+
+    @staticmethod
+    def rescore_sessions(session_ids):
+        """
+        重新解析会话中所有问题的评估文本，更新得分和优点
+
+        Args:
+            session_ids (list): 会话ID列表
+
+        Returns:
+            int: 重新评分的问题数
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        placeholders = ', '.join('?' for _ in session_ids)
         cursor.execute(
-            "UPDATE interview_questions SET answer = ?, evaluation = ? WHERE id = ?",
-            (answer, evaluation, question_id)
+            f"""SELECT id, evaluation FROM interview_questions
+            WHERE evaluation IS NOT NULL AND session_id IN ({placeholders})""",
+            session_ids
         )
+        rows = cursor.fetchall()
+
+        cursor.executemany(
+            _PARSED_UPDATE_SQL, InterviewQuestion._parse_evaluations(rows))
+        for session_id in session_ids:
+            InterviewResult.invalidate(cursor, session_id)
         db.commit()
-        return cursor.rowcount > 0
+        return len(rows)
 
 
 class MultimodalAnalysis:
     """多模态分析模型"""
 
     @staticmethod
-    def create_or_update(session_id, video_analysis=None, audio_analysis=None):
+    def create_or_update(session_id, video_analysis=None, audio_analysis=None, time_series=None,
+                         content_hash=None):
         """
         创建或更新多模态分析数据
 
+        指标以紧凑的二进制格式保存，逐帧时间序列压缩后单独保存，供以后重新评分
+
         Args:
             session_id (str): 会话ID
             video_analysis (dict, optional): 视频分析数据
             audio_analysis (dict, optional): 音频分析数据
+            time_series (dict|bytes, optional): 逐帧时间序列 {名称: 数组}，或 encode_series 编码后的数据
+            content_hash (str, optional): 分析的视频内容的 SHA-256
 
         Returns:
             int: 分析ID
@@ -419,47 +675,94 @@ class MultimodalAnalysis:
         cursor = db.cursor()
 
         # 准备多模态数据
-        video_json = json.dumps(video_analysis) if video_analysis else None
+        video_metrics = encode_metrics(
+            'video', video_analysis) if video_analysis else None
 
-        audio_json = json.dumps(
-            audio_analysis, cls=Float32JSONEncoder
-        ) if audio_analysis else None
+        audio_metrics = encode_metrics(
+            'audio', audio_analysis) if audio_analysis else None
 
         # 检查是否已有记录
         cursor.execute(
-            "SELECT id FROM multimodal_analysis WHERE session_id = ?",
+            "SELECT * FROM multimodal_analysis WHERE session_id = ?",
             (session_id,)
         )
         existing = cursor.fetchone()
 
+        # 在同一事务中更新会话的聚合统计：每个会话只保存一条分析数据，
+        # 重新上传时先扣除被替换的那条数据，避免同一会话被重复计入
+        for modality, sample in (('video', video_analysis), ('audio', audio_analysis)):
+            if not sample:
+                continue
+            if existing:
+                MultimodalAnalysis._retract(
+                    cursor, session_id, modality, MultimodalAnalysis._decode(existing, modality))
+            MultimodalAnalysis._accumulate(cursor, session_id, modality, sample)
+
+        if time_series:
+            MultimodalAnalysis._save_time_series(
+                cursor, session_id, time_series)
+
         if existing:
-            # 更新现有记录
+            # 更新现有记录，同时清除旧版 JSON 格式的数据
             update_fields = []
             update_values = []
 
             if video_analysis:
-                update_fields.append("video_analysis = ?")
-                update_values.append(video_json)
+                update_fields.append("video_metrics = ?, video_analysis = NULL")
+                update_values.append(video_metrics)
 
             if audio_analysis:
-                update_fields.append("audio_analysis = ?")
-                update_values.append(audio_json)
+                update_fields.append("audio_metrics = ?, audio_analysis = NULL")
+                update_values.append(audio_metrics)
 
             if update_fields:
+                update_fields.append("content_hash = ?")
+                update_values.append(content_hash)
                 cursor.execute(
                     f"UPDATE multimodal_analysis SET {', '.join(update_fields)} WHERE id = ?",
                     tuple(update_values + [existing['id']])
                 )
+                InterviewResult.invalidate(cursor, session_id)
                 db.commit()
                 return existing['id']
         else:
             # 创建新记录
             cursor.execute(
-                "INSERT INTO multimodal_analysis (session_id, video_analysis, audio_analysis, created_at) VALUES (?, ?, ?, ?)",
-                (session_id, video_json, audio_json, datetime.now())
+                "INSERT INTO multimodal_analysis (session_id, video_metrics, audio_metrics, content_hash, created_at) VALUES (?, ?, ?, ?, ?)",
+                (session_id, video_metrics, audio_metrics, content_hash, datetime.now())
             )
+            analysis_id = cursor.lastrowid
+            InterviewResult.invalidate(cursor, session_id)
             db.commit()
-            return cursor.lastrowid
+            return analysis_id
+
+    @staticmethod
+    def _decode(row, modality):
+        """读取一行中某个模态的分析数据，兼容旧版 JSON 格式"""
+        blob = row[f'{modality}_metrics']
+        if blob is not None:
+            return decode_metrics(modality, blob)
+
+        legacy = row[f'{modality}_analysis']
+        return json.loads(legacy) if legacy else None
+
+    @staticmethod
+    def content_hash(session_id):
+        """
+        会话已保存的分析数据对应的视频内容哈希
+
+        Returns:
+            str: SHA-256，没有分析数据或来源未知时返回 None
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute(
+            "SELECT content_hash FROM multimodal_analysis WHERE session_id = ?",
+            (session_id,)
+        )
+        row = cursor.fetchone()
+        return row['content_hash'] if row else None
 
     @staticmethod
     def get_for_session(session_id):
@@ -484,18 +787,164 @@ class MultimodalAnalysis:
         for a in cursor.fetchall():
             analyses.append({
                 'id': a['id'],
-                'videoAnalysis': json.loads(a['video_analysis']) if a['video_analysis'] else None,
-                'audioAnalysis': json.loads(a['audio_analysis']) if a['audio_analysis'] else None,
+                'videoAnalysis': MultimodalAnalysis._decode(a, 'video'),
+                'audioAnalysis': MultimodalAnalysis._decode(a, 'audio'),
                 'createdAt': a['created_at']
             })
 
         return analyses
 
+    @staticmethod
+    def _save_time_series(cursor, session_id, time_series):
+        """压缩并保存一次分析的逐帧时间序列（已编码的数据直接保存）"""
+        if isinstance(time_series, (bytes, memoryview)):
+            data = bytes(time_series)
+        else:
+            data = encode_series(time_series)
+        if data is None:
+            return
+
+        cursor.execute(
+            "INSERT INTO analysis_time_series (session_id, data, created_at) VALUES (?, ?, ?)",
+            (session_id, data, datetime.now())
+        )
+
+    @staticmethod
+    def get_time_series(session_id):
+        """
+        获取会话每次分析保存的逐帧时间序列
+
+        Args:
+            session_id (str): 会话ID
+
+        Returns:
+            list: [{"id", "series": {名称: numpy 数组}, "createdAt"}]
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute(
+            "SELECT id, data, created_at FROM analysis_time_series WHERE session_id = ? ORDER BY id",
+            (session_id,)
+        )
+
+        return [
+            {
+                'id': row['id'],
+                'series': decode_series(row['data']),
+                'createdAt': row['created_at']
+            }
+            for row in cursor.fetchall()
+        ]
+
+    @staticmethod
+    def _metric_values(modality, sample):
+        """提取一条分析数据中参与聚合的指标值，缺失的指标按0计"""
+        values = []
+        for metric in AGGREGATE_METRICS[modality]:
+            value = to_number(sample.get(metric, 0))
+            values.append((metric, value if value is not None else 0.0))
+        return values
+
+    @staticmethod
+    def _accumulate(cursor, session_id, modality, sample):
+        """
+        将一条分析数据累加到会话的聚合统计中（次数、总和、平方和、最小值、最大值）
+
+        Args:
+            cursor (Cursor): 游标
+            session_id (str): 会话ID
+            modality (str): 'video' 或 'audio'
+            sample (dict|None): 分析数据
+        """
+        if not sample:
+            return
+
+        cursor.executemany(
+            """INSERT INTO multimodal_aggregates
+            (session_id, modality, metric, sample_count, total, total_sq, min_value, max_value)
+            VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+            ON CONFLICT (session_id, modality, metric) DO UPDATE SET
+                sample_count = multimodal_aggregates.sample_count + 1,
+                total = multimodal_aggregates.total + excluded.total,
+                total_sq = multimodal_aggregates.total_sq + excluded.total_sq,
+                min_value = CASE WHEN multimodal_aggregates.sample_count = 0
+                        OR excluded.min_value < multimodal_aggregates.min_value
+                    THEN excluded.min_value ELSE multimodal_aggregates.min_value END,
+                max_value = CASE WHEN multimodal_aggregates.sample_count = 0
+                        OR excluded.max_value > multimodal_aggregates.max_value
+                    THEN excluded.max_value ELSE multimodal_aggregates.max_value END""",
+            [
+                (session_id, modality, metric, value, value * value, value, value)
+                for metric, value in MultimodalAnalysis._metric_values(modality, sample)
+            ]
+        )
+
+    @staticmethod
+    def _retract(cursor, session_id, modality, sample):
+        """
+        从会话的聚合统计中扣除一条被替换的分析数据
+
+        最小值、最大值无法扣除，次数归零后由下一次累加重置
+
+        Args:
+            cursor (Cursor): 游标
+            session_id (str): 会话ID
+            modality (str): 'video' 或 'audio'
+            sample (dict|None): 被替换的分析数据
+        """
+        if not sample:
+            return
+
+        cursor.executemany(
+            """UPDATE multimodal_aggregates SET
+                sample_count = sample_count - 1,
+                total = total - ?,
+                total_sq = total_sq - ?
+            WHERE session_id = ? AND modality = ? AND metric = ? AND sample_count > 0""",
+            [
+                (value, value * value, session_id, modality, metric)
+                for metric, value in MultimodalAnalysis._metric_values(modality, sample)
+            ]
+        )
+
+    @staticmethod
+    def _summarize(stats):
+        """
+        根据聚合统计计算会话级指标
+
+        Args:
+            stats (dict): {指标: (次数, 总和, 平方和, 最小值, 最大值)}
+
+        Returns:
+            dict: 各指标的平均值（计数类指标为总和），以及 variance/min/max 明细
+        """
+        summary = {}
+        variance = {}
+        minimum = {}
+        maximum = {}
+
+        for metric, (count, total, total_sq, min_value, max_value) in stats.items():
+            mean = total / count
+            summary[metric] = total if metric in SUMMED_METRICS else mean
+            # 总体方差，浮点误差可能产生极小的负数
+            variance[metric] = max(total_sq / count - mean * mean, 0.0)
+            minimum[metric] = min_value
+            maximum[metric] = max_value
+
+        if summary:
+            summary['variance'] = variance
+            summary['min'] = minimum
+            summary['max'] = maximum
+        return summary
+
     @staticmethod
     def aggregate_for_session(session_id):
         """
         聚合会话的多模态分析数据
 
+        直接读取 create_or_update 时累加的统计行，不再逐条解析分析数据
+
         Args:
             session_id (str): 会话ID
 
@@ -506,48 +955,39 @@ class MultimodalAnalysis:
         cursor = db.cursor()
 
         cursor.execute(
-            "SELECT video_analysis, audio_analysis FROM multimodal_analysis WHERE session_id = ? ORDER BY created_at",
+            """SELECT modality, metric, sample_count, total, total_sq, min_value, max_value
+            FROM multimodal_aggregates WHERE session_id = ?""",
             (session_id,)
         )
-        multimodal_data = cursor.fetchall()
-
-        # 整合多模态分析数据
-        aggregated_video_analysis = {}
-        aggregated_audio_analysis = {}
-
-        if multimodal_data:
-            # 计算平均值
-            video_samples = []
-            audio_samples = []
-
-            for record in multimodal_data:
-                if record["video_analysis"]:
-                    video_data = json.loads(record["video_analysis"])
-                    video_samples.append(video_data)
-
-                if record["audio_analysis"]:
-                    audio_data = json.loads(record["audio_analysis"])
-                    audio_samples.append(audio_data)
-
-            # 处理视频分析数据
-            if video_samples:
-                aggregated_video_analysis = {
-                    "eyeContact": sum(v.get("eyeContact", 0) for v in video_samples) / len(video_samples),
-                    "facialExpressions": sum(v.get("facialExpressions", 0) for v in video_samples) / len(video_samples),
-                    "bodyLanguage": sum(v.get("bodyLanguage", 0) for v in video_samples) / len(video_samples),
-                    "confidence": sum(v.get("confidence", 0) for v in video_samples) / len(video_samples)
-                }
-
-            # 处理音频分析数据
-            if audio_samples:
-                aggregated_audio_analysis = {
-                    "clarity": sum(a.get("clarity", 0) for a in audio_samples) / len(audio_samples),
-                    "pace": sum(a.get("pace", 0) for a in audio_samples) / len(audio_samples),
-                    "tone": sum(a.get("tone", 0) for a in audio_samples) / len(audio_samples),
-                    "fillerWordsCount": sum(a.get("fillerWordsCount", 0) for a in audio_samples)
-                }
-
-        return aggregated_video_analysis, aggregated_audio_analysis
+        rows = cursor.fetchall()
+
+        stats = {modality: {} for modality in AGGREGATE_METRICS}
+
+        if rows:
+            for row in rows:
+                if row['modality'] in stats and row['sample_count']:
+                    stats[row['modality']][row['metric']] = (
+                        row['sample_count'], row['total'], row['total_sq'],
+                        row['min_value'], row['max_value']
+                    )
+        else:
+            # 没有聚合统计的历史会话，使用保存的分析数据计算
+            for analysis in MultimodalAnalysis.get_for_session(session_id):
+                for modality, key in (('video', 'videoAnalysis'), ('audio', 'audioAnalysis')):
+                    if not analysis[key]:
+                        continue
+                    for metric, value in MultimodalAnalysis._metric_values(modality, analysis[key]):
+                        count, total, total_sq, min_value, max_value = stats[modality].get(
+                            metric, (0, 0.0, 0.0, value, value))
+                        stats[modality][metric] = (
+                            count + 1, total + value, total_sq + value * value,
+                            min(min_value, value), max(max_value, value)
+                        )
+
+        return (
+            MultimodalAnalysis._summarize(stats['video']),
+            MultimodalAnalysis._summarize(stats['audio'])
+        )
 
 
 class FinalEvaluation:
@@ -586,8 +1026,10 @@ class FinalEvaluation:
             (session_id, overall_score, content_score, delivery_score, nonverbal_score,
                 strengths_json, improvements_json, recommendations, datetime.now())
         )
+        evaluation_id = cursor.lastrowid
+        InterviewResult.invalidate(cursor, session_id)
         db.commit()
-        return cursor.lastrowid
+        return evaluation_id
 
     @staticmethod
     def get_for_session(session_id):
@@ -610,17 +1052,178 @@ class FinalEvaluation:
         return cursor.fetchone()
 
 
+class InterviewResult:
+    """
+    面试结果文档模型
+
+    已完成会话的结果文档在面试结束时生成一次，以 gzip 压缩的 JSON 保存，
+    读取时直接返回。相关数据被修改时删除文档，下次读取时重新生成。
+    """
+
+    @staticmethod
+    def build(session_id):
+        """
+        根据问题、多模态分析和最终评估生成结果数据
+
+        Args:
+            session_id (str): 会话ID
+
+        Returns:
+            dict|None: 结果数据，没有最终评估时返回None
+        """
+        final_eval_record = FinalEvaluation.get_for_session(session_id)
+        if not final_eval_record:
+            return None
+
+        # 提取问题得分
+        question_scores = []
+
+        for q in InterviewQuestion.get_all_for_session(session_id):
+            if q['answer'] and q['evaluation']:
+                # 得分在写入时已解析，无法解析时使用默认分数
+                score = q['score'] if q['score'] is not None else 75
+
+                question_scores.append({
+                    'question': q['question'],
+                    'answer': q['answer'],
+                    'score': score,
+                    'feedback': q['evaluation']
+                })
+
+        # 如果有多模态分析数据，使用最新的一条
+        analyses = MultimodalAnalysis.get_for_session(session_id)
+        latest_analysis = analyses[-1] if analyses else {}
+
+        strengths = json.loads(
+            final_eval_record['strengths']
+        ) if final_eval_record['strengths'] else []
+
+        improvements = json.loads(
+            final_eval_record['improvements']
+        ) if final_eval_record['improvements'] else []
+
+        return {
+            'overallScore': final_eval_record['overall_score'],
+            'contentScore': final_eval_record['content_score'],
+            'deliveryScore': final_eval_record['delivery_score'],
+            'nonVerbalScore': final_eval_record['nonverbal_score'],
+            'strengths': strengths,
+            'improvements': improvements,
+            'questionScores': question_scores,
+            'videoAnalysis': latest_analysis.get('videoAnalysis'),
+            'audioAnalysis': latest_analysis.get('audioAnalysis'),
+            'recommendations': final_eval_record['recommendations']
+        }
+
+    @staticmethod
+    def _encode(results):
+        """序列化并压缩结果数据，返回 (压缩文档, ETag)"""
+        body = current_app.json.dumps_bytes(results)
+        etag = f"results-{hashlib.sha1(body).hexdigest()}"
+        return gzip.compress(body, mtime=0), etag
+
+    @staticmethod
+    def get(session_id):
+        """
+        获取已生成的结果文档
+
+        Args:
+            session_id (str): 会话ID
+
+        Returns:
+            dict|None: {"document": 压缩文档, "etag": ETag}
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute(
+            "SELECT document, etag FROM interview_results WHERE session_id = ?",
+            (session_id,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        # PostgreSQL 的 BYTEA 列以 memoryview 返回
+        return {"document": bytes(row['document']), "etag": row['etag']}
+
+    @staticmethod
+    def materialize(session_id):
+        """
+        生成并保存结果文档，在会话完成时调用
+
+        Args:
+            session_id (str): 会话ID
+
+        Returns:
+            dict|None: {"document": 压缩文档, "etag": ETag}，没有最终评估时返回None
+        """
+        results = InterviewResult.build(session_id)
+        if results is None:
+            return None
+
+        document, etag = InterviewResult._encode(results)
+
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute(
+            """INSERT INTO interview_results (session_id, document, etag, created_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (session_id) DO UPDATE
+            SET document = excluded.document, etag = excluded.etag, created_at = excluded.created_at""",
+            (session_id, document, etag, datetime.now())
+        )
+        db.commit()
+        return {"document": document, "etag": etag}
+
+    @staticmethod
+    def get_or_build(session_id, store=True):
+        """
+        获取结果文档，不存在时重新生成
+
+        Args:
+            session_id (str): 会话ID
+            store (bool): 是否保存重新生成的文档（仅已完成的会话应保存）
+
+        Returns:
+            dict|None: {"document": 压缩文档, "etag": ETag}
+        """
+        stored = InterviewResult.get(session_id)
+        if stored:
+            return stored
+
+        if store:
+            return InterviewResult.materialize(session_id)
+
+        results = InterviewResult.build(session_id)
+        if results is None:
+            return None
+        document, etag = InterviewResult._encode(results)
+        return {"document": document, "etag": etag}
+
+    @staticmethod
+    def invalidate(cursor, session_id):
+        """删除会话的结果文档，需要在修改相关数据的同一事务中调用"""
+        cursor.execute(
+            "DELETE FROM interview_results WHERE session_id = ?", (session_id,)
+        )
+
+
 class InterviewPreset:
     """面试预设场景模型"""
 
     @staticmethod
     def get_all():
         """
-        获取所有面试预设场景
+        获取所有面试预设场景（读缓存）
 
         Returns:
             list: 预设场景列表
         """
+        return interview_presets_cache.get()
+
+    @staticmethod
+    def _query_all():
+        """从数据库查询所有面试预设场景"""
         db = get_db()
         cursor = db.cursor()
 
@@ -644,7 +1247,7 @@ class InterviewPreset:
     @staticmethod
     def get_by_id(preset_id):
         """
-        根据ID获取面试预设场景
+        根据ID获取面试预设场景（读缓存）
 
         Args:
             preset_id (int): 预设场景ID
@@ -652,24 +1255,23 @@ class InterviewPreset:
         Returns:
             dict|None: 预设场景信息
         """
-        db = get_db()
-        cursor = db.cursor()
+        return InterviewPreset.find(InterviewPreset.get_all(), preset_id)
 
-        cursor.execute(
-            "SELECT * FROM interview_presets WHERE id = ?",
-            (preset_id,)
-        )
+    @staticmethod
+    def find(presets, preset_id):
+        """
+        在预设场景列表中按ID查找
 
-        preset = cursor.fetchone()
-        if preset:
-            return {
-                'id': preset['id'],
-                'name': preset['name'],
-                'description': preset['description'],
-                'interviewParams': json.loads(preset['interview_params']) if preset['interview_params'] else {},
-                'createdAt': preset['created_at'],
-                'updatedAt': preset['updated_at']
-            }
+        Args:
+            presets (list): 预设场景列表
+            preset_id (int): 预设场景ID
+
+        Returns:
+            dict|None: 预设场景信息
+        """
+        for preset in presets:
+            if preset['id'] == preset_id:
+                return preset
         return None
 
     @staticmethod
@@ -697,8 +1299,11 @@ class InterviewPreset:
             "INSERT INTO interview_presets (name, description, interview_params, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
             (name, description, interview_params_json, created_at, updated_at)
         )
+        preset_id = cursor.lastrowid
+        interview_presets_cache.bump_version(cursor)
         db.commit()
-        return cursor.lastrowid
+        interview_presets_cache.invalidate()
+        return preset_id
 
     @staticmethod
     def update(preset_id, name=None, description=None, interview_params=None):
@@ -742,8 +1347,12 @@ class InterviewPreset:
                 f"UPDATE interview_presets SET {', '.join(update_fields)} WHERE id = ?",
                 tuple(update_values)
             )
+            updated = cursor.rowcount > 0
+            if updated:
+                interview_presets_cache.bump_version(cursor)
             db.commit()
-            return cursor.rowcount > 0
+            interview_presets_cache.invalidate()
+            return updated
         return False
 
     @staticmethod
@@ -764,5 +1373,14 @@ class InterviewPreset:
             "DELETE FROM interview_presets WHERE id = ?",
             (preset_id,)
         )
+        deleted = cursor.rowcount > 0
+        if deleted:
+            interview_presets_cache.bump_version(cursor)
         db.commit()
-        return cursor.rowcount > 0
+        interview_presets_cache.invalidate()
+        return deleted
+
+
+# 面试预设场景缓存，管理员增删改时通过版本号失效
+interview_presets_cache = VersionedCache(
+    'interview_presets', InterviewPreset._query_all)
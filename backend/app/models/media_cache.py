@@ -0,0 +1,127 @@
+"""
+媒体分析缓存相关的数据库模型
+按 (视频内容哈希, 分析算法版本) 保存分析结果，重复提交的同一段录像直接复用
+"""
+
+import json
+from datetime import datetime
+
+from app.utils.db import get_db
+
+
+class MediaAnalysisCache:
+    """媒体分析结果缓存模型"""
+
+    @staticmethod
+    def get(content_hash, analyzer_version):
+        """
+        获取缓存的分析结果，并记录本次使用时间
+
+        Args:
+            content_hash (str): 视频内容的 SHA-256
+            analyzer_version (int): 分析算法版本
+
+        Returns:
+            dict: {"video_analysis", "audio_analysis", "time_series"}，
+                  time_series 为 encode_series 编码后的数据；未命中时返回 None
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute(
+            """
+            SELECT video_analysis, audio_analysis, time_series FROM media_analysis_cache
+            WHERE content_hash = ? AND analyzer_version = ?
+            """,
+            (content_hash, analyzer_version)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        cursor.execute(
+            """
+            UPDATE media_analysis_cache SET hits = hits + 1, last_used_at = ?
+            WHERE content_hash = ? AND analyzer_version = ?
+            """,
+            (datetime.now(), content_hash, analyzer_version)
+        )
+        db.commit()
+
+        return {
+            "video_analysis": json.loads(row['video_analysis']),
+            "audio_analysis": json.loads(row['audio_analysis']),
+            "time_series": bytes(row['time_series']) if row['time_series'] is not None else None,
+        }
+
+    @staticmethod
+    def put(content_hash, analyzer_version, video_analysis, audio_analysis, time_series):
+        """
+        保存分析结果，同一内容已有缓存时保留原有结果
+
+        Args:
+            content_hash (str): 视频内容的 SHA-256
+            analyzer_version (int): 分析算法版本
+            video_analysis (str): 视频分析数据（JSON）
+            audio_analysis (str): 音频分析数据（JSON）
+            time_series (bytes): encode_series 编码后的逐帧时间序列，可以为 None
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        now = datetime.now()
+        size = len(video_analysis) + len(audio_analysis) + len(time_series or b'')
+        cursor.execute(
+            """
+            INSERT INTO media_analysis_cache
+                (content_hash, analyzer_version, video_analysis, audio_analysis, time_series,
+                 size_bytes, hits, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)
+            ON CONFLICT (content_hash, analyzer_version) DO NOTHING
+            """,
+            (content_hash, analyzer_version, video_analysis, audio_analysis, time_series,
+             size, now, now)
+        )
+        db.commit()
+
+    @staticmethod
+    def evict(cutoff, max_bytes):
+        """
+        淘汰缓存：删除创建时间早于 cutoff 的结果，总大小仍超过 max_bytes 时按最近使用时间从早到晚删除
+
+        Args:
+            cutoff (datetime): 截止时间
+            max_bytes (int): 缓存总大小上限（字节）
+
+        Returns:
+            int: 删除的结果数
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute("DELETE FROM media_analysis_cache WHERE created_at < ?", (cutoff,))
+        removed = cursor.rowcount
+
+        cursor.execute("SELECT COALESCE(SUM(size_bytes), 0) AS total FROM media_analysis_cache")
+        excess = cursor.fetchone()['total'] - max_bytes
+        if excess > 0:
+            cursor.execute(
+                """
+                SELECT content_hash, analyzer_version, size_bytes FROM media_analysis_cache
+                ORDER BY last_used_at
+                """
+            )
+            victims = []
+            for row in cursor.fetchall():
+                if excess <= 0:
+                    break
+                victims.append((row['content_hash'], row['analyzer_version']))
+                excess -= row['size_bytes']
+            cursor.executemany(
+                "DELETE FROM media_analysis_cache WHERE content_hash = ? AND analyzer_version = ?",
+                victims
+            )
+            removed += len(victims)
+
+        db.commit()
+        return removed
@@ -3,6 +3,8 @@
 """
 
 from datetime import datetime
+
+from app.utils.cache import VersionedCache
 from app.utils.db import get_db
 
 
@@ -12,11 +14,16 @@ class PositionType:
     @staticmethod
     def get_all():
         """
-        获取所有职位类型
+        获取所有职位类型（读缓存）
 
         Returns:
             list: 职位类型列表
         """
+        return position_types_cache.get()
+
+    @staticmethod
+    def _query_all():
+        """从数据库查询所有职位类型"""
         db = get_db()
         cursor = db.cursor()
 
@@ -123,10 +130,13 @@ class PositionType:
             "INSERT INTO position_types (value, label, description, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
             (value, label, description, now, now)
         )
+        position_id = cursor.lastrowid
+        position_types_cache.bump_version(cursor)
         db.commit()
+        position_types_cache.invalidate()
 
         # 返回新插入的ID
-        return cursor.lastrowid
+        return position_id
 
     @staticmethod
     def update(position_id, value, label, description=""):
@@ -159,8 +169,12 @@ class PositionType:
             "UPDATE position_types SET value = ?, label = ?, description = ?, updated_at = ? WHERE id = ?",
             (value, label, description, now, position_id)
         )
+        updated = cursor.rowcount > 0
+        if updated:
+            position_types_cache.bump_version(cursor)
         db.commit()
-        return cursor.rowcount > 0
+        position_types_cache.invalidate()
+        return updated
 
     @staticmethod
     def delete(position_id):
@@ -189,8 +203,12 @@ class PositionType:
         cursor.execute(
             "DELETE FROM position_types WHERE id = ?", (position_id,)
         )
+        deleted = cursor.rowcount > 0
+        if deleted:
+            position_types_cache.bump_version(cursor)
         db.commit()
-        return cursor.rowcount > 0
+        position_types_cache.invalidate()
+        return deleted
 
     @staticmethod
     def get_usage_count(position_id):
@@ -211,3 +229,7 @@ class PositionType:
             (position_id,)
         )
         return cursor.fetchone()[0]
+
+
+# 职位类型缓存，管理员增删改时通过版本号失效
+position_types_cache = VersionedCache('position_types', PositionType._query_all)
@@ -0,0 +1,207 @@
+"""
+全文搜索相关的数据库模型
+基于面试问题表的全文索引，按关键词检索问题、回答和评估内容
+"""
+
+import html
+import re
+
+from app.utils.db import escape_like, get_db, get_storage
+
+# 被索引的列，与 init_db 中建立全文索引时的列一致
+SEARCH_COLUMNS = ('question', 'answer', 'evaluation')
+
+# trigram 分词器只能用索引匹配不少于三个字符的关键词
+MIN_INDEXED_LENGTH = 3
+
+# 单次搜索最多使用的关键词数量
+MAX_TERMS = 8
+
+# 摘要的最大长度（字符）
+SNIPPET_LENGTH = 80
+
+
+def parse_terms(query):
+    """
+    将搜索字符串按空白拆分为关键词，去重并保持顺序
+
+    Args:
+        query (str): 搜索字符串
+
+    Returns:
+        list: 关键词列表
+    """
+    terms = []
+    for term in (query or '').split():
+        if term.lower() not in (t.lower() for t in terms):
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+def _match_expression(terms):
+    """构造 FTS5 查询表达式，每个关键词作为短语匹配，多个关键词之间为 AND"""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _like_pattern(term):
+    """构造 LIKE 子串匹配模式，转义通配符"""
+    return f"%{escape_like(term)}%"
+
+
+def make_snippet(text, pattern, length=SNIPPET_LENGTH):
+    """
+    截取包含第一个关键词的文本片段，HTML 转义后用 <mark> 标记所有关键词
+
+    Args:
+        text (str): 原文
+        pattern (Pattern): 匹配任一关键词的正则（忽略大小写）
+        length (int): 片段最大长度
+
+    Returns:
+        str|None: HTML 片段，原文不包含关键词时返回 None
+    """
+    if not text:
+        return None
+    match = pattern.search(text)
+    if not match:
+        return None
+
+    # 关键词前保留约三分之一的上下文
+    start = max(0, min(match.start() - length // 3, len(text) - length))
+    end = min(len(text), max(start + length, match.end()))
+    fragment = text[start:end]
+
+    parts = ['…' if start > 0 else '']
+    position = 0
+    for m in pattern.finditer(fragment):
+        parts.append(html.escape(fragment[position:m.start()]))
+        parts.append(f"<mark>{html.escape(m.group())}</mark>")
+        position = m.end()
+    parts.append(html.escape(fragment[position:]))
+    parts.append('…' if end < len(text) else '')
+    return ''.join(parts)
+
+
+class QuestionSearch:
+    """面试问题全文搜索"""
+
+    @staticmethod
+    def search(query, limit=20, offset=0):
+        """
+        按关键词搜索问题、回答和评估，结果按相关度（bm25）排序
+
+        不少于三个字符的关键词通过全文索引匹配；更短的关键词（如两个字的中文词）
+        只在索引命中的结果中过滤。仅包含短关键词时无法使用索引，退化为子串扫描，
+        结果按时间倒序排列。
+
+        Args:
+            query (str): 搜索字符串，多个关键词以空白分隔
+            limit (int): 返回数量限制
+            offset (int): 偏移量
+
+        Returns:
+            dict: {'total': 命中总数, 'results': 当前页结果}
+
+        Raises:
+            ValueError: 搜索字符串为空
+            NotImplementedError: 当前数据库后端不支持全文搜索
+        """
+        terms = parse_terms(query)
+        if not terms:
+            raise ValueError("搜索关键词不能为空")
+
+        db = get_db()
+        cursor = db.cursor()
+
+        index = get_storage().search_index(cursor, 'interview_questions')
+        if index is None:
+            raise NotImplementedError("当前数据库不支持全文搜索")
+
+        indexed = [t for t in terms if len(t) >= MIN_INDEXED_LENGTH]
+        short = [t for t in terms if len(t) < MIN_INDEXED_LENGTH]
+
+        # 先只在索引（或问题表）上确定当前页的问题ID，再关联会话和用户信息，
+        # 避免对全部命中行做关联
+        conditions = []
+        params = []
+        if indexed:
+            source = index
+            conditions.append(f"{index} MATCH ?")
+            params.append(_match_expression(indexed))
+            rank = f"bm25({index})"
+            order = "rank, rowid DESC"
+        else:
+            source = "interview_questions"
+            rank = "NULL"
+            order = "rowid DESC"
+
+        for term in short:
+            conditions.append('(' + ' OR '.join(
+                f"{column} LIKE ? ESCAPE '\\'" for column in SEARCH_COLUMNS
+            ) + ')')
+            params.extend([_like_pattern(term)] * len(SEARCH_COLUMNS))
+
+        where = ' AND '.join(conditions)
+
+        cursor.execute(f"SELECT COUNT(*) FROM {source} WHERE {where}", params)
+        total = cursor.fetchone()[0]
+
+        cursor.execute(f"""
+            WITH hits AS (
+                SELECT rowid AS id, {rank} AS rank FROM {source}
+                WHERE {where}
+                ORDER BY {order}
+                LIMIT ? OFFSET ?
+            )
+            SELECT q.id, q.session_id, q.question_index, q.question, q.answer,
+                q.evaluation, q.score, hits.rank,
+                s.position_type, s.difficulty, s.start_time, u.id AS user_id, u.username
+            FROM hits
+            JOIN interview_questions q ON q.id = hits.id
+            LEFT JOIN interview_sessions s ON s.session_id = q.session_id
+            LEFT JOIN user_sessions us ON us.session_id = q.session_id
+            LEFT JOIN users u ON u.id = us.user_id
+            ORDER BY hits.rank, q.id DESC
+        """, params + [limit, offset])
+
+        pattern = re.compile(
+            '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)),
+            re.IGNORECASE
+        )
+
+        results = []
+        for row in cursor.fetchall():
+            snippets = {
+                column: make_snippet(row[column], pattern)
+                for column in SEARCH_COLUMNS
+            }
+            results.append({
+                'questionId': row['id'],
+                'sessionId': row['session_id'],
+                'questionIndex': row['question_index'],
+                'question': row['question'],
+                'score': row['score'],
+                'rank': row['rank'],
+                'positionType': row['position_type'],
+                'difficulty': row['difficulty'],
+                'startTime': row['start_time'],
+                'userId': row['user_id'],
+                'username': row['username'],
+                'snippets': {k: v for k, v in snippets.items() if v is not None}
+            })
+
+        return {'total': total, 'results': results}
+
+    @staticmethod
+    def rebuild():
+        """
+        根据问题表内容重建全文索引
+
+        Returns:
+            bool: 是否已重建，数据库不支持全文搜索时返回 False
+        """
+        db = get_db()
+        cursor = db.cursor()
+        rebuilt = get_storage().rebuild_search_index(cursor, 'interview_questions')
+        db.commit()
+        return rebuilt
@@ -0,0 +1,153 @@
+"""
+分片上传相关的数据库模型
+记录视频分片上传的进度，以及上传过程中已经完成的逐帧采样和音频片段识别结果
+"""
+
+import json
+import uuid
+from datetime import datetime
+
+from app.utils.db import get_db
+from flask import current_app
+
+# 上传状态
+UPLOADING = 'uploading'
+FINALIZED = 'finalized'
+
+
+class VideoUpload:
+    """视频分片上传模型"""
+
+    @staticmethod
+    def create(user_id, session_id, path, total_size=None):
+        """
+        创建上传记录
+
+        Args:
+            user_id (int): 用户ID
+            session_id (str): 面试会话ID
+            path (str): 保存视频的文件路径
+            total_size (int, optional): 视频总字节数，未知时在完成上传时确定
+
+        Returns:
+            str: 上传ID
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        upload_id = uuid.uuid4().hex
+        now = datetime.now()
+        cursor.execute(
+            """
+            INSERT INTO video_uploads
+                (upload_id, user_id, session_id, path, total_size, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (upload_id, user_id, session_id, path, total_size, UPLOADING, now, now)
+        )
+        db.commit()
+        return upload_id
+
+    @staticmethod
+    def get(upload_id):
+        """
+        获取上传记录
+
+        Returns:
+            dict: 上传记录（frames、filler_counts 已解析），不存在时返回 None
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute(
+            """
+            SELECT upload_id, user_id, session_id, path, total_size, received, status,
+                   frames, filler_counts, analyzed_bytes
+            FROM video_uploads WHERE upload_id = ?
+            """,
+            (upload_id,)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        upload = dict(row)
+        upload['frames'] = json.loads(row['frames']) if row['frames'] else None
+        upload['filler_counts'] = json.loads(row['filler_counts']) if row['filler_counts'] else {}
+        return upload
+
+    @staticmethod
+    def advance(upload_id, offset, new_offset):
+        """
+        记录新接收的分片，仅当当前进度仍为 offset 时更新
+
+        Returns:
+            bool: 是否更新成功
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute(
+            """
+            UPDATE video_uploads SET received = ?, updated_at = ?
+            WHERE upload_id = ? AND received = ? AND status = ?
+            """,
+            (new_offset, datetime.now(), upload_id, offset, UPLOADING)
+        )
+        db.commit()
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def save_progress(upload_id, frames, filler_counts, analyzed_bytes):
+        """
+        保存增量分析的结果
+
+        Args:
+            upload_id (str): 上传ID
+            frames (dict): 已完成的逐帧统计，未完成时为 None
+            filler_counts (dict): 已识别的音频片段 {片段序号: 填充词数}
+            analyzed_bytes (int): 本次分析时已接收的字节数
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute(
+            """
+            UPDATE video_uploads SET frames = ?, filler_counts = ?, analyzed_bytes = ?
+            WHERE upload_id = ?
+            """,
+            (
+                current_app.json.dumps(frames) if frames is not None else None,
+                json.dumps(filler_counts),
+                analyzed_bytes,
+                upload_id
+            )
+        )
+        db.commit()
+
+    @staticmethod
+    def set_status(upload_id, status, expected):
+        """
+        修改上传状态，仅当当前状态为 expected 时修改
+
+        Returns:
+            bool: 是否修改成功
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute(
+            "UPDATE video_uploads SET status = ?, updated_at = ? WHERE upload_id = ? AND status = ?",
+            (status, datetime.now(), upload_id, expected)
+        )
+        db.commit()
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def delete(upload_id):
+        """删除上传记录"""
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute("DELETE FROM video_uploads WHERE upload_id = ?", (upload_id,))
+        db.commit()
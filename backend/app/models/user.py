@@ -2,10 +2,17 @@
 用户相关的数据库模型
 """
 
-import hashlib
 from datetime import datetime
 
-from app.utils.db import get_db
+from app.utils.cache import TTLCache
+from app.utils.db import escape_like, get_db
+from app.utils.password import (hash_password_in_pool, needs_rehash,
+                                verify_password_in_pool)
+from config import Config
+
+# 用户认证状态缓存（状态和令牌吊销版本号），避免每个请求都查询数据库
+auth_state_cache = TTLCache(
+    maxsize=Config.AUTH_CACHE_SIZE, ttl=Config.AUTH_CACHE_TTL)
 
 
 class User:
@@ -33,8 +40,8 @@ class User:
         if cursor.fetchone() is not None:
             return None
 
-        # 密码加密
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
+        # 密码加密（加盐哈希，在哈希线程池中计算）
+        password_hash = hash_password_in_pool(password)
 
         # 插入新用户
         cursor.execute(
@@ -74,6 +81,52 @@ class User:
             "status": user["status"]
         }
 
+    @staticmethod
+    def get_auth_state(user_id):
+        """
+        获取用户的认证状态（读缓存）
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            dict|None: 包含 status 和 token_epoch，用户不存在时返回None
+        """
+        state = auth_state_cache.get(user_id)
+        if state is not None:
+            return state
+
+        db = get_db()
+        cursor = db.cursor()
+
+        cursor.execute(
+            "SELECT status, token_epoch FROM users WHERE id = ?", (user_id,))
+        row = cursor.fetchone()
+
+        if not row:
+            return None
+
+        state = {
+            "status": row["status"],
+            "token_epoch": row["token_epoch"] or 0
+        }
+        auth_state_cache.set(user_id, state)
+        return state
+
+    @staticmethod
+    def revoke_tokens(cursor, user_id):
+        """
+        递增用户的令牌吊销版本号，使已签发的令牌全部失效
+
+        Args:
+            cursor: 当前事务的游标
+            user_id (int): 用户ID
+        """
+        cursor.execute(
+            "UPDATE users SET token_epoch = token_epoch + 1 WHERE id = ?",
+            (user_id,)
+        )
+
     @staticmethod
     def get_by_username(username):
         """
@@ -117,17 +170,24 @@ class User:
             return None
 
         # 验证密码
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        if user["password_hash"] != password_hash:
+        if not verify_password_in_pool(password, user["password_hash"]):
             return None
 
-        # 更新最后登录时间
         db = get_db()
         cursor = db.cursor()
-        cursor.execute(
-            "UPDATE users SET last_login = ? WHERE id = ?",
-            (datetime.now(), user["id"])
-        )
+
+        # 旧格式或参数已调整的哈希在登录成功时按当前配置重新计算
+        if needs_rehash(user["password_hash"]):
+            cursor.execute(
+                "UPDATE users SET last_login = ?, password_hash = ? WHERE id = ?",
+                (datetime.now(), hash_password_in_pool(password), user["id"])
+            )
+        else:
+            # 更新最后登录时间
+            cursor.execute(
+                "UPDATE users SET last_login = ? WHERE id = ?",
+                (datetime.now(), user["id"])
+            )
         db.commit()
 
         return {
@@ -136,6 +196,7 @@ class User:
             "email": user["email"],
             "is_admin": bool(user["is_admin"]),
             "status": user["status"],
+            "token_epoch": user.get("token_epoch") or 0,
             "created_at": user["created_at"],
             "last_login": datetime.now()
         }
@@ -156,7 +217,7 @@ class User:
         cursor = db.cursor()
 
         # 加密密码
-        password_hash = hashlib.sha256(new_password.encode()).hexdigest()
+        password_hash = hash_password_in_pool(new_password)
 
         cursor.execute(
             "UPDATE users SET password_hash = ? WHERE id = ?",
@@ -218,15 +279,17 @@ class User:
         db = get_db()
         cursor = db.cursor()
 
-        try:
-            cursor.execute(
-                "INSERT INTO user_sessions (user_id, session_id) VALUES (?, ?)",
-                (user_id, session_id)
-            )
-            db.commit()
-            return True
-        except Exception:
-            return False
+        # 已存在的关联直接跳过，不依赖主键冲突异常（异常回滚会破坏所在的工作单元）
+        cursor.execute(
+            """INSERT INTO user_sessions (user_id, session_id)
+            SELECT ?, ?
+            WHERE NOT EXISTS (
+                SELECT 1 FROM user_sessions WHERE user_id = ? AND session_id = ?
+            )""",
+            (user_id, session_id, user_id, session_id)
+        )
+        db.commit()
+        return cursor.rowcount > 0
 
     @staticmethod
     def get_user_sessions(user_id):
@@ -282,25 +345,120 @@ class User:
         Returns:
             list: 用户列表
         """
+        return list(User.iter_all_users())
+
+    @staticmethod
+    def iter_all_users(batch_size=500):
+        """
+        执行查询并逐条返回用户，用于流式输出大列表（管理员功能）
+
+        Args:
+            batch_size (int, optional): 每次从数据库读取的行数
+
+        Returns:
+            iterator: 用户迭代器
+        """
         db = get_db()
         cursor = db.cursor()
 
         cursor.execute(
             "SELECT id, username, email, is_admin, status, created_at, last_login FROM users")
 
-        users = []
-        for row in cursor.fetchall():
-            users.append({
-                "id": row["id"],
-                "username": row["username"],
-                "email": row["email"],
-                "is_admin": bool(row["is_admin"]),
-                "status": row["status"],
-                "created_at": row["created_at"],
-                "last_login": row["last_login"]
-            })
+        def generate():
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield {
+                        "id": row["id"],
+                        "username": row["username"],
+                        "email": row["email"],
+                        "is_admin": bool(row["is_admin"]),
+                        "status": row["status"],
+                        "created_at": row["created_at"],
+                        "last_login": row["last_login"]
+                    }
+
+        return generate()
 
-        return users
+    @staticmethod
+    def _filter_clause(filters):
+        """
+        根据批量操作的筛选条件构造 WHERE 子句
+
+        Args:
+            filters (dict): 可包含 username_prefix, status, created_before, exclude_id
+
+        Returns:
+            tuple: (条件列表, 参数列表)
+        """
+        conditions = []
+        params = []
+
+        if filters.get('username_prefix'):
+            conditions.append("username LIKE ? ESCAPE '\\'")
+            params.append(escape_like(filters['username_prefix']) + '%')
+        if filters.get('status') is not None:
+            conditions.append("status = ?")
+            params.append(filters['status'])
+        if filters.get('created_before') is not None:
+            conditions.append("created_at < ?")
+            params.append(filters['created_before'])
+        if filters.get('exclude_id') is not None:
+            conditions.append("id != ?")
+            params.append(filters['exclude_id'])
+
+        return conditions, params
+
+    @staticmethod
+    def count_matching(filters):
+        """
+        统计符合筛选条件的用户数量（管理员功能）
+
+        Args:
+            filters (dict): 筛选条件，见 _filter_clause
+
+        Returns:
+            int: 用户数量
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        conditions, params = User._filter_clause(filters)
+        cursor.execute(
+            f"SELECT COUNT(*) FROM users WHERE {' AND '.join(conditions) or '1 = 1'}",
+            params
+        )
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def find_ids(filters, after=None, limit=100):
+        """
+        按ID顺序分页获取符合筛选条件的用户ID（管理员功能）
+
+        Args:
+            filters (dict): 筛选条件，见 _filter_clause
+            after (int, optional): 上一页最后一个用户ID
+            limit (int): 每页数量
+
+        Returns:
+            list: 用户ID列表
+        """
+        db = get_db()
+        cursor = db.cursor()
+
+        conditions, params = User._filter_clause(filters)
+        if after is not None:
+            conditions.append("id > ?")
+            params.append(after)
+
+        cursor.execute(
+            f"""SELECT id FROM users WHERE {' AND '.join(conditions) or '1 = 1'}
+            ORDER BY id LIMIT ?""",
+            params + [limit]
+        )
+        return [row['id'] for row in cursor.fetchall()]
 
     @staticmethod
     def update_user(user_id, data):
@@ -345,8 +503,15 @@ class User:
             f"UPDATE users SET {', '.join(update_fields)} WHERE id = ?",
             params
         )
+        updated = cursor.rowcount > 0
+
+        # 状态或权限变化时吊销已签发的令牌
+        if updated and (data.get('status') is not None or data.get('is_admin') is not None):
+            User.revoke_tokens(cursor, user_id)
+
         db.commit()
-        return cursor.rowcount > 0
+        auth_state_cache.invalidate(user_id)
+        return updated
 
     @staticmethod
     def delete_user(user_id):
@@ -371,13 +536,17 @@ class User:
             # 如果有关联会话，改为停用账户而不是删除
             cursor.execute(
                 "UPDATE users SET status = 'inactive' WHERE id = ?", (user_id,))
+            User.revoke_tokens(cursor, user_id)
             db.commit()
+            auth_state_cache.invalidate(user_id)
             return True
         else:
             # 如果没有关联会话，可以直接删除
             cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
+            deleted = cursor.rowcount > 0
             db.commit()
-            return cursor.rowcount > 0
+            auth_state_cache.invalidate(user_id)
+            return deleted
 
     @staticmethod
     def reset_password(user_id, new_password):
@@ -391,4 +560,22 @@ class User:
         Returns:
             bool: 重置是否成功
         """
-        return User.update_password(user_id, new_password)
+        db = get_db()
+        cursor = db.cursor()
+
+        # 加密密码
+        password_hash = hash_password_in_pool(new_password)
+
+        cursor.execute(
+            "UPDATE users SET password_hash = ? WHERE id = ?",
+            (password_hash, user_id)
+        )
+        updated = cursor.rowcount > 0
+
+        # 管理员重置密码后，旧令牌全部失效
+        if updated:
+            User.revoke_tokens(cursor, user_id)
+
+        db.commit()
+        auth_state_cache.invalidate(user_id)
+        return updated
@@ -5,9 +5,9 @@ JSON Schema 验证模块
 
 import json
 import logging
-import re
 
-from jsonschema import ValidationError, validate
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -78,6 +78,51 @@ AUDIO_ANALYSIS_SCHEMA = {
 }
 
 
+def _compile_validator(schema):
+    """检查 Schema 本身并创建可复用的验证器"""
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+# 导入时编译一次的验证器，以 Schema 对象的 id 为键
+_VALIDATORS = {
+    id(schema): _compile_validator(schema)
+    for schema in (INTERVIEW_EVALUATION_SCHEMA, VIDEO_ANALYSIS_SCHEMA, AUDIO_ANALYSIS_SCHEMA)
+}
+
+_decoder = json.JSONDecoder()
+
+
+def get_validator(schema):
+    """
+    获取 Schema 对应的已编译验证器，未预编译的 Schema 在首次使用时编译并缓存
+
+    Args:
+        schema: JSON Schema 定义
+
+    Returns:
+        Validator: 验证器实例
+    """
+    validator = _VALIDATORS.get(id(schema))
+    if validator is None or validator.schema is not schema:
+        validator = _compile_validator(schema)
+        _VALIDATORS[id(schema)] = validator
+    return validator
+
+
+def warm_validators():
+    """
+    预热已编译的验证器
+
+    jsonschema 在首次验证时才创建引用解析和关键字处理等内部结构，
+    在 gunicorn 主进程中预热后工作进程 fork 时即可共享
+    """
+    for validator in _VALIDATORS.values():
+        validator.is_valid({})
+        list(validator.iter_errors({}))
+
+
 def validate_json(data, schema):
     """
     验证数据是否符合 JSON Schema
@@ -89,48 +134,75 @@ def validate_json(data, schema):
     Returns:
         tuple: (is_valid, errors)，is_valid 表示是否验证通过，errors 包含验证错误信息
     """
-    try:
-        validate(instance=data, schema=schema)
+    validator = get_validator(schema)
+    if validator.is_valid(data):
         return True, None
-    except ValidationError as e:
-        logger.error(f"JSON验证失败: {e}")
-        return False, str(e)
+
+    error = best_match(validator.iter_errors(data))
+    logger.error(f"JSON验证失败: {error}")
+    return False, str(error)
 
 
 def extract_evaluation_from_text(text):
     """
     从文本中提取评估结果的JSON部分
 
+    从左到右扫描每个 "{"，用 JSONDecoder.raw_decode 尝试解析以它开头的对象，
+    返回第一个完整的JSON对象。纯JSON、```json 代码块和夹杂说明文字的输出都能一次扫描处理。
+
     Args:
         text: 包含评估结果的文本
 
     Returns:
         dict: 提取的JSON对象，如果提取失败则返回None
     """
-    try:
-        # 尝试直接解析整个文本
+    if not text:
+        return None
+
+    start = text.find('{')
+    while start != -1:
         try:
-            data = json.loads(text)
+            data, _ = _decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            data = None
+
+        if isinstance(data, dict):
             return data
-        except:
-            pass
 
-        # 尝试提取 ```json ... ``` 格式的代码块
-        json_match = re.search(r'```json\s*([\s\S]*?)\s*```', text)
-        if json_match:
-            json_str = json_match.group(1)
-            return json.loads(json_str)
+        start = text.find('{', start + 1)
 
-        # 尝试提取 {...} 格式的 JSON 对象
-        json_match = re.search(r'(\{[\s\S]*\})', text)
-        if json_match:
-            json_str = json_match.group(1)
-            return json.loads(json_str)
+    logger.debug(f"从文本提取JSON失败, 原始文本: {text}")
+    return None
 
-        return None
-    except json.decoder.JSONDecodeError as e:
-        logger.debug(f"从文本提取JSON失败: {str(e)}, 原始文本: {text}")
-        return None
+
+def parse_question_evaluation(text):
+    """
+    解析单个问题的评估文本，得到可直接存储的结构化字段
+
+    Args:
+        text: 模型返回的评估文本
+
+    Returns:
+        dict: {"score": 百分制得分或None, "strengths": 优点列表}
+    """
+    result = {"score": None, "strengths": []}
+    if not text:
+        return result
+
+    eval_data = extract_evaluation_from_text(text)
+    if not isinstance(eval_data, dict):
+        return result
+
+    # 模型给出的是1-10分，转换为百分制
+    raw_score = eval_data.get('score')
+    if isinstance(raw_score, (int, float)) and not isinstance(raw_score, bool):
+        result["score"] = int(float(raw_score) * 10)
+
+    strengths = eval_data.get('strengths')
+    if isinstance(strengths, list):
+        result["strengths"] = [s for s in strengths if isinstance(s, str)]
+
+    return result
 
 
 def validate_evaluation_result(text):
@@ -18,6 +18,8 @@ from time import mktime
 from urllib.parse import urlencode, urlparse
 from wsgiref.handlers import format_date_time
 
+from app.utils.metrics import LLM_LATENCY, LLM_TOKENS
+from app.utils.tracing import add_event, current_span, span, traced
 from dotenv import load_dotenv
 from websocket import WebSocketApp, enableTrace
 
@@ -31,7 +33,8 @@ load_dotenv()
 XUNFEI_APP_ID = os.getenv('XUNFEI_APP_ID')
 XUNFEI_API_KEY = os.getenv('XUNFEI_API_KEY')
 XUNFEI_API_SECRET = os.getenv('XUNFEI_API_SECRET')
-XUNFEI_WS_URL = "wss://spark-api.xf-yun.com/v3.5/chat"  # 讯飞星火API WebSocket V3.5版本
+XUNFEI_WS_URL = os.getenv(
+    'XUNFEI_SPARK_URL', "wss://spark-api.xf-yun.com/v3.5/chat")  # 讯飞星火API WebSocket V3.5版本
 
 # 是否使用模拟模式（用于开发环境，当没有真实API凭证时）
 USE_MOCK_MODE = os.getenv(
@@ -200,6 +203,8 @@ class XunFeiSparkAPI:
         """使用WebSocket与讯飞星火大模型进行对话"""
         result = {"status": "error", "message": "未收到有效响应"}
         response_text = []
+        # 回调在 WebSocket 线程中执行，事先取得调用方的 span
+        trace_span = current_span()
 
         def on_message(ws, message):
             data = json.loads(message)
@@ -212,10 +217,14 @@ class XunFeiSparkAPI:
                 choices = data["payload"]["choices"]
                 status = choices["status"]
                 content = choices["text"][0]["content"]
+                if not response_text:
+                    add_event(trace_span, "first_token")
                 response_text.append(content)
                 if status == 2:  # 对话结束
                     result["status"] = "success"
                     result["response"] = "".join(response_text)
+                    result["usage"] = data["payload"].get(
+                        "usage", {}).get("text", {})
                     result["request_id"] = data['header'].get(
                         'sid', str(uuid.uuid4()))
                     ws.close()
@@ -228,6 +237,8 @@ class XunFeiSparkAPI:
             logger.debug("WebSocket连接已关闭")
 
         def on_open(ws):
+            add_event(trace_span, "websocket_open")
+
             def run():
                 params = self._gen_websocket_params(
                     prompt, history, domain, temperature, max_tokens)
@@ -255,8 +266,28 @@ class XunFeiSparkAPI:
 
         return result
 
-    def chat(self, prompt, history=None, temperature=0.7, max_tokens=2048):
-        """调用讯飞星火大模型API进行对话"""
+    def chat(self, prompt, history=None, temperature=0.7, max_tokens=2048, operation="chat"):
+        """调用讯飞星火大模型API进行对话，operation 用于区分监控指标中的调用类型"""
+        with span("llm.chat", **{"llm.operation": operation}) as trace_span:
+            started = time.perf_counter()
+            result = self._chat(prompt, history, temperature, max_tokens)
+
+            status = result.get("status", "error")
+            LLM_LATENCY.labels(operation, status).observe(
+                time.perf_counter() - started)
+            usage = result.get("usage") or {}
+            for kind in ("prompt_tokens", "completion_tokens"):
+                if usage.get(kind):
+                    LLM_TOKENS.labels(operation, kind.split("_")[0]).inc(usage[kind])
+
+            if trace_span is not None:
+                trace_span.set_attribute("llm.status", status)
+                for kind, value in usage.items():
+                    trace_span.set_attribute(f"llm.usage.{kind}", value)
+
+        return result
+
+    def _chat(self, prompt, history, temperature, max_tokens):
         # 如果是模拟模式，返回模拟响应
         if self._use_mock:
             return self._mock_response(prompt)
@@ -271,6 +302,7 @@ class XunFeiSparkAPI:
                 "message": f"API调用异常: {str(e)}"
             }
 
+    @traced("llm.generate_interview_question")
     def generate_interview_question(self, position_type, difficulty, previous_questions=None, previous_answers=None, interview_params=None):
         """生成面试问题"""
         try:
@@ -341,7 +373,7 @@ class XunFeiSparkAPI:
             logger.debug(f"生成面试问题的提示词: {prompt}")
 
             # 调用API
-            response = self.chat(prompt)
+            response = self.chat(prompt, operation="question")
 
             if response.get("status") == "success":
                 return {
@@ -362,6 +394,7 @@ class XunFeiSparkAPI:
                 "message": f"生成面试问题异常: {str(e)}"
             }
 
+    @traced("llm.evaluate_answer")
     def evaluate_answer(self, question, answer, position_type=None):
         """评估面试回答"""
         try:
@@ -395,7 +428,7 @@ class XunFeiSparkAPI:
             """
 
             # 调用API
-            response = self.chat(prompt)
+            response = self.chat(prompt, operation="evaluate_answer")
 
             if response.get("status") == "success":
                 return {
@@ -416,6 +449,7 @@ class XunFeiSparkAPI:
                 "message": f"评估面试回答异常: {str(e)}"
             }
 
+    @traced("llm.generate_final_evaluation")
     def generate_final_evaluation(self, position_type, questions, answers, video_analysis=None, audio_analysis=None):
         """生成最终的面试评估报告"""
         try:
@@ -438,6 +472,16 @@ class XunFeiSparkAPI:
                 prompt += f"肢体语言评分: {video_analysis.get('bodyLanguage', 'N/A')}/10\n"
                 prompt += f"自信程度评分: {video_analysis.get('confidence', 'N/A')}/10\n"
 
+                # 多段视频的评分波动，方差越大表现越不稳定
+                video_variance = video_analysis.get('variance')
+                if video_variance:
+                    prompt += (
+                        f"评分波动(方差): 眼神接触 {video_variance.get('eyeContact', 0):.2f}, "
+                        f"面部表情 {video_variance.get('facialExpressions', 0):.2f}, "
+                        f"肢体语言 {video_variance.get('bodyLanguage', 0):.2f}, "
+                        f"自信程度 {video_variance.get('confidence', 0):.2f}\n"
+                    )
+
             # 添加音频分析数据
             if audio_analysis:
                 prompt += "\n音频表现分析数据:\n"
@@ -448,6 +492,14 @@ class XunFeiSparkAPI:
                 prompt += f"填充词使用次数: {audio_analysis.get('fillerWordsCount', 'N/A')}\n"
                 prompt += f"音频分析建议: {audio_analysis.get('recommendations', 'N/A')}\n"
 
+                audio_variance = audio_analysis.get('variance')
+                if audio_variance:
+                    prompt += (
+                        f"评分波动(方差): 语音清晰度 {audio_variance.get('clarity', 0):.2f}, "
+                        f"语速 {audio_variance.get('pace', 0):.2f}, "
+                        f"语调 {audio_variance.get('tone', 0):.2f}\n"
+                    )
+
             # TypeChat 输出格式指导
             prompt += """
 请提供评估报告，严格按照以下JSON格式输出，不要添加额外的解释或文本:
@@ -483,7 +535,7 @@ class XunFeiSparkAPI:
             """
 
             # 调用API
-            response = self.chat(prompt, max_tokens=4096)
+            response = self.chat(prompt, max_tokens=4096, operation="final_evaluation")
 
             if response.get("status") == "success":
                 return {
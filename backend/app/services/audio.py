@@ -9,8 +9,10 @@ import ffmpeg
 import librosa
 import numpy as np
 from app.services.xfyun_services import stt
+from app.utils.metrics import StageTimer
+from app.utils.tracing import span, traced
 from app.utils.pcm_wav import wav2pcm
-from app.utils.split_audio import split_audio
+from app.utils.split_audio import split_audio, write_segment
 from flask import current_app
 
 logger = logging.getLogger(__name__)
@@ -43,31 +45,133 @@ def process_audio_segment(audio_segment_path: str, start_time: float = 0):
         except Exception as e:
             logger.warning(f"STT failed: {str(e)}")
 
-    # 执行STT识别
-    stt(
-        audio_segment_path,
-        callback=on_stt_result,
-        on_close=on_stt_close
-    ).recognize_audio()
+    with span("stt.segment", **{"audio.segment_start": start_time}) as trace_span:
+        # 执行STT识别
+        stt(
+            audio_segment_path,
+            callback=on_stt_result,
+            on_close=on_stt_close
+        ).recognize_audio()
 
-    # 等待STT完成
-    while not stt_completed:
-        time.sleep(0.1)
+        # 等待STT完成
+        while not stt_completed:
+            time.sleep(0.1)
+
+        if trace_span is not None:
+            trace_span.set_attribute("audio.filler_words", filler_words_count)
 
     return filler_words_count
 
 
-def extract_and_evaluate_audio(video_path):
+def extract_audio(video_path, audio_path):
+    """使用ffmpeg从视频中提取音频（16kHz 单声道 pcm_s16le）"""
+    logger.info(f"从视频 {video_path} 提取音频到 {audio_path}")
+    try:
+        (
+            ffmpeg
+            .input(video_path)
+            .output(audio_path, acodec='pcm_s16le', ac=1, ar='16k')
+            .overwrite_output()
+            .run(quiet=True, capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        logger.error(
+            f"ffmpeg提取音频失败: {e.stderr.decode() if hasattr(e, 'stderr') else str(e)}"
+        )
+        # 尝试使用subprocess作为备用方法
+        cmd = ['ffmpeg', '-i', video_path, '-vn', '-acodec',
+               'pcm_s16le', '-ar', '16000', '-ac', '1', audio_path, '-y']
+        subprocess.run(cmd,
+                       check=True,
+                       stdout=subprocess.PIPE,
+                       stderr=subprocess.PIPE
+                       )
+
+
+def transcribe_complete_segments(video_path, done, segment_duration=60):
+    """
+    识别仍在上传的视频中已经完整的音频片段的填充词
+
+    从已接收的部分提取音频，片段的切分与 extract_and_evaluate_audio 一致，
+    结果可以通过 filler_counts 参数传给它，完整上传后不必重新识别这些片段
+
+    Args:
+        video_path (str): 视频文件路径（可能只包含开头部分）
+        done (dict): 已识别的片段 {片段序号（字符串）: 填充词数}
+        segment_duration (int): 片段时长（秒）
+
+    Returns:
+        dict: 本次新识别的片段 {片段序号（字符串）: 填充词数}
+    """
+    temp_dir = os.path.join(os.getcwd(), 'temp', 'audios')
+    os.makedirs(temp_dir, exist_ok=True)
+    audio_path = os.path.join(temp_dir, f"{uuid.uuid4()}.wav")
+
+    counts = {}
+    try:
+        # 截断处的数据可能不完整，ffmpeg 会解码到最后一个完整的数据包
+        try:
+            extract_audio(video_path, audio_path)
+        except subprocess.CalledProcessError:
+            if not os.path.exists(audio_path):
+                return counts
+
+        y, sr = librosa.load(audio_path, sr=None)
+        # 多留一秒，避免最后一个片段恰好被截断；此时完整音频一定长于一个片段，
+        # extract_and_evaluate_audio 会按同样的边界切分
+        complete = int((len(y) / sr - 1) // segment_duration)
+
+        stem = Path(audio_path).stem
+        for index in range(complete):
+            if str(index) in done:
+                continue
+            segment_path = write_segment(y, sr, index, segment_duration, stem)
+            if segment_path is None:
+                continue
+            try:
+                counts[str(index)] = process_audio_segment(segment_path, index * segment_duration)
+            finally:
+                if not current_app.config.get("DEBUG"):
+                    try:
+                        os.remove(segment_path)
+                    except OSError as e:
+                        logger.warning(f"无法删除临时音频片段文件 {segment_path}: {str(e)}")
+    finally:
+        if os.path.exists(audio_path):
+            os.remove(audio_path)
+
+    return counts
+
+
+def warm_up():
+    """
+    预热音频分析依赖
+
+    librosa 按需导入 scipy 等模块，部分函数首次调用时由 numba 即时编译，
+    在静音样本上调用一次分析用到的函数，把这些开销提前到 gunicorn 主进程中
+    """
+    y = np.zeros(16000, dtype=np.float32)
+    librosa.piptrack(y=y, sr=16000)
+    librosa.zero_crossings(y)
+    librosa.feature.spectral_centroid(y=y, sr=16000)
+
+
+@traced("audio.analyze")
+def extract_and_evaluate_audio(video_path, time_series=None, filler_counts=None):
     """
     从视频文件提取音频并进行分析
 
     Args:
         video_path (str): 视频文件路径
+        time_series (dict, optional): 传入时写入逐帧的短时能量和音高曲线
+        filler_counts (dict, optional): 上传过程中已识别的片段 {片段序号（字符串）: 填充词数}
 
     Returns:
         dict: 音频分析结果
     """
     try:
+        stages = StageTimer('audio')
+
         # 创建临时文件夹保存音频文件
         temp_dir = os.path.join(os.getcwd(), 'temp', 'audios')
         os.makedirs(temp_dir, exist_ok=True)
@@ -77,33 +181,15 @@ def extract_and_evaluate_audio(video_path):
         audio_path = os.path.join(temp_dir, audio_filename)
 
         # 使用ffmpeg从视频中提取音频（高质量，16kHz采样率）
-        logger.info(f"从视频 {video_path} 提取音频到 {audio_path}")
-        try:
-            (
-                ffmpeg
-                .input(video_path)
-                .output(audio_path, acodec='pcm_s16le', ac=1, ar='16k')
-                .overwrite_output()
-                .run(quiet=True, capture_stdout=True, capture_stderr=True)
-            )
-        except ffmpeg.Error as e:
-            logger.error(
-                f"ffmpeg提取音频失败: {e.stderr.decode() if hasattr(e, 'stderr') else str(e)}"
-            )
-            # 尝试使用subprocess作为备用方法
-            cmd = ['ffmpeg', '-i', video_path, '-vn', '-acodec',
-                   'pcm_s16le', '-ar', '16000', '-ac', '1', audio_path, '-y']
-            subprocess.run(cmd,
-                           check=True,
-                           stdout=subprocess.PIPE,
-                           stderr=subprocess.PIPE
-                           )
+        extract_audio(video_path, audio_path)
 
         # 确认音频文件已创建
         if not os.path.exists(audio_path) or os.path.getsize(audio_path) == 0:
             logger.error(f"无法创建或访问音频文件: {audio_path}")
             return None
 
+        stages.mark('extract')
+
         # ===== 使用librosa加载音频文件 =====
         try:
             y, sr = librosa.load(audio_path, sr=None)
@@ -118,6 +204,8 @@ def extract_and_evaluate_audio(video_path):
             logger.error(f"加载音频文件失败: {str(e)}")
             return None
 
+        stages.mark('load')
+
         # ===== 计算音频特征 =====
         # 1. 时长计算
         duration = len(y) / sr
@@ -148,14 +236,22 @@ def extract_and_evaluate_audio(video_path):
                 "recommendations": "未检测到有效语音，无法进行分析。请确保麦克风正常工作并尝试重新录制。"
             }
 
+        stages.mark('energy')
+
         # 3. 音高分析
         pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
-        pitch_mean = np.mean([np.mean(pitches[:, i][pitches[:, i] > 0])
-                             for i in speech_frames if np.any(pitches[:, i] > 0)] or [0])
+        pitch_contour = [np.mean(pitches[:, i][pitches[:, i] > 0])
+                         for i in speech_frames if np.any(pitches[:, i] > 0)]
+        pitch_mean = np.mean(pitch_contour or [0])
 
         # 音高变化度
-        pitch_std = np.std([np.mean(pitches[:, i][pitches[:, i] > 0])
-                           for i in speech_frames if np.any(pitches[:, i] > 0)] or [0])
+        pitch_std = np.std(pitch_contour or [0])
+
+        if time_series is not None:
+            time_series['energy'] = energy
+            time_series['pitchContour'] = pitch_contour
+
+        stages.mark('pitch')
 
         # 4. 语速分析
         # 使用过零率估计有意义的音节数量
@@ -171,6 +267,8 @@ def extract_and_evaluate_audio(video_path):
         spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)
         clarity_score = np.mean(spectral_centroid) / 1000  # 归一化
 
+        stages.mark('spectral')
+
         # 6. 识别填充词
         # Convert .wav to .pcm for stt compatibility
         pcm_audio_path = audio_path.replace('.wav', '.pcm')
@@ -199,6 +297,9 @@ def extract_and_evaluate_audio(video_path):
 
         for i, segment_path in enumerate(segment_files):
             try:
+                if filler_counts and str(i) in filler_counts:
+                    total_filler_words_count += filler_counts[str(i)]
+                    continue
                 filler_count = process_audio_segment(segment_path, i * 60)
                 total_filler_words_count += filler_count
             finally:
@@ -211,6 +312,7 @@ def extract_and_evaluate_audio(video_path):
                             f"无法删除临时音频片段文件 {segment_path}: {str(e)}")
 
         filler_words_count = total_filler_words_count
+        stages.mark('stt')
 
         # ===== 评分计算 =====
         # 清晰度评分 (1-10)
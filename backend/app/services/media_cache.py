@@ -0,0 +1,122 @@
+"""
+媒体分析缓存服务模块
+上传的视频边写入磁盘边计算 SHA-256，分析结果按 (内容哈希, 分析算法版本) 缓存；
+前端重试上传或候选人重复提交同一段录像时直接复用已有结果并关联到新的会话，
+不再重新执行 OpenCV、librosa 和语音识别
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+from app.models.interview import MultimodalAnalysis
+from app.models.media_cache import MediaAnalysisCache
+from app.utils.metrics import MEDIA_CACHE_LOOKUPS
+from flask import current_app
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 分析算法版本，修改 video.py、audio.py 中影响分析结果的算法时递增，旧版本的缓存不再命中
+ANALYZER_VERSION = 1
+
+# 读写文件的块大小
+_BLOCK_SIZE = 1024 * 1024
+
+
+def save_hashed(stream, path):
+    """
+    把上传内容写入文件，同时计算 SHA-256
+
+    Args:
+        stream: 上传内容的输入流
+        path (str): 文件路径
+
+    Returns:
+        str: 内容的 SHA-256（十六进制）
+    """
+    digest = hashlib.sha256()
+    with open(path, 'wb') as f:
+        while True:
+            block = stream.read(_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+            f.write(block)
+    return digest.hexdigest()
+
+
+def hash_file(path):
+    """
+    计算文件内容的 SHA-256
+
+    Returns:
+        str: 内容的 SHA-256（十六进制）
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def link_cached(content_hash, session_id):
+    """
+    命中缓存时把已有的分析结果保存到会话
+
+    Args:
+        content_hash (str): 视频内容的 SHA-256
+        session_id (str): 面试会话ID
+
+    Returns:
+        bool: 是否命中
+    """
+    if not content_hash or not current_app.config['MEDIA_CACHE_MAX_BYTES']:
+        return False
+
+    # 前端重试上传时会话已经保存了这段视频的结果，不再重复写入
+    if MultimodalAnalysis.content_hash(session_id) == content_hash:
+        MEDIA_CACHE_LOOKUPS.labels('hit').inc()
+        return True
+
+    entry = MediaAnalysisCache.get(content_hash, ANALYZER_VERSION)
+    MEDIA_CACHE_LOOKUPS.labels('hit' if entry else 'miss').inc()
+    if entry is None:
+        return False
+
+    MultimodalAnalysis.create_or_update(
+        session_id, entry['video_analysis'], entry['audio_analysis'], entry['time_series'],
+        content_hash)
+    logger.info(f"视频分析命中缓存: {content_hash[:12]}, 会话 {session_id}")
+    return True
+
+
+def cache_analysis(content_hash, video_analysis, audio_analysis, time_series):
+    """
+    缓存一次完整的分析结果，并按时间和总大小淘汰旧的结果
+
+    Args:
+        content_hash (str): 视频内容的 SHA-256
+        video_analysis (dict): 视频分析数据
+        audio_analysis (dict): 音频分析数据
+        time_series (dict): 逐帧时间序列 {名称: 数组}
+    """
+    max_bytes = current_app.config['MEDIA_CACHE_MAX_BYTES']
+    if not content_hash or not max_bytes:
+        return
+
+    from app.utils.metrics_codec import encode_series
+
+    dumps = current_app.json.dumps
+    MediaAnalysisCache.put(
+        content_hash, ANALYZER_VERSION, dumps(video_analysis), dumps(audio_analysis),
+        encode_series(time_series) if time_series else None
+    )
+
+    cutoff = datetime.now() - timedelta(seconds=current_app.config['MEDIA_CACHE_TTL'])
+    removed = MediaAnalysisCache.evict(cutoff, max_bytes)
+    if removed:
+        logger.info(f"淘汰 {removed} 个媒体分析缓存")
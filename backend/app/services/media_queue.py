@@ -0,0 +1,404 @@
+"""
+媒体分析队列模块
+API 工作进程把已保存的视频作为任务写入本机的 SQLite 队列，由独立的媒体工作进程池
+（flask media-worker）取出分析，API 工作进程只等待结果；
+队列积压过多或没有存活的媒体工作进程时拒绝新请求，并给出建议的重试时间
+"""
+
+import json
+import logging
+import math
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import current_app
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 任务状态
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# 任务类型：分析完整视频，或对仍在上传的视频进行增量分析
+ANALYZE = 'analyze'
+ADVANCE = 'advance'
+
+# 还没有完成过任务时估算重试时间使用的单个任务耗时（秒）
+DEFAULT_JOB_SECONDS = 15.0
+
+
+class MediaQueue:
+    """基于本机 SQLite 文件的媒体分析任务队列，同一主机上的进程共用"""
+
+    def __init__(self, path, max_depth=16, max_per_user=2, stale_after=10.0,
+                 max_attempts=2, busy_timeout=5.0):
+        """
+        Args:
+            path (str): 队列数据库文件路径
+            max_depth (int): 排队和处理中的任务总数上限，达到后返回 429
+            max_per_user (int): 每个用户同时排队和处理中的任务数上限（0 表示不限制）
+            stale_after (float): 媒体工作进程超过该时间（秒）没有心跳即视为已退出
+            max_attempts (int): 工作进程异常退出时任务最多执行的次数
+            busy_timeout (float): 等待写锁的超时时间（秒）
+        """
+        self.path = path
+        self.max_depth = max_depth
+        self.max_per_user = max_per_user
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.busy_timeout = busy_timeout
+
+    @contextmanager
+    def _connect(self):
+        # 自动提交模式，需要原子性的操作显式使用 BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def create_tables(self):
+        """创建队列表"""
+        with self._connect() as conn:
+            # WAL 模式下等待结果的读请求不会阻塞工作进程写入
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS media_jobs (
+                id TEXT PRIMARY KEY,
+                session_id TEXT,
+                user_id INTEGER,
+                video_path TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker_pid INTEGER,
+                result TEXT,
+                http_status INTEGER,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+            ''')
+            # 分片上传的任务记录上传ID，由媒体工作进程复用上传过程中的增量分析结果
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(media_jobs)")}
+            if 'kind' not in columns:
+                conn.execute(
+                    f"ALTER TABLE media_jobs ADD COLUMN kind TEXT NOT NULL DEFAULT '{ANALYZE}'")
+            if 'upload_id' not in columns:
+                conn.execute("ALTER TABLE media_jobs ADD COLUMN upload_id TEXT")
+            # 视频内容哈希，分析完成后用于缓存结果
+            if 'content_hash' not in columns:
+                conn.execute("ALTER TABLE media_jobs ADD COLUMN content_hash TEXT")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_media_jobs_status ON media_jobs (status, created_at)")
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS media_workers (
+                pid INTEGER PRIMARY KEY,
+                started_at REAL NOT NULL,
+                heartbeat_at REAL NOT NULL
+            )
+            ''')
+
+    def _live_workers(self, conn):
+        cursor = conn.execute(
+            "SELECT COUNT(*) FROM media_workers WHERE heartbeat_at >= ?",
+            (time.time() - self.stale_after,)
+        )
+        return cursor.fetchone()[0]
+
+    def _depth(self, conn):
+        cursor = conn.execute(
+            "SELECT COUNT(*) FROM media_jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+        )
+        return cursor.fetchone()[0]
+
+    def _average_seconds(self, conn, sample=50):
+        """最近完成的分析任务的平均处理耗时"""
+        cursor = conn.execute(
+            f"""
+            SELECT AVG(finished_at - started_at) FROM (
+                SELECT started_at, finished_at FROM media_jobs
+                WHERE kind = ? AND status IN (?, ?) AND started_at IS NOT NULL
+                ORDER BY finished_at DESC LIMIT {int(sample)}
+            )
+            """,
+            (ANALYZE, DONE, FAILED)
+        )
+        average = cursor.fetchone()[0]
+        return average if average else DEFAULT_JOB_SECONDS
+
+    def _check(self, conn, user_id):
+        """
+        准入检查
+
+        Returns:
+            tuple: 拒绝时返回 (HTTP状态码, 错误信息, 建议的重试秒数)，允许时返回 None
+        """
+        workers = self._live_workers(conn)
+        if workers == 0:
+            return 503, "媒体分析服务暂不可用，请稍后重试", math.ceil(self.stale_after)
+
+        depth = self._depth(conn)
+        if depth >= self.max_depth:
+            # 需要等到超出上限的任务和一个新空位都处理完，各工作进程并行处理
+            waiting = depth - self.max_depth + 1
+            retry_after = self._average_seconds(conn) * waiting / workers
+            return 429, "视频分析请求过多，请稍后重试", max(1, math.ceil(retry_after))
+
+        if self.max_per_user and user_id is not None:
+            cursor = conn.execute(
+                "SELECT COUNT(*) FROM media_jobs WHERE user_id = ? AND kind = ? AND status IN (?, ?)",
+                (user_id, ANALYZE, QUEUED, RUNNING)
+            )
+            if cursor.fetchone()[0] >= self.max_per_user:
+                retry_after = self._average_seconds(conn)
+                return 429, "已有视频正在分析，请稍后重试", max(1, math.ceil(retry_after))
+
+        return None
+
+    def admit(self, user_id):
+        """
+        在接收上传之前检查是否接受新的分析请求
+
+        Returns:
+            tuple: 拒绝时返回 (HTTP状态码, 错误信息, 建议的重试秒数)，允许时返回 None
+        """
+        with self._connect() as conn:
+            return self._check(conn, user_id)
+
+    def enqueue(self, session_id, user_id, video_path, upload_id=None, content_hash=None):
+        """
+        添加分析任务，准入检查和写入在同一个写事务中完成
+
+        Args:
+            session_id (str): 面试会话ID
+            user_id (int): 用户ID
+            video_path (str): 视频文件路径
+            upload_id (str, optional): 分片上传的上传ID
+            content_hash (str, optional): 视频内容的 SHA-256
+
+        Returns:
+            tuple: (任务ID, 拒绝原因)，被拒绝时任务ID为 None
+        """
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rejection = self._check(conn, user_id)
+                if rejection is None:
+                    self._insert(conn, job_id, ANALYZE, session_id, user_id, video_path,
+                                 upload_id, content_hash)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return (None, rejection) if rejection else (job_id, None)
+
+    def enqueue_advance(self, upload_id, video_path):
+        """
+        添加增量分析任务（尽力而为）：同一上传已有排队的任务、队列已满或没有存活的工作进程时跳过
+
+        Returns:
+            str: 任务ID，跳过时返回 None
+        """
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                pending = conn.execute(
+                    "SELECT 1 FROM media_jobs WHERE upload_id = ? AND kind = ? AND status = ?",
+                    (upload_id, ADVANCE, QUEUED)
+                ).fetchone()
+                skip = (pending is not None or self._live_workers(conn) == 0
+                        or self._depth(conn) >= self.max_depth)
+                if not skip:
+                    self._insert(conn, job_id, ADVANCE, None, None, video_path, upload_id, None)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return None if skip else job_id
+
+    @staticmethod
+    def _insert(conn, job_id, kind, session_id, user_id, video_path, upload_id, content_hash):
+        conn.execute(
+            """
+            INSERT INTO media_jobs
+                (id, kind, session_id, user_id, video_path, upload_id, content_hash,
+                 status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (job_id, kind, session_id, user_id, video_path, upload_id, content_hash,
+             QUEUED, time.time())
+        )
+
+    def claim(self, pid):
+        """
+        领取最早排队的任务
+
+        Returns:
+            dict: 任务，队列为空时返回 None
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM media_jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                    (QUEUED,)
+                ).fetchone()
+                job = None
+                if row is not None:
+                    job = dict(row)
+                    job.update(status=RUNNING, worker_pid=pid, started_at=time.time(),
+                               attempts=row['attempts'] + 1)
+                    conn.execute(
+                        """
+                        UPDATE media_jobs SET status = ?, worker_pid = ?, started_at = ?, attempts = ?
+                        WHERE id = ?
+                        """,
+                        (RUNNING, pid, job['started_at'], job['attempts'], job['id'])
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return job
+
+    def finish(self, job_id, body, status):
+        """记录任务结果（响应数据和HTTP状态码）"""
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE media_jobs SET status = ?, result = ?, http_status = ?, finished_at = ?
+                WHERE id = ?
+                """,
+                (DONE if status < 400 else FAILED, json.dumps(body, ensure_ascii=False),
+                 status, time.time(), job_id)
+            )
+
+    def get(self, job_id):
+        """
+        获取任务
+
+        Returns:
+            dict: 任务（result 已解析），不存在时返回 None
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM media_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def wait(self, job_id, timeout, poll_interval=0.5):
+        """
+        等待任务完成，超时后返回当时的任务状态
+
+        Returns:
+            dict: 任务
+        """
+        deadline = time.monotonic() + timeout
+        # 从较短的间隔开始逐步加长，短视频的结果可以尽快返回
+        interval = 0.05
+        while True:
+            job = self.get(job_id)
+            if job is None or job['status'] in (DONE, FAILED) or time.monotonic() >= deadline:
+                return job
+            time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+            interval = min(interval * 2, poll_interval)
+
+    def heartbeat(self, pid):
+        """记录媒体工作进程的心跳"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO media_workers (pid, started_at, heartbeat_at) VALUES (?, ?, ?)
+                ON CONFLICT (pid) DO UPDATE SET heartbeat_at = excluded.heartbeat_at
+                """,
+                (pid, now, now)
+            )
+
+    def remove_worker(self, pid):
+        """媒体工作进程退出时注销"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM media_workers WHERE pid = ?", (pid,))
+
+    def recover(self):
+        """
+        处理执行中的工作进程已经退出的任务：未超过最大执行次数的重新排队，否则标记为失败
+
+        Returns:
+            int: 处理的任务数
+        """
+        stale = time.time() - self.stale_after
+        failure = json.dumps({"error": "视频分析失败: 媒体工作进程异常退出"}, ensure_ascii=False)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                abandoned = f"""
+                    status = '{RUNNING}' AND worker_pid NOT IN (
+                        SELECT pid FROM media_workers WHERE heartbeat_at >= ?)
+                """
+                requeued = conn.execute(
+                    f"""
+                    UPDATE media_jobs SET status = ?, worker_pid = NULL, started_at = NULL
+                    WHERE {abandoned} AND attempts < ?
+                    """,
+                    (QUEUED, stale, self.max_attempts)
+                ).rowcount
+                failed = conn.execute(
+                    f"""
+                    UPDATE media_jobs SET status = ?, result = ?, http_status = 500, finished_at = ?
+                    WHERE {abandoned}
+                    """,
+                    (FAILED, failure, time.time(), stale)
+                ).rowcount
+                conn.execute("DELETE FROM media_workers WHERE heartbeat_at < ?", (stale,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        if requeued or failed:
+            logger.warning(f"媒体工作进程异常退出: 重新排队 {requeued} 个任务，{failed} 个任务失败")
+        return requeued + failed
+
+    def purge(self, older_than):
+        """
+        删除完成时间早于 older_than 秒之前的任务记录
+
+        Returns:
+            int: 删除的任务数
+        """
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM media_jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (DONE, FAILED, time.time() - older_than)
+            ).rowcount
+
+
+def init_media_queue(app):
+    """启用媒体分析队列（MEDIA_WORKER_MODE=queue）时创建队列"""
+    if app.config['MEDIA_WORKER_MODE'] != 'queue':
+        return
+
+    queue = MediaQueue(
+        app.config['MEDIA_QUEUE_PATH'],
+        max_depth=app.config['MEDIA_QUEUE_MAX_DEPTH'],
+        max_per_user=app.config['MEDIA_QUEUE_MAX_PER_USER'],
+        stale_after=app.config['MEDIA_WORKER_STALE_AFTER'],
+    )
+    queue.create_tables()
+    app.extensions['media_queue'] = queue
+
+
+def media_queue():
+    """当前应用的媒体分析队列，未启用时返回 None"""
+    return current_app.extensions.get('media_queue')
@@ -0,0 +1,171 @@
+"""
+媒体工作进程池模块
+由 flask media-worker 启动：主进程预加载 OpenCV、librosa 等媒体分析依赖后
+fork 出与物理核数相同的工作进程（写时复制共享依赖的内存），
+每个工作进程一次处理一个队列中的视频分析任务；主进程负责重启异常退出的工作进程、
+回收它们未完成的任务并清理过期的任务记录
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+from app.utils.metrics import MEDIA_QUEUE_WAIT
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+def physical_cores():
+    """
+    物理核数（Linux 下从 /proc/cpuinfo 统计，无法获取时使用逻辑核数）
+
+    视频分析是 CPU 密集型任务，超线程带来的收益有限，按物理核数启动工作进程
+    """
+    cores = set()
+    physical_id = None
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                key = key.strip()
+                if key == 'physical id':
+                    physical_id = value.strip()
+                elif key == 'core id':
+                    cores.add((physical_id, value.strip()))
+    except OSError:
+        pass
+    return len(cores) or os.cpu_count() or 1
+
+
+def _heartbeat(queue, pid, interval, stop):
+    """定期写入心跳，处理耗时较长的任务时也不会被判定为已退出"""
+    while not stop.is_set():
+        try:
+            queue.heartbeat(pid)
+        except Exception:
+            logger.exception("写入媒体工作进程心跳失败")
+        stop.wait(interval)
+
+
+def _work(app, queue, poll_interval, heartbeat_interval):
+    """工作进程：循环领取并处理分析任务，收到 SIGTERM 后处理完当前任务再退出"""
+    from app.services.media_queue import ADVANCE
+    from app.services.upload import advance_upload, analyze_upload
+    from app.services.video import analyze_video
+    from app.utils.preload import after_fork
+
+    after_fork(app)
+
+    # Ctrl+C 会发给整个进程组，由主进程统一处理
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+    pid = os.getpid()
+    queue.heartbeat(pid)
+    threading.Thread(
+        target=_heartbeat, args=(queue, pid, heartbeat_interval, stop),
+        name='media-worker-heartbeat', daemon=True
+    ).start()
+    logger.info(f"媒体工作进程已启动: pid={pid}")
+
+    try:
+        while not stop.is_set():
+            job = queue.claim(pid)
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+
+            MEDIA_QUEUE_WAIT.observe(job['started_at'] - job['created_at'])
+            try:
+                with app.app_context():
+                    if job['kind'] == ADVANCE:
+                        advance_upload(job['upload_id'], app.config['UPLOAD_ADVANCE_BYTES'])
+                        body, status = {"msg": "增量分析完成"}, 200
+                    elif job['upload_id']:
+                        body, status = analyze_upload(job['upload_id'], job['content_hash'])
+                    else:
+                        body, status = analyze_video(
+                            job['video_path'], job['session_id'],
+                            content_hash=job['content_hash'])
+            except Exception as e:
+                logger.exception(f"媒体分析任务失败: {job['id']}")
+                body, status = {"error": f"视频分析失败: {str(e)}"}, 500
+            queue.finish(job['id'], body, status)
+    finally:
+        stop.set()
+        queue.remove_worker(pid)
+        logger.info(f"媒体工作进程已退出: pid={pid}")
+
+
+def run_pool(app, processes, poll_interval=0.2, heartbeat_interval=2.0,
+             retention=3600.0, shutdown_timeout=300.0):
+    """
+    启动媒体工作进程池，直到收到 SIGINT 或 SIGTERM
+
+    Args:
+        app (Flask): 应用实例
+        processes (int): 工作进程数
+        poll_interval (float): 队列为空时领取任务的间隔（秒）
+        heartbeat_interval (float): 心跳间隔（秒）
+        retention (float): 已完成任务记录的保留时间（秒）
+        shutdown_timeout (float): 退出时等待工作进程处理完当前任务的最长时间（秒）
+    """
+    from app.utils.preload import freeze_heap, warm_app
+
+    queue = app.extensions['media_queue']
+
+    # 工作进程 fork 后共享已预热的依赖
+    warm_app(app, media=True)
+    freeze_heap()
+
+    context = multiprocessing.get_context('fork')
+    # 信号处理函数只设置标志，由主循环负责通知工作进程
+    stopping = threading.Event()
+    workers = {}
+
+    def shutdown(signum, frame):
+        stopping.set()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    logger.info(f"媒体工作进程池启动: processes={processes}, queue={queue.path}")
+    while not stopping.is_set():
+        for slot in range(processes):
+            worker = workers.get(slot)
+            if worker is not None and worker.is_alive():
+                continue
+            if worker is not None:
+                logger.warning(f"媒体工作进程异常退出: pid={worker.pid}, exitcode={worker.exitcode}")
+                # 立即注销，使它未完成的任务在下面的 recover 中重新排队
+                queue.remove_worker(worker.pid)
+            worker = context.Process(
+                target=_work, args=(app, queue, poll_interval, heartbeat_interval),
+                name=f"media-worker-{slot}"
+            )
+            worker.start()
+            workers[slot] = worker
+
+        try:
+            queue.recover()
+            queue.purge(retention)
+        except Exception:
+            logger.exception("维护媒体分析队列失败")
+        time.sleep(heartbeat_interval)
+
+    logger.info("正在停止媒体工作进程池，等待当前任务完成")
+    for worker in workers.values():
+        worker.terminate()
+
+    deadline = time.monotonic() + shutdown_timeout
+    for worker in workers.values():
+        worker.join(max(0.0, deadline - time.monotonic()))
+        if worker.is_alive():
+            worker.kill()
+            worker.join()
+    logger.info("媒体工作进程池已停止")
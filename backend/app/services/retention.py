@@ -0,0 +1,162 @@
+"""
+数据保留服务模块
+将过期会话归档到压缩的 JSONL 文件，并在后台定期清理遗留的临时媒体文件
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.models.archive import SessionArchive
+from app.utils.db import get_db, get_storage
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 当前进程中后台清理线程所属的进程号，fork 出的子进程需要重新启动线程
+_janitor_pid = None
+_janitor_lock = threading.Lock()
+
+
+def temp_media_root():
+    """视频、音频临时文件的根目录"""
+    return os.path.join(os.getcwd(), 'temp')
+
+
+def archive_sessions(days, archive_dir, batch_size=200, vacuum_pages=2000):
+    """
+    将开始时间早于 days 天前的已完成会话归档并从数据库中移除
+
+    每批会话先写入归档文件并落盘，再在一个事务中删除，
+    中途失败时已删除的会话一定已经写入归档文件。
+
+    Args:
+        days (int): 保留天数
+        archive_dir (str): 归档目录
+        batch_size (int): 每批处理的会话数
+        vacuum_pages (int): 归档后最多回收的数据库空闲页数
+
+    Returns:
+        dict: 归档的会话数、归档文件路径和回收的页数
+    """
+    cutoff = datetime.now() - timedelta(days=days)
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(
+        archive_dir, f"sessions-{datetime.now():%Y%m%d-%H%M%S}.jsonl.gz")
+
+    archived = 0
+    with open(path, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as archive:
+        while True:
+            session_ids = SessionArchive.find_expired(cutoff, batch_size)
+            if not session_ids:
+                break
+
+            for record in SessionArchive.export(session_ids):
+                archive.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+            # 同步刷新压缩流并落盘，保证删除前归档数据已写入磁盘
+            archive.flush()
+            raw.flush()
+            os.fsync(raw.fileno())
+
+            SessionArchive.purge(session_ids)
+            archived += len(session_ids)
+            logger.info(f"已归档 {archived} 个会话到 {path}")
+
+    if not archived:
+        os.remove(path)
+        path = None
+
+    db = get_db()
+    reclaimed = get_storage().reclaim_space(db.cursor(), vacuum_pages)
+    db.commit()
+
+    return {'archived': archived, 'path': path, 'reclaimedPages': reclaimed}
+
+
+def sweep_temp_media(root, ttl):
+    """
+    删除修改时间早于 ttl 秒前的临时媒体文件
+
+    正常流程会在分析结束后删除临时文件，这里清理调试模式下保留的、
+    删除失败的以及进程中断时遗留的文件
+
+    Args:
+        root (str): 临时文件根目录
+        ttl (float): 保留时间（秒）
+
+    Returns:
+        tuple: (删除的文件数, 释放的字节数)
+    """
+    cutoff = time.time() - ttl
+    removed = 0
+    freed = 0
+
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime >= cutoff:
+                    continue
+                os.remove(path)
+            except FileNotFoundError:
+                # 已被分析流程或其他进程删除
+                continue
+            except OSError as e:
+                logger.warning(f"删除临时文件 {path} 失败: {str(e)}")
+                continue
+            removed += 1
+            freed += stat.st_size
+
+    return removed, freed
+
+
+def _run_janitor(root, ttl, interval):
+    while True:
+        try:
+            removed, freed = sweep_temp_media(root, ttl)
+            if removed:
+                logger.info(f"已清理 {removed} 个临时媒体文件，释放 {freed} 字节")
+        except Exception as e:
+            logger.exception(f"清理临时媒体文件失败: {str(e)}")
+        time.sleep(interval)
+
+
+def ensure_janitor(app):
+    """
+    确保当前进程中运行着临时媒体清理线程
+
+    在处理请求时调用而不是在创建应用时启动，
+    预加载应用后 fork 出的工作进程中线程不会被继承，需要各自启动
+    """
+    global _janitor_pid
+
+    if _janitor_pid == os.getpid():
+        return
+
+    with _janitor_lock:
+        if _janitor_pid == os.getpid():
+            return
+        _janitor_pid = os.getpid()
+        threading.Thread(
+            target=_run_janitor,
+            args=(temp_media_root(),
+                  app.config['TEMP_MEDIA_TTL'],
+                  app.config['TEMP_MEDIA_SWEEP_INTERVAL']),
+            name='temp-media-janitor',
+            daemon=True
+        ).start()
+
+
+def init_janitor(app):
+    """为应用注册临时媒体清理，清理间隔为 0 时不启动"""
+    if app.config.get('TEMP_MEDIA_SWEEP_INTERVAL', 0) <= 0:
+        return
+
+    @app.before_request
+    def start_janitor():
+        ensure_janitor(app)
@@ -0,0 +1,263 @@
+"""
+视频分片上传服务模块
+客户端先创建上传，再按顺序追加分片，最后完成上传；中断后可以查询已接收的字节数继续上传。
+视频写入预先分配了磁盘空间的文件，上传过程中后台对已接收的部分进行逐帧采样和音频片段识别，
+完成上传后只需处理剩余部分
+"""
+
+import contextlib
+import ctypes
+import ctypes.util
+import fcntl
+import logging
+import os
+import threading
+import uuid
+
+from app.models.upload import FINALIZED, VideoUpload
+from app.services.media_queue import media_queue
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# fallocate 的 FALLOC_FL_KEEP_SIZE 标志：只分配磁盘空间，不改变文件长度
+_FALLOC_FL_KEEP_SIZE = 0x01
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    _fallocate = _libc.fallocate
+    _fallocate.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong)
+except (OSError, AttributeError):  # 非 Linux 系统没有 fallocate，跳过预分配
+    _fallocate = None
+
+
+class ChunkTooLarge(Exception):
+    """分片超过允许的大小或超出声明的视频总大小"""
+
+
+# 本进程中正在推进增量分析的上传
+_advancing = set()
+_advancing_lock = threading.Lock()
+
+
+def upload_dir():
+    """分片上传的视频保存目录"""
+    return os.path.join(os.getcwd(), 'temp', 'videos')
+
+
+def create_file(total_size=None):
+    """
+    创建保存上传视频的文件，已知总大小时预先分配磁盘空间
+
+    文件长度始终等于已写入的字节数，上传过程中可以直接把它当作被截断的视频读取
+
+    Returns:
+        str: 文件路径
+    """
+    directory = upload_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{uuid.uuid4()}.webm")
+
+    fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    try:
+        if total_size and _fallocate is not None:
+            if _fallocate(fd, _FALLOC_FL_KEEP_SIZE, 0, total_size) != 0:
+                # 文件系统不支持时仍可按需分配
+                logger.debug(f"预分配磁盘空间失败: errno={ctypes.get_errno()}")
+    finally:
+        os.close(fd)
+    return path
+
+
+def append_chunk(upload, offset, stream, max_bytes):
+    """
+    在 offset 处写入一个分片
+
+    同一上传的分片按文件锁串行写入，offset 必须等于已接收的字节数
+
+    Args:
+        upload (dict): 上传记录
+        offset (int): 客户端声明的分片起始位置
+        stream: 分片内容的输入流
+        max_bytes (int): 分片的最大字节数
+
+    Returns:
+        tuple: (是否写入成功, 当前已接收的字节数)
+    """
+    limit = max_bytes
+    if upload['total_size'] is not None:
+        limit = min(limit, upload['total_size'] - offset)
+
+    with open(upload['path'], 'r+b') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            current = VideoUpload.get(upload['upload_id'])
+            if current is None or current['received'] != offset:
+                return False, current['received'] if current else offset
+
+            written = 0
+            try:
+                while True:
+                    block = stream.read(min(1024 * 1024, limit - written + 1))
+                    if not block:
+                        break
+                    if written + len(block) > limit:
+                        raise ChunkTooLarge()
+                    os.pwrite(f.fileno(), block, offset + written)
+                    written += len(block)
+
+                # 先落盘再更新进度，进度中记录的字节都已完整写入
+                os.fsync(f.fileno())
+            except BaseException:
+                # 丢弃写了一半的分片，保证文件长度等于已接收的字节数
+                os.ftruncate(f.fileno(), offset)
+                raise
+            if not VideoUpload.advance(upload['upload_id'], offset, offset + written):
+                return False, VideoUpload.get(upload['upload_id'])['received']
+            return True, offset + written
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def analysis_lock(path, blocking=True):
+    """
+    上传视频的分析锁（跨进程），保证同一时刻只有一个进程分析同一上传
+
+    Yields:
+        bool: 是否获得锁（blocking 为 False 时可能为 False）
+    """
+    with open(f"{path}.lock", 'a') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def advance_upload(upload_id, step_bytes):
+    """
+    对仍在上传的视频已接收的部分进行增量分析
+
+    逐帧采样达到帧数上限后结果不再变化，直接保存；
+    音频按与完整分析相同的边界切分，已完整接收的片段先行识别填充词。
+    其他进程正在分析同一上传时直接返回，由它处理之后到达的数据
+
+    Args:
+        upload_id (str): 上传ID
+        step_bytes (int): 距上次分析至少新接收多少字节才再次分析
+    """
+    from app.services.audio import transcribe_complete_segments
+    from app.services.video import sample_frames
+
+    upload = VideoUpload.get(upload_id)
+    if upload is None:
+        return
+
+    with analysis_lock(upload['path'], blocking=False) as acquired:
+        if not acquired:
+            return
+
+        while True:
+            upload = VideoUpload.get(upload_id)
+            if upload is None or upload['status'] == FINALIZED:
+                return
+            received = upload['received']
+            if received - upload['analyzed_bytes'] < step_bytes:
+                return
+
+            frames = upload['frames']
+            if frames is None:
+                sampled = sample_frames(upload['path'])
+                if sampled is not None and sampled['complete']:
+                    frames = sampled
+
+            filler_counts = dict(upload['filler_counts'])
+            try:
+                filler_counts.update(
+                    transcribe_complete_segments(upload['path'], filler_counts))
+            except Exception as e:
+                # 刚开始上传时容器头部可能还不完整，等更多数据到达后再试
+                logger.warning(f"上传 {upload_id} 音频增量识别失败: {str(e)}")
+
+            VideoUpload.save_progress(upload_id, frames, filler_counts, received)
+            logger.info(
+                f"上传 {upload_id} 增量分析: 已接收 {received} 字节, "
+                f"逐帧采样{'已完成' if frames else '未完成'}, "
+                f"已识别 {len(filler_counts)} 个音频片段"
+            )
+
+
+def schedule_advance(app, upload):
+    """
+    在后台推进增量分析：启用媒体分析队列时交给媒体工作进程，否则在本进程的后台线程中执行
+    """
+    step_bytes = app.config['UPLOAD_ADVANCE_BYTES']
+    if upload['received'] - upload['analyzed_bytes'] < step_bytes:
+        return
+
+    queue = media_queue()
+    if queue is not None:
+        queue.enqueue_advance(upload['upload_id'], upload['path'])
+        return
+
+    with _advancing_lock:
+        if upload['upload_id'] in _advancing:
+            return
+        _advancing.add(upload['upload_id'])
+
+    def run():
+        try:
+            with app.app_context():
+                advance_upload(upload['upload_id'], step_bytes)
+        except Exception:
+            logger.exception(f"上传 {upload['upload_id']} 增量分析失败")
+        finally:
+            with _advancing_lock:
+                _advancing.discard(upload['upload_id'])
+
+    threading.Thread(target=run, name=f"upload-advance-{upload['upload_id'][:8]}",
+                     daemon=True).start()
+
+
+def analyze_upload(upload_id, content_hash=None):
+    """
+    分析已完成上传的视频，复用上传过程中的增量分析结果
+
+    Args:
+        upload_id (str): 上传ID
+        content_hash (str, optional): 视频内容的 SHA-256，提供时缓存完整的分析结果
+
+    Returns:
+        tuple: (响应数据, HTTP状态码)
+    """
+    from app.services.video import analyze_video
+
+    upload = VideoUpload.get(upload_id)
+    if upload is None:
+        return {"error": "上传不存在或已过期"}, 404
+
+    # 等待正在进行的增量分析结束，之后读取的结果才是最新的
+    with analysis_lock(upload['path']):
+        upload = VideoUpload.get(upload_id)
+        result = analyze_video(
+            upload['path'], upload['session_id'],
+            frames=upload['frames'], filler_counts=upload['filler_counts'],
+            content_hash=content_hash)
+
+    VideoUpload.delete(upload_id)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(f"{upload['path']}.lock")
+    return result
+
+
+def discard_upload(upload):
+    """删除上传记录、视频文件和分析锁文件"""
+    VideoUpload.delete(upload['upload_id'])
+    for path in (upload['path'], f"{upload['path']}.lock"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
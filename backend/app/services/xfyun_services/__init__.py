@@ -11,11 +11,13 @@ load_dotenv()
 app_id = os.getenv("XUNFEI_APP_ID")
 api_key = os.getenv("XUNFEI_API_KEY")
 api_secret = os.getenv("XUNFEI_API_SECRET")
+# 语音听写服务地址（基准测试时指向本地模拟服务）
+iat_url = os.getenv("XUNFEI_IAT_URL", "wss://iat-api.xfyun.cn/v2/iat")
 
 
 def stt(audio_file: str, callback=None, on_close=None):
     return SpeechRecognition(
-        "wss://iat-api.xfyun.cn/v2/iat",
+        iat_url,
         app_id,
         api_key,
         api_secret,
@@ -5,6 +5,7 @@ import threading
 import time
 
 from app.services.xfyun_services.utils import create_url
+from app.utils.metrics import SPEECH_DURATION, timed
 from websocket import WebSocketApp
 
 
@@ -116,4 +117,5 @@ class SpeechRecognition:
         ws = WebSocketApp(ws_url, on_message=self.on_message,
                           on_error=self.on_error, on_close=self.on_close)
         ws.on_open = self.on_open
-        ws.run_forever(sslopt={"cert_reqs": ssl.CERT_NONE})
+        with timed(SPEECH_DURATION, 'stt'):
+            ws.run_forever(sslopt={"cert_reqs": ssl.CERT_NONE})
@@ -4,6 +4,7 @@ import os
 
 import websocket
 from app.services.xfyun_services.utils import create_url
+from app.utils.metrics import SPEECH_DURATION, timed
 
 
 class SpeechSynthesis:
@@ -98,4 +99,5 @@ class SpeechSynthesis:
                                     on_close=self.on_close)
         print("WebSocket connected.")
         ws.on_open = lambda ws: self.synthesize_text(ws, output_file)
-        ws.run_forever()  # 阻塞直到 WebSocket 连接关闭
+        with timed(SPEECH_DURATION, 'tts'):
+            ws.run_forever()  # 阻塞直到 WebSocket 连接关闭
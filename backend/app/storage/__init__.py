@@ -0,0 +1,41 @@
+"""
+存储后端模块
+为模型层提供与具体数据库无关的连接抽象，目前支持 SQLite 和 PostgreSQL
+"""
+
+from app.storage.base import Connection, Cursor, StorageBackend
+from app.storage.postgres import PostgresBackend
+from app.storage.sqlite import SQLiteBackend
+
+
+def create_backend(config):
+    """
+    根据配置创建存储后端
+
+    Args:
+        config (dict): 应用配置
+
+    Returns:
+        StorageBackend: 存储后端实例
+    """
+    backend = config.get('DATABASE_BACKEND', 'sqlite').lower()
+
+    group_commit = config.get('DATABASE_GROUP_COMMIT', False)
+
+    if backend == 'sqlite':
+        return SQLiteBackend(
+            config['DATABASE'],
+            busy_timeout=config.get('DATABASE_BUSY_TIMEOUT', 5.0),
+            group_commit=group_commit
+        )
+
+    if backend in ('postgres', 'postgresql'):
+        return PostgresBackend(
+            config['DATABASE_URL'],
+            min_size=config.get('DATABASE_POOL_MIN', 1),
+            max_size=config.get('DATABASE_POOL_MAX', 8),
+            timeout=config.get('DATABASE_POOL_TIMEOUT', 30),
+            group_commit=group_commit
+        )
+
+    raise ValueError(f"不支持的数据库后端: {backend}")
@@ -0,0 +1,240 @@
+"""
+存储后端基础模块
+定义与具体数据库驱动无关的连接、游标包装和后端接口
+"""
+
+import time
+
+from app.utils.metrics import (DB_QUERIES_IN_FLIGHT, DB_QUERY_LATENCY,
+                               statement_type)
+from app.utils.tracing import record_span, tracing_enabled
+
+
+class Cursor:
+    """游标包装，统一不同驱动的SQL方言和结果接口"""
+
+    def __init__(self, backend, raw_cursor):
+        self._backend = backend
+        self._raw = raw_cursor
+
+    def execute(self, sql, params=()):
+        """执行单条SQL语句（统一使用 ? 作为占位符）"""
+        self._timed(sql, self._raw.execute,
+                    self._backend.adapt_sql(sql), tuple(params))
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        """批量执行SQL语句"""
+        self._timed(
+            sql, self._raw.executemany,
+            self._backend.adapt_sql(sql),
+            [tuple(params) for params in seq_of_params]
+        )
+        return self
+
+    def _timed(self, sql, method, *args):
+        """执行语句并记录耗时、并发数和追踪 span"""
+        DB_QUERIES_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        started_ns = time.time_ns() if tracing_enabled() else None
+        try:
+            method(*args)
+        finally:
+            DB_QUERIES_IN_FLIGHT.dec()
+            kind = statement_type(sql)
+            DB_QUERY_LATENCY.labels(self._backend.name, kind).observe(
+                time.perf_counter() - started)
+            if started_ns is not None:
+                record_span(f"db.{kind.lower()}", started_ns, time.time_ns(),
+                            **{'db.system': self._backend.name, 'db.statement': sql})
+
+    def fetchone(self):
+        return self._raw.fetchone()
+
+    def fetchall(self):
+        return self._raw.fetchall()
+
+    def fetchmany(self, size):
+        return self._raw.fetchmany(size)
+
+    def __iter__(self):
+        return iter(self._raw.fetchall())
+
+    @property
+    def rowcount(self):
+        return self._raw.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._backend.lastrowid(self._raw)
+
+
+class Connection:
+    """连接包装，关闭时将底层连接交还给后端（关闭或归还连接池）"""
+
+    def __init__(self, backend, raw_connection):
+        self._backend = backend
+        self._raw = raw_connection
+        self._batch_depth = 0
+
+    @property
+    def backend(self):
+        return self._backend
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def cursor(self):
+        return Cursor(self._backend, self._backend.create_cursor(self._raw))
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def commit(self):
+        # 处于工作单元中时，由工作单元结束时统一提交
+        if self._batch_depth:
+            return
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    @property
+    def in_batch(self):
+        return self._batch_depth > 0
+
+    def begin_batch(self):
+        """开始（或嵌套进入）一个工作单元"""
+        self._batch_depth += 1
+
+    def end_batch(self, commit=True):
+        """
+        结束工作单元，最外层结束时提交或回滚
+
+        Args:
+            commit (bool): 是否提交，False 时回滚
+        """
+        self._batch_depth -= 1
+        if self._batch_depth:
+            return
+        if commit:
+            self._raw.commit()
+        else:
+            self._raw.rollback()
+
+    def close(self):
+        if self._raw is not None:
+            self._backend.release(self._raw)
+            self._raw = None
+
+
+class StorageBackend:
+    """
+    存储后端接口
+
+    模型层只使用 ? 占位符和 SQLite 风格的建表语句，
+    各后端负责把它们转换为自身的方言
+    """
+
+    name = None
+
+    def connect(self):
+        """
+        获取一个数据库连接
+
+        Returns:
+            Connection: 连接包装对象
+        """
+        return Connection(self, self._acquire())
+
+    def _acquire(self):
+        raise NotImplementedError
+
+    def release(self, raw_connection):
+        """释放底层连接"""
+        raise NotImplementedError
+
+    def create_cursor(self, raw_connection):
+        return raw_connection.cursor()
+
+    def adapt_sql(self, sql):
+        """将通用SQL转换为后端方言"""
+        return sql
+
+    def lastrowid(self, raw_cursor):
+        """获取最近一次插入的自增ID"""
+        return raw_cursor.lastrowid
+
+    def lock_schema(self, cursor):
+        """在初始化表结构前加锁，防止多个实例并发建表"""
+
+    def configure(self, cursor):
+        """在创建表之前调用，设置数据库级别的选项"""
+
+    def reclaim_space(self, cursor, max_pages):
+        """
+        将删除数据后留下的空闲空间归还给文件系统
+
+        Args:
+            cursor (Cursor): 游标
+            max_pages (int): 本次最多回收的页数
+
+        Returns:
+            int: 回收的页数
+        """
+        return 0
+
+    def column_exists(self, cursor, table, column):
+        """检查表中是否存在指定列"""
+        raise NotImplementedError
+
+    def ensure_column(self, cursor, table, column, definition):
+        """
+        确保表中存在指定列，不存在时追加
+
+        Args:
+            cursor (Cursor): 游标
+            table (str): 表名
+            column (str): 列名
+            definition (str): 列定义，例如 "INTEGER DEFAULT 0"
+        """
+        if not self.column_exists(cursor, table, column):
+            cursor.execute(
+                f"ALTER TABLE {table} ADD COLUMN {column} {definition}"
+            )
+
+    def ensure_search_index(self, cursor, table, columns):
+        """
+        确保表的指定文本列上存在全文索引，并随表数据的增删改自动同步
+
+        Args:
+            cursor (Cursor): 游标
+            table (str): 表名，需有自增整数主键 id
+            columns (tuple): 需要索引的文本列
+
+        Returns:
+            bool: 后端是否支持并已建立全文索引
+        """
+        return False
+
+    def search_index(self, cursor, table):
+        """
+        获取表的全文索引名称
+
+        Returns:
+            str|None: 索引名称，未建立或后端不支持时返回 None
+        """
+        return None
+
+    def rebuild_search_index(self, cursor, table):
+        """
+        根据原表内容重建全文索引
+
+        Returns:
+            bool: 是否已重建
+        """
+        return False
+
+    def dispose(self):
+        """释放后端持有的全部资源"""
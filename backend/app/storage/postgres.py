@@ -0,0 +1,172 @@
+"""
+PostgreSQL存储后端
+基于 psycopg2 的线程安全连接池，供多个应用副本共享同一数据库
+"""
+
+import logging
+import os
+import re
+import threading
+
+from app.storage.base import StorageBackend
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# SQLite建表语句到PostgreSQL的改写规则
+_DDL_REWRITES = [
+    (re.compile(r'INTEGER PRIMARY KEY AUTOINCREMENT', re.IGNORECASE),
+     'SERIAL PRIMARY KEY'),
+    (re.compile(r'\bBLOB\b', re.IGNORECASE), 'BYTEA'),
+]
+
+# 字符串常量、带引号的标识符和行注释，其中的内容原样保留
+_QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|--[^\n]*)""")
+
+# 建表时使用的咨询锁ID，保证多个副本同时启动时只有一个在建表
+_SCHEMA_LOCK_ID = 20250401
+
+# TIMESTAMP 类型OID，读取为字符串以保持与SQLite一致的行为
+_TIMESTAMP_OIDS = (1114,)
+
+_typecaster_registered = False
+
+
+def _register_typecasters():
+    """让 TIMESTAMP 列以ISO字符串形式返回，与SQLite的存储格式保持一致"""
+    global _typecaster_registered
+    if _typecaster_registered:
+        return
+
+    from psycopg2 import extensions
+
+    timestamp_as_text = extensions.new_type(
+        _TIMESTAMP_OIDS, 'TIMESTAMP_AS_TEXT', lambda value, cursor: value
+    )
+    extensions.register_type(timestamp_as_text)
+    _typecaster_registered = True
+
+
+class PostgresBackend(StorageBackend):
+    """PostgreSQL后端"""
+
+    name = 'postgres'
+
+    def __init__(self, dsn, min_size=1, max_size=8, timeout=30, group_commit=False):
+        """
+        Args:
+            dsn (str): 数据库连接串
+            min_size (int): 连接池最小连接数
+            max_size (int): 连接池最大连接数
+            timeout (float): 等待空闲连接的超时时间（秒）
+            group_commit (bool): 是否启用异步提交，由 WAL writer 批量刷盘
+        """
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.group_commit = group_commit
+
+        self._pool = None
+        self._pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        """获取当前进程的连接池，fork后在子进程中重新创建"""
+        if self._pool is not None and self._pid == os.getpid():
+            return self._pool
+
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                try:
+                    from psycopg2.pool import ThreadedConnectionPool
+                except ImportError as e:
+                    raise RuntimeError(
+                        "使用PostgreSQL后端需要安装 psycopg2-binary"
+                    ) from e
+
+                _register_typecasters()
+
+                connect_kwargs = {}
+                if self.group_commit:
+                    # 提交不等待 WAL 刷盘，最多丢失 wal_writer_delay 内的已提交事务
+                    connect_kwargs['options'] = '-c synchronous_commit=off'
+
+                # 父进程的连接不能在子进程中复用，也不能关闭，直接丢弃
+                self._pool = ThreadedConnectionPool(
+                    self.min_size, self.max_size, self.dsn, **connect_kwargs
+                )
+                self._slots = threading.BoundedSemaphore(self.max_size)
+                self._pid = os.getpid()
+                logger.info(
+                    f"PostgreSQL连接池已创建: pid={self._pid}, "
+                    f"min={self.min_size}, max={self.max_size}"
+                )
+        return self._pool
+
+    def _acquire(self):
+        pool = self._get_pool()
+        # 连接池耗尽时阻塞等待，而不是直接抛出 PoolError
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("等待数据库连接超时")
+        try:
+            return pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, raw_connection):
+        pool = self._get_pool()
+        broken = False
+        try:
+            # 丢弃未提交的事务，避免把脏状态带给下一个请求
+            raw_connection.rollback()
+        except Exception:
+            broken = True
+
+        try:
+            pool.putconn(raw_connection, close=broken or raw_connection.closed)
+        finally:
+            self._slots.release()
+
+    def create_cursor(self, raw_connection):
+        from psycopg2.extras import DictCursor
+        return raw_connection.cursor(cursor_factory=DictCursor)
+
+    def adapt_sql(self, sql):
+        # psycopg2 对整条语句（包括引号内的内容）做 % 格式化，格式化后 %% 还原为 %，
+        # 因此 % 需要全部转义；Cursor 总是传入参数元组，保证格式化一定发生
+        parts = _QUOTED.split(sql.replace('%', '%%'))
+        # 切分后偶数位置在引号外，只改写这部分的占位符和建表语句
+        for i in range(0, len(parts), 2):
+            part = parts[i].replace('?', '%s')
+            for pattern, replacement in _DDL_REWRITES:
+                part = pattern.sub(replacement, part)
+            parts[i] = part
+        return ''.join(parts)
+
+    def lastrowid(self, raw_cursor):
+        with raw_cursor.connection.cursor() as cursor:
+            cursor.execute("SELECT lastval()")
+            return cursor.fetchone()[0]
+
+    def lock_schema(self, cursor):
+        cursor.execute("SELECT pg_advisory_xact_lock(?)", (_SCHEMA_LOCK_ID,))
+
+    def column_exists(self, cursor, table, column):
+        cursor.execute(
+            """
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = ? AND column_name = ?
+            """,
+            (table, column)
+        )
+        return cursor.fetchone() is not None
+
+    def dispose(self):
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.closeall()
+            self._pool = None
+            self._pid = None
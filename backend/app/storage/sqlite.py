@@ -0,0 +1,124 @@
+"""
+SQLite存储后端
+每个请求独立打开一个数据库文件连接
+"""
+
+import logging
+import sqlite3
+
+from app.storage.base import StorageBackend
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+class SQLiteBackend(StorageBackend):
+    """SQLite后端"""
+
+    name = 'sqlite'
+
+    def __init__(self, path, busy_timeout=5.0, group_commit=False):
+        """
+        Args:
+            path (str): 数据库文件路径
+            busy_timeout (float): 等待写锁的超时时间（秒）
+            group_commit (bool): 是否启用组提交（WAL + synchronous=NORMAL）
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.group_commit = group_commit
+        self._wal_enabled = False
+
+    def _acquire(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+        conn.row_factory = sqlite3.Row
+
+        if self.group_commit:
+            # WAL 模式是持久化的，每个进程设置一次即可
+            if not self._wal_enabled:
+                conn.execute("PRAGMA journal_mode=WAL")
+                self._wal_enabled = True
+            # 提交时只写 WAL 不做 fsync，由检查点统一落盘，多个并发提交共享一次 fsync
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def release(self, raw_connection):
+        raw_connection.close()
+
+    def configure(self, cursor):
+        # 只对新建的数据库文件生效，已有数据库需执行一次
+        # PRAGMA auto_vacuum = INCREMENTAL; VACUUM; 才能转换
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+    def reclaim_space(self, cursor, max_pages):
+        """增量 vacuum，每次只回收有限的页数，避免长时间持有写锁"""
+        cursor.execute("PRAGMA auto_vacuum")
+        if cursor.fetchone()[0] != 2:
+            logger.info("数据库未启用增量 vacuum，跳过空间回收")
+            return 0
+
+        cursor.execute("PRAGMA freelist_count")
+        before = cursor.fetchone()[0]
+        cursor.execute(f"PRAGMA incremental_vacuum({int(max_pages)})").fetchall()
+        cursor.execute("PRAGMA freelist_count")
+        return before - cursor.fetchone()[0]
+
+    def column_exists(self, cursor, table, column):
+        cursor.execute(f"PRAGMA table_info({table})")
+        return any(row[1] == column for row in cursor.fetchall())
+
+    def search_index(self, cursor, table):
+        index = f"{table}_fts"
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (index,))
+        return index if cursor.fetchone() else None
+
+    def ensure_search_index(self, cursor, table, columns):
+        """
+        使用 FTS5 外部内容表建立全文索引，由触发器与原表保持同步
+
+        中文没有空格分词，使用 trigram 分词器按三字切分，可匹配任意不少于三个字符的子串
+        """
+        if self.search_index(cursor, table):
+            return True
+
+        index = f"{table}_fts"
+        column_list = ', '.join(columns)
+        try:
+            cursor.execute(
+                f"""CREATE VIRTUAL TABLE {index} USING fts5(
+                    {column_list}, content='{table}', content_rowid='id', tokenize='trigram'
+                )"""
+            )
+        except sqlite3.OperationalError as e:
+            # 未编译 FTS5 或 SQLite 低于 3.34（不支持 trigram 分词器）
+            logger.warning(f"无法创建全文索引 {index}，全文搜索不可用: {str(e)}")
+            return False
+
+        new_values = ', '.join(f"new.{column}" for column in columns)
+        old_values = ', '.join(f"old.{column}" for column in columns)
+        insert_new = f"INSERT INTO {index} (rowid, {column_list}) VALUES (new.id, {new_values});"
+        delete_old = (
+            f"INSERT INTO {index} ({index}, rowid, {column_list}) "
+            f"VALUES ('delete', old.id, {old_values});"
+        )
+
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {index}_ai AFTER INSERT ON {table} BEGIN {insert_new} END")
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {index}_ad AFTER DELETE ON {table} BEGIN {delete_old} END")
+        # 只在索引列变化时更新索引，回填得分等操作不会触发重新分词
+        cursor.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS {index}_au AFTER UPDATE OF {column_list} ON {table}
+            BEGIN {delete_old} {insert_new} END""")
+
+        # 为已有数据建立索引
+        cursor.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+        return True
+
+    def rebuild_search_index(self, cursor, table):
+        """根据原表内容重建全文索引"""
+        index = self.search_index(cursor, table)
+        if index:
+            cursor.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+        return index is not None
@@ -0,0 +1,206 @@
+"""
+缓存工具模块
+提供基于数据库版本号的进程内读穿缓存（用于变化很少的小表）和带过期时间的LRU缓存
+"""
+
+import gzip
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from app.utils.db import get_db
+from flask import current_app, jsonify, request
+
+# 进程内创建的全部缓存，fork 后需要重建它们的锁
+_instances = weakref.WeakSet()
+
+
+def reinit_locks():
+    """
+    重建所有缓存的锁
+
+    在 gunicorn 预加载模式下由工作进程 fork 后调用：
+    fork 时若有其他线程持有锁，子进程中的锁将永远无法释放
+    """
+    for cache in list(_instances):
+        cache._lock = threading.Lock()
+
+
+class VersionedCache:
+    """
+    带版本号的进程内缓存
+
+    每个缓存对应 cache_versions 表中的一行，写操作在同一事务中递增版本号，
+    各工作进程最多每隔 CACHE_VERSION_TTL 秒检查一次版本号，发现变化后重新加载，
+    因此失效可以传递到所有 gunicorn 工作进程和应用副本。
+    """
+
+    def __init__(self, name, loader):
+        """
+        Args:
+            name (str): 缓存名称，对应 cache_versions.name
+            loader (callable): 从数据库加载数据的函数
+        """
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = None
+        self._checked_at = 0.0
+        _instances.add(self)
+
+    def _read_version(self):
+        cursor = get_db().cursor()
+        cursor.execute(
+            "SELECT version FROM cache_versions WHERE name = ?", (self.name,)
+        )
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def entry(self):
+        """
+        获取缓存数据及其版本号
+
+        Returns:
+            tuple: (数据, 版本号)
+        """
+        ttl = current_app.config.get('CACHE_VERSION_TTL', 1.0)
+        now = time.monotonic()
+
+        with self._lock:
+            if self._version is not None and now - self._checked_at < ttl:
+                return self._value, self._version
+
+        # 先读版本号再加载数据，保证缓存的数据不会比版本号更旧
+        version = self._read_version()
+
+        with self._lock:
+            if version == self._version:
+                self._checked_at = now
+                return self._value, self._version
+
+        value = self._loader()
+
+        with self._lock:
+            self._value = value
+            self._version = version
+            self._checked_at = now
+        return value, version
+
+    def get(self):
+        """获取缓存数据"""
+        return self.entry()[0]
+
+    def bump_version(self, cursor):
+        """在当前事务中递增版本号，需要在写操作提交前调用"""
+        cursor.execute(
+            "UPDATE cache_versions SET version = version + 1 WHERE name = ?",
+            (self.name,)
+        )
+
+    def invalidate(self):
+        """使当前进程的缓存立即失效，写操作提交后调用"""
+        with self._lock:
+            self._version = None
+            self._value = None
+            self._checked_at = 0.0
+
+
+class TTLCache:
+    """线程安全的有界LRU缓存，条目在写入 ttl 秒后过期"""
+
+    def __init__(self, maxsize=1024, ttl=5.0):
+        """
+        Args:
+            maxsize (int): 最大条目数，超出时淘汰最久未使用的条目
+            ttl (float): 条目有效期（秒）
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        _instances.add(self)
+
+    def get(self, key, default=None):
+        """获取缓存值，不存在或已过期时返回 default"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """写入缓存值"""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        """删除指定条目"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def conditional_json(payload, etag):
+    """
+    生成支持 ETag 协商缓存的 JSON 响应
+
+    Args:
+        payload: 响应数据
+        etag (str): 实体标签
+
+    Returns:
+        Response: 客户端缓存仍有效时返回 304
+    """
+    response = jsonify(payload)
+    response.set_etag(etag)
+    # 接口需要认证，只允许客户端私有缓存，且每次使用前重新验证
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def conditional_gzip_json(document, etag):
+    """
+    直接返回预先压缩的 JSON 文档，支持 ETag 协商缓存
+
+    Args:
+        document (bytes): gzip 压缩的 JSON
+        etag (str): 实体标签
+
+    Returns:
+        Response: 客户端支持 gzip 时原样返回压缩数据，否则解压后返回
+    """
+    response = current_app.response_class(mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Accept-Encoding')
+
+    if request.if_none_match.contains_weak(etag):
+        return response.make_conditional(request)
+
+    if 'gzip' in request.accept_encodings:
+        response.set_data(document)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response.set_data(gzip.decompress(document))
+    return response.make_conditional(request)
@@ -4,16 +4,30 @@
 """
 
 import json
-import sqlite3
+from contextlib import contextmanager
 
+from app.storage import create_backend
+from app.utils.password import hash_password
 from flask import current_app, g
 
+# 需要跨进程失效的缓存名称
+CACHE_NAMES = ('position_types', 'interview_presets')
+
+
+def init_storage(app):
+    """根据配置为应用创建存储后端"""
+    app.extensions['storage'] = create_backend(app.config)
+
+
+def get_storage():
+    """获取当前应用的存储后端"""
+    return current_app.extensions['storage']
+
 
 def get_db():
     """获取数据库连接"""
     if 'db' not in g:
-        g.db = sqlite3.connect(current_app.config['DATABASE'])
-        g.db.row_factory = sqlite3.Row
+        g.db = get_storage().connect()
     return g.db
 
 
@@ -24,11 +38,42 @@ def close_db(e=None):
         db.close()
 
 
+def escape_like(text):
+    """转义 LIKE 模式中的通配符，配合 ESCAPE '\\' 使用"""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+@contextmanager
+def transaction():
+    """
+    工作单元：块内所有模型的写操作合并为一个事务，结束时只提交一次
+
+    模型方法中的 commit() 在工作单元内被推迟，块内抛出异常时整体回滚。
+    块内不应包含耗时的外部调用，以免长时间持有写锁。
+
+    Yields:
+        Connection: 当前请求的数据库连接
+    """
+    db = get_db()
+    db.begin_batch()
+    try:
+        yield db
+    except BaseException:
+        db.end_batch(commit=False)
+        raise
+    db.end_batch()
+
+
 def init_db():
     """初始化数据库"""
-    conn = sqlite3.connect(current_app.config['DATABASE'])
+    storage = get_storage()
+    conn = storage.connect()
     cursor = conn.cursor()
 
+    # 多个实例同时启动时避免并发建表
+    storage.lock_schema(cursor)
+    storage.configure(cursor)
+
     # 创建面试会话表
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS interview_sessions (
@@ -42,6 +87,11 @@ def init_db():
     )
     ''')
 
+    # 会话使用的预设场景，以及是否已计入每日统计的完成数
+    storage.ensure_column(cursor, 'interview_sessions', 'preset_id', 'INTEGER')
+    storage.ensure_column(
+        cursor, 'interview_sessions', 'analytics_completed', 'INTEGER NOT NULL DEFAULT 0')
+
     # 创建面试问题表
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS interview_questions (
@@ -50,12 +100,25 @@ def init_db():
         question TEXT,
         answer TEXT,
         evaluation TEXT,
+        score INTEGER,
+        strengths TEXT,
+        evaluation_parsed INTEGER NOT NULL DEFAULT 0,
         question_index INTEGER,
         created_at TIMESTAMP,
         FOREIGN KEY (session_id) REFERENCES interview_sessions (session_id)
     )
     ''')
 
+    # 评估解析结果列（百分制得分、优点列表），旧数据库需要追加并通过回填命令补全
+    storage.ensure_column(cursor, 'interview_questions', 'score', 'INTEGER')
+    storage.ensure_column(cursor, 'interview_questions', 'strengths', 'TEXT')
+    storage.ensure_column(
+        cursor, 'interview_questions', 'evaluation_parsed', 'INTEGER NOT NULL DEFAULT 0')
+
+    # 问题、回答和评估的全文索引，供管理员按关键词搜索（仅 SQLite 后端支持）
+    storage.ensure_search_index(
+        cursor, 'interview_questions', ('question', 'answer', 'evaluation'))
+
     # 创建多模态分析结果表
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS multimodal_analysis (
@@ -68,6 +131,39 @@ def init_db():
     )
     ''')
 
+    # 分析指标改为紧凑的二进制编码保存，旧版 JSON 列仅用于读取历史数据
+    storage.ensure_column(cursor, 'multimodal_analysis', 'video_metrics', 'BLOB')
+    storage.ensure_column(cursor, 'multimodal_analysis', 'audio_metrics', 'BLOB')
+    # 分析数据对应的视频内容哈希，同一会话重复提交同一段视频时不再重复写入
+    storage.ensure_column(cursor, 'multimodal_analysis', 'content_hash', 'TEXT')
+
+    # 创建分析时间序列表，保存每次分析的逐帧数据（压缩的 NumPy 数组）
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS analysis_time_series (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        data BLOB NOT NULL,
+        created_at TIMESTAMP,
+        FOREIGN KEY (session_id) REFERENCES interview_sessions (session_id)
+    )
+    ''')
+
+    # 创建多模态聚合统计表，每个会话的每项指标一行，写入分析数据时累加
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS multimodal_aggregates (
+        session_id TEXT NOT NULL,
+        modality TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        sample_count INTEGER NOT NULL DEFAULT 0,
+        total DOUBLE PRECISION NOT NULL DEFAULT 0,
+        total_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+        min_value DOUBLE PRECISION,
+        max_value DOUBLE PRECISION,
+        PRIMARY KEY (session_id, modality, metric),
+        FOREIGN KEY (session_id) REFERENCES interview_sessions (session_id)
+    )
+    ''')
+
     # 创建最终评估表
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS final_evaluations (
@@ -96,10 +192,15 @@ def init_db():
         status TEXT DEFAULT 'active',
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         last_login TIMESTAMP,
+        token_epoch INTEGER NOT NULL DEFAULT 0,
         UNIQUE(username)
     )
     ''')
 
+    # 令牌吊销版本号，旧数据库需要追加该列
+    storage.ensure_column(
+        cursor, 'users', 'token_epoch', 'INTEGER NOT NULL DEFAULT 0')
+
     # 创建用户-面试会话关联表
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS user_sessions (
@@ -135,14 +236,93 @@ def init_db():
     )
     ''')
 
+    # 创建面试结果文档表，保存已完成会话的压缩结果
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS interview_results (
+        session_id TEXT PRIMARY KEY,
+        document BLOB NOT NULL,
+        etag TEXT NOT NULL,
+        created_at TIMESTAMP,
+        FOREIGN KEY (session_id) REFERENCES interview_sessions (session_id)
+    )
+    ''')
+
+    # 创建每日统计汇总表，会话按开始日期归入队列，在会话开始和完成时增量更新
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS analytics_daily (
+        day TEXT NOT NULL,
+        position_type TEXT NOT NULL,
+        difficulty TEXT NOT NULL,
+        preset_id INTEGER NOT NULL DEFAULT 0,
+        sessions_started INTEGER NOT NULL DEFAULT 0,
+        sessions_completed INTEGER NOT NULL DEFAULT 0,
+        scored_count INTEGER NOT NULL DEFAULT 0,
+        overall_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+        content_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+        delivery_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+        nonverbal_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, position_type, difficulty, preset_id)
+    )
+    ''')
+
+    # 创建分片上传表，记录上传进度和上传过程中已完成的增量分析结果
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS video_uploads (
+        upload_id TEXT PRIMARY KEY,
+        user_id INTEGER,
+        session_id TEXT,
+        path TEXT NOT NULL,
+        total_size INTEGER,
+        received INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL,
+        frames TEXT,
+        filler_counts TEXT,
+        analyzed_bytes INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    )
+    ''')
+
+    # 创建媒体分析缓存表，按视频内容哈希和分析算法版本保存分析结果
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS media_analysis_cache (
+        content_hash TEXT NOT NULL,
+        analyzer_version INTEGER NOT NULL,
+        video_analysis TEXT NOT NULL,
+        audio_analysis TEXT NOT NULL,
+        time_series BLOB,
+        size_bytes INTEGER NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP,
+        last_used_at TIMESTAMP,
+        PRIMARY KEY (content_hash, analyzer_version)
+    )
+    ''')
+
+    # 创建缓存版本表，用于跨进程使缓存失效
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS cache_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+
+    for cache_name in CACHE_NAMES:
+        cursor.execute(
+            "SELECT 1 FROM cache_versions WHERE name = ?", (cache_name,))
+        if cursor.fetchone() is None:
+            cursor.execute(
+                "INSERT INTO cache_versions (name, version) VALUES (?, 0)",
+                (cache_name,)
+            )
+
     # 检查用户表是否为空，如果为空则添加默认管理员用户
     cursor.execute("SELECT COUNT(*) FROM users")
     count = cursor.fetchone()[0]
 
     if count == 0:
         # 添加默认管理员用户，密码为"admin123"的哈希值
-        import hashlib
-        default_password = hashlib.sha256("admin123".encode()).hexdigest()
+        default_password = hash_password("admin123")
         cursor.execute(
             "INSERT INTO users (username, password_hash, email, is_admin) VALUES (?, ?, ?, ?)",
             ("admin", default_password, "admin@example.com", 1)
@@ -0,0 +1,124 @@
+"""
+JSON序列化模块
+提供支持 numpy 类型的 Flask JSON provider，安装了 orjson 时使用 orjson 序列化，
+并提供大列表的流式 JSON 响应
+"""
+
+from app.utils.lazy import loaded_module
+from flask import current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库
+    orjson = None
+
+# 流式响应中每次输出的列表项数量
+STREAM_BATCH_SIZE = 200
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """应用的 JSON provider，原生处理 numpy 标量和数组"""
+
+    # 与 orjson 的输出保持一致：直接输出 UTF-8 字符，使用紧凑格式
+    ensure_ascii = False
+    separators = (',', ':')
+
+    @staticmethod
+    def default(o):
+        # numpy 尚未导入时不会出现 numpy 类型的值，不为此导入 numpy
+        np = loaded_module('numpy')
+        if np is None:
+            return DefaultJSONProvider.default(o)
+        if isinstance(o, (np.float32, np.float16)):
+            # 按自身精度的最短表示输出，避免出现 7.199999809 这样的值
+            return float(str(o))
+        if isinstance(o, np.floating):
+            return float(o)
+        if isinstance(o, np.integer):
+            return int(o)
+        if isinstance(o, np.bool_):
+            return bool(o)
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_options(self, pretty=False):
+        # 日期交给 default 处理，保持与 Flask 默认的 HTTP 日期格式一致
+        option = (
+            orjson.OPT_SERIALIZE_NUMPY
+            | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj):
+        """序列化为 UTF-8 编码的字节串"""
+        if orjson is not None:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options())
+        return self.dumps(obj).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        # 指定了标准库参数时按标准库处理
+        if orjson is not None and not kwargs:
+            return self.dumps_bytes(obj).decode('utf-8')
+        if 'indent' not in kwargs:
+            kwargs.setdefault('separators', self.separators)
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(
+            obj, default=self.default, option=self._orjson_options(pretty)
+        )
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def stream_json_list(key, items, count_key=None, **fields):
+    """
+    以流式方式输出 {key: [...], **fields} 形式的 JSON 响应，避免一次性构建大列表
+
+    Args:
+        key (str): 列表字段名
+        items (iterable): 列表项，逐项序列化
+        count_key (str, optional): 若指定，在列表之后输出列表项数量
+        **fields: 列表之外的其他字段
+
+    Returns:
+        Response: 流式响应
+    """
+    provider = current_app.json
+
+    def generate():
+        yield b'{' + provider.dumps_bytes(key) + b':['
+
+        count = 0
+        batch = []
+        for item in items:
+            batch.append(provider.dumps_bytes(item))
+            count += 1
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield (b',' if count > len(batch) else b'') + b','.join(batch)
+                batch = []
+        if batch:
+            yield (b',' if count > len(batch) else b'') + b','.join(batch)
+
+        tail = dict(fields)
+        if count_key:
+            tail[count_key] = count
+        yield b']' + b''.join(
+            b',' + provider.dumps_bytes(name) + b':' + provider.dumps_bytes(value)
+            for name, value in tail.items()
+        ) + b'}'
+
+    return current_app.response_class(
+        stream_with_context(generate()), mimetype=provider.mimetype
+    )
@@ -0,0 +1,39 @@
+"""
+延迟加载模块
+OpenCV、librosa（scipy/numba）、ffmpeg 和 numpy 导入耗时长、占用内存多，
+只有处理媒体的请求才需要它们，这里提供按需导入视图和判断模块是否已加载的工具，
+使不处理媒体的工作进程不必在启动时加载这些依赖
+"""
+
+import sys
+
+from werkzeug.utils import cached_property, import_string
+
+
+class LazyView:
+    """
+    首次处理请求时才导入的视图函数（Flask 文档中的延迟加载视图模式）
+
+        api_bp.add_url_rule('/multimodal_analysis',
+                            view_func=LazyView('app.api.analysis.multimodal_analysis'))
+    """
+
+    def __init__(self, import_name):
+        self.__module__, self.__name__ = import_name.rsplit('.', 1)
+        self.import_name = import_name
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+def loaded_module(name):
+    """
+    已经导入的模块，未导入时返回 None
+
+    用于类型判断：例如 numpy 尚未导入时不可能出现 numpy 类型的值，无需为判断而导入
+    """
+    return sys.modules.get(name)
@@ -0,0 +1,180 @@
+"""
+监控指标模块
+以 Prometheus 格式记录请求、大模型调用、语音服务、分析阶段和数据库查询的耗时
+
+安装了 prometheus_client 时启用；设置 PROMETHEUS_MULTIPROC_DIR 环境变量后
+各工作进程把指标写入该目录下的内存映射文件，/metrics 汇总所有进程的数据。
+未安装时所有指标操作为空操作。
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from app.utils.tracing import record_span
+from flask import g, request
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # prometheus_client 为可选依赖，未安装时不记录指标
+    prometheus_client = None
+
+# 耗时较长的外部调用（大模型、语音识别）使用的分桶（秒）
+SLOW_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+
+# 分析阶段使用的分桶（秒）
+STAGE_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+
+
+class _NoopMetric:
+    """未安装 prometheus_client 时使用的空指标"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+
+def _metric(kind, name, documentation, labelnames=(), **kwargs):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labelnames, **kwargs)
+
+
+REQUEST_LATENCY = _metric(
+    'Histogram', 'http_request_duration_seconds', "HTTP请求处理耗时",
+    ('method', 'route', 'status'))
+REQUESTS_IN_FLIGHT = _metric(
+    'Gauge', 'http_requests_in_flight', "正在处理的HTTP请求数",
+    multiprocess_mode='livesum')
+
+LLM_LATENCY = _metric(
+    'Histogram', 'llm_request_duration_seconds', "大模型调用耗时",
+    ('operation', 'status'), buckets=SLOW_BUCKETS)
+LLM_TOKENS = _metric(
+    'Counter', 'llm_tokens', "大模型消耗的token数",
+    ('operation', 'kind'))
+
+SPEECH_DURATION = _metric(
+    'Histogram', 'speech_websocket_duration_seconds', "语音识别/合成WebSocket会话时长",
+    ('service',), buckets=SLOW_BUCKETS)
+
+STAGE_LATENCY = _metric(
+    'Histogram', 'analysis_stage_duration_seconds', "多模态分析各阶段耗时",
+    ('pipeline', 'stage'), buckets=STAGE_BUCKETS)
+
+MEDIA_QUEUE_WAIT = _metric(
+    'Histogram', 'media_queue_wait_seconds', "媒体分析任务从排队到开始处理的等待时间",
+    buckets=SLOW_BUCKETS)
+MEDIA_REJECTED = _metric(
+    'Counter', 'media_requests_rejected', "准入控制拒绝的媒体分析请求数",
+    ('status',))
+MEDIA_CACHE_LOOKUPS = _metric(
+    'Counter', 'media_cache_lookups', "媒体分析缓存的查询次数",
+    ('result',))
+
+DB_QUERY_LATENCY = _metric(
+    'Histogram', 'db_query_duration_seconds', "数据库语句执行耗时",
+    ('backend', 'statement'))
+DB_QUERIES_IN_FLIGHT = _metric(
+    'Gauge', 'db_queries_in_flight', "正在执行的数据库语句数",
+    multiprocess_mode='livesum')
+
+
+@contextmanager
+def timed(histogram, *labels):
+    """记录代码块的耗时"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(*labels).observe(time.perf_counter() - started)
+
+
+class StageTimer:
+    """
+    分阶段计时：每次调用 mark 记录从上一次 mark（或创建时）到现在的耗时，
+    启用链路追踪时同时补记一个名为 "{pipeline}.{stage}" 的 span
+
+        stages = StageTimer('video')
+        ...  # 保存文件
+        stages.mark('save')
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self._last = time.perf_counter()
+        self._last_ns = time.time_ns()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        now_ns = time.time_ns()
+        STAGE_LATENCY.labels(self.pipeline, stage).observe(now - self._last)
+        record_span(f"{self.pipeline}.{stage}", self._last_ns, now_ns)
+        self._last = now
+        self._last_ns = now_ns
+
+
+def statement_type(sql):
+    """SQL语句的类型（首个关键字），作为指标标签"""
+    head = sql.lstrip().split(None, 1)
+    return head[0].upper() if head else ''
+
+
+def init_metrics(app):
+    """为应用注册请求耗时和并发数统计"""
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_request(response):
+        _observe_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def finish_request(exc=None):
+        if 'metrics_started' not in g:
+            return
+        # 未处理的异常不会经过 after_request
+        _observe_request(500)
+        REQUESTS_IN_FLIGHT.dec()
+        g.pop('metrics_started')
+        g.pop('metrics_recorded', None)
+
+
+def _observe_request(status):
+    if g.get('metrics_recorded') or 'metrics_started' not in g:
+        return
+    g.metrics_recorded = True
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    REQUEST_LATENCY.labels(request.method, route, str(status)).observe(
+        time.perf_counter() - g.metrics_started)
+
+
+def render_metrics():
+    """
+    生成 Prometheus 文本格式的指标
+
+    Returns:
+        tuple|None: (内容, 内容类型)，未安装 prometheus_client 时返回 None
+    """
+    if prometheus_client is None:
+        return None
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
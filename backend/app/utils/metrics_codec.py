@@ -0,0 +1,151 @@
+"""
+分析指标编解码模块
+将视频/音频分析指标编码为带版本号的紧凑二进制格式，
+将逐帧时间序列编码为压缩的 NumPy 数组包
+"""
+
+import io
+import json
+import math
+import numbers
+import struct
+
+from app.utils.lazy import loaded_module
+
+# 编码格式版本号，格式变化时递增，解码时按版本分支
+METRICS_VERSION = 1
+
+# 各模态的数值指标，顺序即编码顺序，只能在末尾追加
+METRIC_FIELDS = {
+    'video': ('eyeContact', 'facialExpressions', 'bodyLanguage', 'confidence'),
+    'audio': ('clarity', 'pace', 'tone', 'fillerWordsCount',
+              'speechRate', 'pitchMean', 'duration'),
+}
+
+# 解码时还原为整数的指标
+INTEGER_FIELDS = ('fillerWordsCount',)
+
+# 头部：版本号(1字节) + 字段存在位图(2字节)
+_HEADER = struct.Struct('<BH')
+
+
+def to_number(value):
+    """将数值转换为 float，非数值返回 None"""
+    if isinstance(value, bool) or value is None:
+        return None
+    np = loaded_module('numpy')
+    if np is not None and isinstance(value, (np.float32, np.float16)):
+        # 按自身精度的最短表示转换，避免 7.199999809 这样的值
+        return float(str(value))
+    # numpy 的整数和浮点类型也注册为 numbers.Real
+    if isinstance(value, numbers.Real):
+        value = float(value)
+        return value if math.isfinite(value) else None
+    return None
+
+
+def encode_metrics(modality, data):
+    """
+    编码分析指标
+
+    格式：头部 + 存在的数值指标（float64）+ 其余字段的 JSON（如建议文本）
+
+    Args:
+        modality (str): 'video' 或 'audio'
+        data (dict): 分析数据
+
+    Returns:
+        bytes: 编码结果
+    """
+    fields = METRIC_FIELDS[modality]
+    mask = 0
+    values = []
+    extras = {}
+
+    for key, value in data.items():
+        number = to_number(value) if key in fields else None
+        if number is None:
+            extras[key] = value
+            continue
+        mask |= 1 << fields.index(key)
+
+    for index, key in enumerate(fields):
+        if mask & (1 << index):
+            values.append(to_number(data[key]))
+
+    body = _HEADER.pack(METRICS_VERSION, mask) + struct.pack(f'<{len(values)}d', *values)
+    if extras:
+        body += json.dumps(extras, ensure_ascii=False, default=to_number).encode('utf-8')
+    return body
+
+
+def decode_metrics(modality, blob):
+    """
+    解码分析指标
+
+    Args:
+        modality (str): 'video' 或 'audio'
+        blob (bytes): encode_metrics 的编码结果
+
+    Returns:
+        dict: 分析数据
+    """
+    blob = bytes(blob)
+    version, mask = _HEADER.unpack_from(blob)
+    if version != METRICS_VERSION:
+        raise ValueError(f"不支持的指标编码版本: {version}")
+
+    fields = METRIC_FIELDS[modality]
+    present = [key for index, key in enumerate(fields) if mask & (1 << index)]
+    offset = _HEADER.size
+    values = struct.unpack_from(f'<{len(present)}d', blob, offset)
+    offset += 8 * len(present)
+
+    data = {
+        key: int(value) if key in INTEGER_FIELDS else value
+        for key, value in zip(present, values)
+    }
+    if offset < len(blob):
+        data.update(json.loads(blob[offset:].decode('utf-8')))
+    return data
+
+
+def encode_series(series):
+    """
+    将逐帧时间序列编码为压缩的 .npz 数据
+
+    Args:
+        series (dict): {名称: 数组或列表}，空序列会被忽略
+
+    Returns:
+        bytes|None: 压缩数据，没有任何序列时返回 None
+    """
+    import numpy as np
+
+    arrays = {
+        name: np.asarray(values, dtype=np.float32)
+        for name, values in series.items()
+        if values is not None and len(values)
+    }
+    if not arrays:
+        return None
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def decode_series(blob):
+    """
+    解码时间序列
+
+    Args:
+        blob (bytes): encode_series 的编码结果
+
+    Returns:
+        dict: {名称: numpy 数组}
+    """
+    import numpy as np
+
+    with np.load(io.BytesIO(bytes(blob)), allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
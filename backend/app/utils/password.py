@@ -0,0 +1,223 @@
+"""
+密码哈希模块
+使用 hashlib 提供的 scrypt / PBKDF2 加盐哈希，兼容旧版无盐 SHA-256 格式，
+并在有界线程池中执行耗时的哈希计算，避免登录高峰占满请求线程
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+# 各算法的默认参数
+DEFAULT_ALGORITHM = 'scrypt'
+DEFAULT_SCRYPT_N = 2 ** 14
+DEFAULT_SCRYPT_R = 8
+DEFAULT_SCRYPT_P = 1
+DEFAULT_PBKDF2_ITERATIONS = 600000
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+class PasswordHasherBusy(Exception):
+    """等待哈希计算的请求过多"""
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _b64decode(data):
+    return base64.b64decode(data + '=' * (-len(data) % 4))
+
+
+def _config(key, default):
+    try:
+        return current_app.config.get(key, default)
+    except RuntimeError:
+        # 不在应用上下文中（例如独立脚本）时使用默认值
+        return default
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(
+        password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * n * r * p, dklen=KEY_BYTES
+    )
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac(
+        'sha256', password.encode('utf-8'), salt, iterations, dklen=KEY_BYTES
+    )
+
+
+def _current_params():
+    """返回当前配置的算法及参数"""
+    algorithm = _config('PASSWORD_HASH_ALGORITHM', DEFAULT_ALGORITHM)
+    if algorithm == 'scrypt':
+        return algorithm, (
+            _config('PASSWORD_SCRYPT_N', DEFAULT_SCRYPT_N),
+            _config('PASSWORD_SCRYPT_R', DEFAULT_SCRYPT_R),
+            _config('PASSWORD_SCRYPT_P', DEFAULT_SCRYPT_P),
+        )
+    if algorithm == 'pbkdf2_sha256':
+        return algorithm, (
+            _config('PASSWORD_PBKDF2_ITERATIONS', DEFAULT_PBKDF2_ITERATIONS),
+        )
+    raise ValueError(f"不支持的密码哈希算法: {algorithm}")
+
+
+def hash_password(password):
+    """
+    计算密码哈希
+
+    Args:
+        password (str): 明文密码
+
+    Returns:
+        str: 形如 scrypt$n$r$p$salt$hash 或 pbkdf2_sha256$iterations$salt$hash 的哈希串
+    """
+    algorithm, params = _current_params()
+    return _hash_with(password, algorithm, params)
+
+
+def _hash_with(password, algorithm, params):
+    salt = secrets.token_bytes(SALT_BYTES)
+
+    if algorithm == 'scrypt':
+        digest = _scrypt(password, salt, *params)
+    else:
+        digest = _pbkdf2(password, salt, *params)
+
+    fields = [algorithm, *map(str, params), _b64encode(salt), _b64encode(digest)]
+    return '$'.join(fields)
+
+
+def _is_legacy(stored_hash):
+    """旧版格式：64位十六进制的无盐 SHA-256"""
+    return '$' not in stored_hash and len(stored_hash) == 64
+
+
+def verify_password(password, stored_hash):
+    """
+    校验密码
+
+    Args:
+        password (str): 明文密码
+        stored_hash (str): 数据库中保存的哈希串
+
+    Returns:
+        bool: 密码是否正确
+    """
+    if not stored_hash:
+        return False
+
+    if _is_legacy(stored_hash):
+        candidate = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return hmac.compare_digest(candidate, stored_hash)
+
+    try:
+        algorithm, *fields = stored_hash.split('$')
+        if algorithm == 'scrypt':
+            n, r, p, salt, digest = fields
+            candidate = _scrypt(
+                password, _b64decode(salt), int(n), int(r), int(p))
+        elif algorithm == 'pbkdf2_sha256':
+            iterations, salt, digest = fields
+            candidate = _pbkdf2(password, _b64decode(salt), int(iterations))
+        else:
+            return False
+    except (ValueError, TypeError):
+        return False
+
+    return hmac.compare_digest(candidate, _b64decode(digest))
+
+
+def needs_rehash(stored_hash):
+    """
+    判断哈希是否需要按当前配置重新计算（旧格式或参数已调整）
+
+    Args:
+        stored_hash (str): 数据库中保存的哈希串
+
+    Returns:
+        bool: 是否需要重新哈希
+    """
+    if not stored_hash or _is_legacy(stored_hash):
+        return True
+
+    algorithm, params = _current_params()
+    prefix = '$'.join([algorithm, *map(str, params)]) + '$'
+    return not stored_hash.startswith(prefix)
+
+
+class _HashExecutor:
+    """有界的哈希线程池，限制同时计算和排队的哈希数量"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._pid = None
+
+    def _ensure(self):
+        # 线程池不能跨 fork 使用，子进程中重新创建
+        if self._executor is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                workers = _config('PASSWORD_HASH_WORKERS', 2)
+                queue_size = _config('PASSWORD_HASH_QUEUE', 16)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix='password-hash'
+                )
+                self._slots = threading.BoundedSemaphore(workers + queue_size)
+                self._pid = os.getpid()
+
+    def run(self, func, *args):
+        """
+        在线程池中执行哈希函数并等待结果
+
+        Raises:
+            PasswordHasherBusy: 排队已满或等待超时
+        """
+        self._ensure()
+        timeout = _config('PASSWORD_HASH_TIMEOUT', 10)
+
+        # 排队已满时立即拒绝，不让请求线程堆积在登录上
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("密码校验请求过多")
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+
+        # 计算真正结束后才释放名额，等待超时的任务仍然占用名额
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError as e:
+            raise PasswordHasherBusy("密码校验超时") from e
+
+
+_executor = _HashExecutor()
+
+
+def hash_password_in_pool(password):
+    """在哈希线程池中计算密码哈希"""
+    # 线程池中没有应用上下文，需要在当前线程读取配置
+    algorithm, params = _current_params()
+    return _executor.run(_hash_with, password, algorithm, params)
+
+
+def verify_password_in_pool(password, stored_hash):
+    """在哈希线程池中校验密码"""
+    return _executor.run(verify_password, password, stored_hash)
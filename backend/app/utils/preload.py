@@ -0,0 +1,77 @@
+"""
+gunicorn 预加载模块
+预加载模式下应用只在主进程中创建一次，这里在 fork 工作进程之前预热只读状态
+（职位类型和预设场景缓存、JSON Schema 验证器，以及可选的 OpenCV 分类器和 librosa），
+使工作进程通过写时复制共享这些内存页；fork 之后在工作进程中重建数据库连接和锁
+"""
+
+import gc
+import logging
+import time
+
+from app.utils import cache
+from app.utils.lazy import loaded_module
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+def warm_app(app, media=False, detectors=1):
+    """
+    在 gunicorn 主进程中预热应用的只读状态
+
+    Args:
+        app (Flask): 应用实例
+        media (bool): 是否预加载媒体分析依赖（OpenCV、librosa、numpy）
+        detectors (int): 预先创建的人脸分类器组数，通常等于每个工作进程的线程数
+    """
+    from app.models.interview import interview_presets_cache
+    from app.models.position import position_types_cache
+    from app.schemas.validation import warm_validators
+
+    started = time.perf_counter()
+
+    with app.app_context():
+        position_types_cache.get()
+        interview_presets_cache.get()
+    warm_validators()
+
+    if media:
+        from app.services import audio, video
+
+        video.detectors.warm(detectors)
+        audio.warm_up()
+
+    # 主进程不处理请求，关闭预热时建立的数据库连接，避免工作进程继承同一个连接
+    app.extensions['storage'].dispose()
+
+    logger.info(
+        f"预加载完成: media={media}, 耗时={time.perf_counter() - started:.2f}s"
+    )
+
+
+def freeze_heap():
+    """
+    把主进程中已有的对象移出垃圾回收的跟踪范围
+
+    工作进程中的垃圾回收会修改被遍历对象的引用计数字段，导致共享页被复制；
+    冻结后这些对象不再被遍历。需配合在加载应用前 gc.disable()，避免产生内存空洞
+    """
+    gc.freeze()
+    gc.enable()
+    logger.info(f"已冻结 {gc.get_freeze_count()} 个对象")
+
+
+def after_fork(app):
+    """
+    工作进程 fork 后调用，丢弃从主进程继承的数据库连接和锁
+
+    Args:
+        app (Flask): 应用实例
+    """
+    app.extensions['storage'].dispose()
+    cache.reinit_locks()
+
+    video = loaded_module('app.services.video')
+    if video is not None:
+        video.detectors.reinit_lock()
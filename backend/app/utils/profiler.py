@@ -0,0 +1,375 @@
+"""
+性能剖析模块
+提供低开销的采样剖析器（定时采集各线程的 Python 调用栈）和按请求启用的 cProfile，
+剖析结果保存在 PROFILE_DIR 目录中供管理员下载
+
+采样需要在目标工作进程内进行：请求恰好落在目标进程时直接采样，
+否则把任务写入 PROFILE_DIR/jobs，由目标进程的后台线程领取执行。
+后台线程同时定期在 PROFILE_DIR/workers 下登记进程号，用于列出可选的工作进程
+"""
+
+import cProfile
+import glob
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from flask import make_response
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 支持的采样结果格式及对应的文件后缀
+SAMPLE_FORMATS = {
+    'collapsed': '.collapsed.txt',
+    'speedscope': '.speedscope.json',
+}
+# 按请求剖析结果的文件后缀（pstats 格式）
+REQUEST_PROFILE_SUFFIX = '.prof'
+
+# 管理员在请求中设置此请求头即对该请求启用 cProfile
+PROFILE_HEADER = 'X-Profile'
+
+# 后台线程检查任务和登记进程的间隔（秒）
+WATCH_INTERVAL = 1.0
+
+# 处理媒体时才加载的重量级模块，报告各工作进程是否已加载
+HEAVY_MODULES = ('numpy', 'cv2', 'librosa', 'scipy', 'numba')
+
+_PROFILE_ID = re.compile(r'^[A-Za-z0-9-]+$')
+
+# 当前进程中后台线程所属的进程号，fork 出的子进程需要重新启动线程
+_watcher_pid = None
+_watcher_lock = threading.Lock()
+
+
+class SamplingProfiler:
+    """
+    采样剖析器：后台线程按固定间隔读取所有线程当前的调用栈并计数
+
+    只能看到 Python 栈帧，原生扩展（OpenCV、numpy 等）中的耗时
+    计入调用它的 Python 函数
+    """
+
+    def __init__(self, interval=0.005, exclude=()):
+        self.interval = interval
+        self.samples = Counter()
+        self.ticks = 0
+        self.elapsed = 0.0
+        self._exclude = set(exclude)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        started = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or ident in self._exclude:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_qualname, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stack.reverse()
+                self.samples[tuple(stack)] += 1
+            self.ticks += 1
+        self.elapsed = time.perf_counter() - started
+
+    def _sample_seconds(self):
+        """每个样本代表的实际时长（采样线程可能因 GIL 被推迟）"""
+        return self.elapsed / self.ticks if self.ticks else self.interval
+
+    def collapsed(self):
+        """输出 flamegraph.pl / speedscope 通用的折叠栈格式：每行 "线程;帧;帧 次数" """
+        lines = []
+        for (thread, *calls), count in self.samples.most_common():
+            frames = [thread] + [
+                f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in calls]
+            lines.append(';'.join(frame.replace(';', ',') for frame in frames) + f" {count}")
+        return '\n'.join(lines) + '\n'
+
+    def speedscope(self, name):
+        """输出 speedscope 文件格式，每个线程一个采样剖面"""
+        frames = []
+        frame_index = {}
+        profiles = {}
+        weight = self._sample_seconds()
+
+        for (thread, *calls), count in self.samples.items():
+            stack = []
+            for call in calls:
+                if call not in frame_index:
+                    frame_index[call] = len(frames)
+                    frames.append({'name': call[0], 'file': call[1], 'line': call[2]})
+                stack.append(frame_index[call])
+            profile = profiles.setdefault(thread, {
+                'type': 'sampled', 'name': thread, 'unit': 'seconds',
+                'startValue': 0, 'endValue': 0, 'samples': [], 'weights': [],
+            })
+            profile['samples'].append(stack)
+            profile['weights'].append(count * weight)
+            profile['endValue'] += count * weight
+
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'interview-ai',
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            'profiles': list(profiles.values()),
+        }
+
+    def render(self, fmt, name):
+        """按格式输出采样结果的文本"""
+        if fmt == 'speedscope':
+            return json.dumps(self.speedscope(name))
+        return self.collapsed()
+
+
+def sample(seconds, interval, exclude=()):
+    """在当前进程中采样 seconds 秒并返回剖析器"""
+    profiler = SamplingProfiler(interval, exclude).start()
+    time.sleep(seconds)
+    return profiler.stop()
+
+
+def new_profile_id(kind):
+    return f"{kind}-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def valid_profile_id(profile_id):
+    return bool(_PROFILE_ID.match(profile_id))
+
+
+def _write_atomic(path, data):
+    """先写临时文件再重命名，读取方不会看到写了一半的结果"""
+    temp_path = f"{path}.tmp"
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    with open(temp_path, mode) as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def save_sample(directory, profile_id, fmt, profiler):
+    """保存采样结果，返回文件路径"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, profile_id + SAMPLE_FORMATS[fmt])
+    _write_atomic(path, profiler.render(fmt, profile_id).encode('utf-8'))
+    return path
+
+
+def find_profile(directory, profile_id):
+    """查找已保存的剖析结果文件，不存在时返回 None"""
+    for suffix in (*SAMPLE_FORMATS.values(), REQUEST_PROFILE_SUFFIX):
+        path = os.path.join(directory, profile_id + suffix)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def list_profiles(directory):
+    """列出已保存的剖析结果，按时间从新到旧排列"""
+    profiles = []
+    for path in glob.glob(os.path.join(directory, '*')):
+        if os.path.isdir(path) or path.endswith('.tmp'):
+            continue
+        filename = os.path.basename(path)
+        stat = os.stat(path)
+        profiles.append({
+            'profileId': filename.split('.', 1)[0],
+            'filename': filename,
+            'size': stat.st_size,
+            'createdAt': datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds'),
+        })
+    return sorted(profiles, key=lambda p: p['createdAt'], reverse=True)
+
+
+def live_workers(directory):
+    """最近登记过的工作进程号"""
+    cutoff = time.time() - WATCH_INTERVAL * 5
+    workers = []
+    for path in glob.glob(os.path.join(directory, 'workers', '*[0-9]')):
+        try:
+            if os.stat(path).st_mtime >= cutoff:
+                workers.append(int(os.path.basename(path)))
+        except (OSError, ValueError):
+            continue
+    return sorted(workers)
+
+
+def process_memory(pid):
+    """
+    读取进程的内存占用（依赖 Linux 的 /proc/<pid>/smaps_rollup）
+
+    PSS 按共享页面的进程数分摊，USS 只统计私有页面，
+    两者更能反映 fork 出的工作进程实际占用的内存
+
+    Returns:
+        dict|None: rssBytes / pssBytes / ussBytes，无法读取时返回 None
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                parts = rest.split()
+                if len(parts) == 2 and parts[1] == 'kB':
+                    fields[name] = int(parts[0]) * 1024
+    except OSError:
+        return None
+    return {
+        'rssBytes': fields.get('Rss'),
+        'pssBytes': fields.get('Pss'),
+        'ussBytes': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def worker_status(directory):
+    """最近登记过的工作进程的内存占用和已加载的重量级模块"""
+    workers = []
+    for pid in live_workers(directory):
+        try:
+            with open(os.path.join(directory, 'workers', str(pid))) as f:
+                heartbeat = json.load(f)
+        except (OSError, ValueError):
+            heartbeat = {}
+        workers.append({
+            'pid': pid,
+            'heavyModules': heartbeat.get('heavyModules', []),
+            'memory': process_memory(pid),
+        })
+    return workers
+
+
+def submit_job(directory, pid, seconds, interval, fmt):
+    """
+    为其他工作进程提交采样任务
+
+    Returns:
+        str: 剖析结果ID，任务完成后可按此ID下载
+    """
+    profile_id = new_profile_id(f"sample-{pid}")
+    jobs = os.path.join(directory, 'jobs')
+    os.makedirs(jobs, exist_ok=True)
+    _write_atomic(os.path.join(jobs, f"{pid}.{profile_id}.json"), json.dumps({
+        'profileId': profile_id, 'seconds': seconds, 'interval': interval, 'format': fmt,
+    }))
+    return profile_id
+
+
+def job_pending(directory, profile_id):
+    """任务是否已提交但尚未完成"""
+    return bool(glob.glob(os.path.join(directory, 'jobs', f"*.{profile_id}.json*")))
+
+
+def _run_job(directory, path):
+    # 重命名领取任务，同一任务只执行一次
+    running = f"{path}.running"
+    try:
+        os.rename(path, running)
+    except OSError:
+        return
+    try:
+        with open(running) as f:
+            job = json.load(f)
+        profiler = sample(job['seconds'], job['interval'], exclude=(threading.get_ident(),))
+        save_sample(directory, job['profileId'], job['format'], profiler)
+        logger.info(f"采样剖析 {job['profileId']} 已完成")
+    except Exception as e:
+        logger.exception(f"执行采样剖析任务失败: {str(e)}")
+    finally:
+        os.remove(running)
+
+
+def _run_watcher(directory):
+    pid = os.getpid()
+    heartbeat = os.path.join(directory, 'workers', str(pid))
+    jobs = os.path.join(directory, 'jobs')
+    os.makedirs(os.path.dirname(heartbeat), exist_ok=True)
+    os.makedirs(jobs, exist_ok=True)
+    try:
+        while True:
+            try:
+                _write_atomic(heartbeat, json.dumps({
+                    'heavyModules': [name for name in HEAVY_MODULES if name in sys.modules],
+                }))
+                for path in glob.glob(os.path.join(jobs, f"{pid}.*.json")):
+                    _run_job(directory, path)
+            except Exception as e:
+                logger.exception(f"检查采样剖析任务失败: {str(e)}")
+            time.sleep(WATCH_INTERVAL)
+    finally:
+        try:
+            os.remove(heartbeat)
+        except OSError:
+            pass
+
+
+def ensure_watcher(app):
+    """确保当前进程中运行着领取采样任务的后台线程（与临时文件清理线程一样按进程启动）"""
+    global _watcher_pid
+
+    if _watcher_pid == os.getpid():
+        return
+
+    with _watcher_lock:
+        if _watcher_pid == os.getpid():
+            return
+        _watcher_pid = os.getpid()
+        threading.Thread(
+            target=_run_watcher,
+            args=(app.config['PROFILE_DIR'],),
+            name='profile-watcher',
+            daemon=True
+        ).start()
+
+
+def init_profiling(app):
+    """为应用注册采样任务的后台线程，未配置 PROFILE_DIR 时不启用"""
+    if not app.config.get('PROFILE_DIR'):
+        return
+
+    @app.before_request
+    def start_profile_watcher():
+        ensure_watcher(app)
+
+
+def profile_request(directory, view, *args, **kwargs):
+    """
+    使用 cProfile 执行视图函数，结果保存为 pstats 文件，ID 通过 X-Profile-Id 响应头返回
+
+    流式响应只统计视图函数本身，不包括之后逐块生成响应体的耗时
+    """
+    profiler = cProfile.Profile()
+    response = make_response(profiler.runcall(view, *args, **kwargs))
+
+    profile_id = new_profile_id('request')
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, profile_id + REQUEST_PROFILE_SUFFIX)
+    profiler.dump_stats(f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+    response.headers['X-Profile-Id'] = profile_id
+    return response
@@ -14,8 +14,6 @@ logger = logging.getLogger(__name__)
 def split_audio(audio_path: str, segment_duration: int = 60):
     """将音频文件分割成指定时长的片段"""
     audio_path = Path(audio_path)
-    temp_dir = Path(os.getcwd(), 'temp', 'audios', 'segments')
-    os.makedirs(temp_dir, exist_ok=True)
 
     y, sr = librosa.load(audio_path, sr=None)
     duration = len(y) / sr
@@ -27,29 +25,42 @@ def split_audio(audio_path: str, segment_duration: int = 60):
     num_segments = int(np.ceil(duration / segment_duration))
 
     for i in range(num_segments):
-        start_sample = i * segment_duration * sr
-        end_sample = min((i + 1) * segment_duration * sr, len(y))
-        segment = y[int(start_sample):int(end_sample)]
+        pcm_segment_path = write_segment(y, sr, i, segment_duration, audio_path.stem)
+        if pcm_segment_path is not None:
+            segment_files.append(pcm_segment_path)
+
+    return segment_files
+
 
-        if len(segment) == 0:
-            continue
+def write_segment(y, sr, index, segment_duration, stem):
+    """
+    把第 index 个片段写为 pcm 文件
 
-        segment_path = Path(
-            temp_dir, f"{audio_path.stem}_segment_{i}.wav"
-        )
-        sf.write(str(segment_path), segment, sr)
+    Returns:
+        str: pcm 文件路径，片段为空时返回 None
+    """
+    temp_dir = Path(os.getcwd(), 'temp', 'audios', 'segments')
+    os.makedirs(temp_dir, exist_ok=True)
 
-        # 转换为pcm格式
-        pcm_segment_path = str(segment_path).replace('.wav', '.pcm')
-        wav2pcm(segment_path, pcm_segment_path)
+    start_sample = index * segment_duration * sr
+    end_sample = min((index + 1) * segment_duration * sr, len(y))
+    segment = y[int(start_sample):int(end_sample)]
 
-        segment_files.append(pcm_segment_path)
+    if len(segment) == 0:
+        return None
 
-        # 删除临时wav文件
-        if not current_app.config.get("DEBUG"):
-            try:
-                os.remove(segment_path)
-            except Exception as e:
-                logger.warning(f"无法删除临时音频片段文件 {segment_path}: {str(e)}")
+    segment_path = Path(temp_dir, f"{stem}_segment_{index}.wav")
+    sf.write(str(segment_path), segment, sr)
 
-    return segment_files
+    # 转换为pcm格式
+    pcm_segment_path = str(segment_path).replace('.wav', '.pcm')
+    wav2pcm(segment_path, pcm_segment_path)
+
+    # 删除临时wav文件
+    if not current_app.config.get("DEBUG"):
+        try:
+            os.remove(segment_path)
+        except Exception as e:
+            logger.warning(f"无法删除临时音频片段文件 {segment_path}: {str(e)}")
+
+    return pcm_segment_path
@@ -0,0 +1,161 @@
+"""
+链路追踪模块
+基于 OpenTelemetry 记录请求、数据库语句、大模型调用、语音识别和音视频分析各阶段的 span，
+导出到 OTLP 收集器或本地 JSONL 文件（每行一个 span）以便离线分析
+
+TRACING_EXPORTER 为空时不启用；未安装 opentelemetry-sdk 时所有追踪操作为空操作
+"""
+
+import functools
+import logging
+import os
+from contextlib import contextmanager
+
+from flask import g, request
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import propagate, trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (BatchSpanProcessor,
+                                                ConsoleSpanExporter)
+except ImportError:  # opentelemetry-sdk 为可选依赖，未安装时不记录追踪
+    trace = None
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 启用追踪后的 tracer，未启用时为 None
+_tracer = None
+
+
+def _create_exporter(name, config):
+    """根据配置创建 span 导出器"""
+    if name == 'otlp':
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import \
+                OTLPSpanExporter
+        except ImportError:
+            logger.warning("未安装 opentelemetry-exporter-otlp-proto-http，链路追踪不可用")
+            return None
+        return OTLPSpanExporter(endpoint=config['TRACING_OTLP_ENDPOINT'])
+
+    if name == 'file':
+        path = config['TRACING_FILE']
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # 追加写入，多个工作进程可以共用同一个文件
+        return ConsoleSpanExporter(
+            out=open(path, 'a', encoding='utf-8'),
+            formatter=lambda span: span.to_json(indent=None) + '\n'
+        )
+
+    logger.warning(f"不支持的链路追踪导出方式: {name}")
+    return None
+
+
+def init_tracing(app):
+    """根据配置启用链路追踪，并为每个请求创建一个根 span"""
+    global _tracer
+
+    exporter_name = (app.config.get('TRACING_EXPORTER') or '').lower()
+    if not exporter_name:
+        return
+    if trace is None:
+        logger.warning("未安装 opentelemetry-sdk，链路追踪不可用")
+        return
+
+    exporter = _create_exporter(exporter_name, app.config)
+    if exporter is None:
+        return
+
+    provider = TracerProvider(resource=Resource.create(
+        {'service.name': app.config['TRACING_SERVICE_NAME']}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    _tracer = provider.get_tracer(__name__)
+
+    @app.before_request
+    def start_request_span():
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        # 沿用上游传入的 traceparent
+        span = _tracer.start_span(
+            f"{request.method} {route}",
+            context=propagate.extract(request.headers),
+            kind=trace.SpanKind.SERVER,
+            attributes={'http.method': request.method, 'http.route': route}
+        )
+        g.trace_span = span
+        g.trace_token = otel_context.attach(trace.set_span_in_context(span))
+
+    @app.after_request
+    def record_response_status(response):
+        if 'trace_span' in g:
+            g.trace_span.set_attribute('http.status_code', response.status_code)
+        return response
+
+    @app.teardown_request
+    def end_request_span(exc=None):
+        span = g.pop('trace_span', None)
+        if span is None:
+            return
+        if exc is not None:
+            span.record_exception(exc)
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+        otel_context.detach(g.pop('trace_token'))
+        span.end()
+
+
+def tracing_enabled():
+    return _tracer is not None
+
+
+@contextmanager
+def span(name, **attributes):
+    """在代码块外创建一个子 span，未启用追踪时返回 None"""
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes or None) as current:
+        yield current
+
+
+def traced(name):
+    """装饰器：为函数调用创建一个子 span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.start_as_current_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_span(name, start_ns, end_ns, **attributes):
+    """
+    补记一个已经结束的 span（用于分阶段计时等无法用代码块包围的场景）
+
+    Args:
+        name (str): span 名称
+        start_ns (int): 开始时间（纳秒时间戳）
+        end_ns (int): 结束时间（纳秒时间戳）
+        **attributes: span 属性
+    """
+    if _tracer is None:
+        return
+    _tracer.start_span(name, start_time=start_ns, attributes=attributes or None).end(
+        end_time=end_ns)
+
+
+def current_span():
+    """当前的 span，未启用追踪时返回 None"""
+    if _tracer is None:
+        return None
+    return trace.get_current_span()
+
+
+def add_event(span, name, **attributes):
+    """在 span 上记录一个事件，span 为 None 时忽略"""
+    if span is not None:
+        span.add_event(name, attributes=attributes or None)
@@ -0,0 +1,4 @@
+"""
+性能基准测试模块
+在 backend 目录下以 python -m benchmarks.<名称> 的方式运行
+"""
@@ -0,0 +1,144 @@
+"""
+数据库写入基准测试
+模拟 answer_question 结束面试时的写操作（更新回答、保存最终评估、更新会话状态），
+比较逐条提交、工作单元合并提交以及开启组提交时的吞吐量
+
+用法:
+    python -m benchmarks.db_commits --threads 8 --requests 200
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from app.models.interview import (FinalEvaluation, InterviewQuestion,
+                                  InterviewSession)
+from app.utils.db import close_db, init_db, init_storage, transaction
+from config import config
+from flask import Flask
+
+# 每个请求的写操作次数
+WRITES_PER_REQUEST = 3
+
+
+def _create_app(database, group_commit):
+    app = Flask(__name__)
+    app.config.from_object(config['production'])
+    app.config['DATABASE'] = database
+    app.config['DATABASE_BACKEND'] = 'sqlite'
+    app.config['DATABASE_GROUP_COMMIT'] = group_commit
+    init_storage(app)
+    app.teardown_appcontext(close_db)
+    with app.app_context():
+        init_db()
+    return app
+
+
+def _write_turn(question_id, session_id):
+    """一次面试结束请求中的全部写操作"""
+    InterviewQuestion.update_answer_and_evaluation(
+        question_id, "基准测试回答", '{"score": 8}'
+    )
+    FinalEvaluation.create(
+        session_id, 80, 80, 80, 80, ["优势"], ["改进"], "建议"
+    )
+    InterviewSession.update_status(session_id, "completed", datetime.now())
+
+
+def run_mode(mode, threads, requests_per_thread):
+    """
+    运行一种写入模式
+
+    Args:
+        mode (str): per-write / unit-of-work / group-commit
+        threads (int): 并发线程数
+        requests_per_thread (int): 每个线程的请求数
+
+    Returns:
+        dict: 测试结果
+    """
+    fd, database = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    try:
+        app = _create_app(database, group_commit=(mode == 'group-commit'))
+
+        # 预先为每个请求创建会话和问题
+        fixtures = []
+        with app.app_context():
+            with transaction():
+                for _ in range(threads * requests_per_thread):
+                    session_id = InterviewSession.create("软件工程师", "中级")
+                    question_id = InterviewQuestion.create(
+                        session_id, "基准测试问题", 0)
+                    fixtures.append((question_id, session_id))
+
+        errors = 0
+        lock = threading.Lock()
+
+        def worker(items):
+            nonlocal errors
+            for question_id, session_id in items:
+                with app.app_context():
+                    try:
+                        if mode == 'per-write':
+                            _write_turn(question_id, session_id)
+                        else:
+                            with transaction():
+                                _write_turn(question_id, session_id)
+                    except Exception:
+                        with lock:
+                            errors += 1
+
+        chunks = [fixtures[i::threads] for i in range(threads)]
+        pool = [threading.Thread(target=worker, args=(chunk,))
+                for chunk in chunks]
+
+        started = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        wall = time.perf_counter() - started
+
+        total = len(fixtures) - errors
+        commits = total * (WRITES_PER_REQUEST if mode == 'per-write' else 1)
+        return {
+            "mode": mode,
+            "threads": threads,
+            "requests": total,
+            "errors": errors,
+            "seconds": round(wall, 3),
+            "requestsPerSecond": round(total / wall, 1),
+            "commitsPerSecond": round(commits / wall, 1),
+        }
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            try:
+                os.remove(database + suffix)
+            except OSError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库写入吞吐量基准测试")
+    parser.add_argument('--threads', type=int, default=4, help="并发线程数")
+    parser.add_argument('--requests', type=int, default=100,
+                        help="每个线程的请求数")
+    parser.add_argument('--modes', default='per-write,unit-of-work,group-commit',
+                        help="要测试的模式，逗号分隔")
+    args = parser.parse_args()
+
+    results = [
+        run_mode(mode, args.threads, args.requests)
+        for mode in args.modes.split(',')
+    ]
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
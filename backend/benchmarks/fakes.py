@@ -0,0 +1,402 @@
+"""
+讯飞开放平台的本地模拟服务
+实现星火大模型对话、语音听写（IAT）和语音合成（TTS）三个 WebSocket 接口的最小协议，
+可配置首包延迟和输出速率，供基准测试在离线环境下替代真实服务
+
+用法:
+    python -m benchmarks.fakes --llm-latency 0.5 --token-rate 40
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import socketserver
+import struct
+import threading
+import time
+import uuid
+
+# RFC 6455 握手使用的固定 GUID
+_WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+# 帧类型
+_OP_CONTINUATION = 0x0
+_OP_TEXT = 0x1
+_OP_CLOSE = 0x8
+_OP_PING = 0x9
+_OP_PONG = 0xA
+
+# 模拟的面试问题
+QUESTION_RESPONSES = (
+    "请介绍一个你主导的项目，以及你在其中遇到的最大技术挑战和解决方式。",
+    "在高并发场景下，你会如何设计缓存和数据库之间的一致性方案？",
+    "请描述一次你与团队成员意见不一致的经历，你是如何处理的？",
+    "如果线上服务的响应时间突然变慢，你会按什么步骤排查问题？",
+)
+
+# 模拟的单题评估（与 evaluate_answer 要求的 JSON 结构一致）
+EVALUATION_RESPONSE = json.dumps({
+    "score": 8,
+    "strengths": ["结构清晰", "举例具体", "表达流畅"],
+    "weaknesses": ["缺少量化结果", "对风险考虑不足"],
+    "suggestions": "补充项目中的具体数据，说明你在团队中的角色。",
+    "feedback": "整体回答较好，逻辑清楚。"
+}, ensure_ascii=False, indent=2)
+
+
+def _final_response(question_count):
+    """模拟的最终评估（与 generate_final_evaluation 要求的 JSON 结构一致）"""
+    return "```json\n" + json.dumps({
+        "overallScore": 78,
+        "contentScore": 80,
+        "deliveryScore": 75,
+        "nonVerbalScore": 72,
+        "strengths": ["专业基础扎实", "沟通积极", "思路清晰"],
+        "improvements": ["回答略显冗长", "眼神交流不足", "缺少数据支撑"],
+        "recommendations": "建议在回答中使用STAR结构，并控制每个回答的时长。",
+        "questionScores": [
+            {"question": f"问题{i + 1}", "score": 70 + i, "feedback": "回答切题，但可以更具体。"}
+            for i in range(question_count)
+        ]
+    }, ensure_ascii=False, indent=2) + "\n```"
+
+
+# 模拟的语音识别文本，包含部分填充词
+TRANSCRIPT_SNIPPETS = (
+    "嗯我之前负责的是一个订单系统",
+    "然后我们主要解决的是高峰期的性能问题",
+    "其实当时的瓶颈在数据库",
+    "就是通过缓存和异步队列来削峰",
+    "所以最后延迟降低了一半左右",
+)
+
+
+class WebSocketConnection:
+    """服务端的 WebSocket 连接（只支持文本帧，不支持扩展）"""
+
+    def __init__(self, rfile, wfile):
+        self._rfile = rfile
+        self._wfile = wfile
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def _read(self, size):
+        data = self._rfile.read(size)
+        if len(data) < size:
+            raise ConnectionError("连接已断开")
+        return data
+
+    def _send_frame(self, opcode, payload=b''):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+        with self._lock:
+            self._wfile.write(header + payload)
+            self._wfile.flush()
+
+    def recv(self):
+        """
+        接收一条文本消息
+
+        Returns:
+            str|None: 消息内容，连接关闭时返回 None
+        """
+        if self.closed:
+            return None
+
+        message = []
+        try:
+            while True:
+                first, second = self._read(2)
+                opcode = first & 0x0F
+                length = second & 0x7F
+                if length == 126:
+                    length = struct.unpack('!H', self._read(2))[0]
+                elif length == 127:
+                    length = struct.unpack('!Q', self._read(8))[0]
+                mask = self._read(4) if second & 0x80 else None
+                payload = self._read(length)
+                if mask and length:
+                    # 整块异或解除掩码，比逐字节处理快得多
+                    key = (mask * (length // 4 + 1))[:length]
+                    payload = (int.from_bytes(payload, 'big') ^
+                               int.from_bytes(key, 'big')).to_bytes(length, 'big')
+
+                if opcode == _OP_CLOSE:
+                    self.close()
+                    return None
+                if opcode == _OP_PING:
+                    self._send_frame(_OP_PONG, payload)
+                    continue
+                if opcode == _OP_PONG:
+                    continue
+                if opcode in (_OP_TEXT, _OP_CONTINUATION):
+                    message.append(payload)
+                if first & 0x80:
+                    return b''.join(message).decode('utf-8')
+        except (ConnectionError, OSError, ValueError):
+            self.closed = True
+            return None
+
+    def send(self, text):
+        if not self.closed:
+            self._send_frame(_OP_TEXT, text.encode('utf-8'))
+
+    def send_json(self, obj):
+        self.send(json.dumps(obj, ensure_ascii=False))
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._send_frame(_OP_CLOSE, struct.pack('!H', 1000))
+        except OSError:
+            pass
+
+
+class _HandshakeHandler(socketserver.StreamRequestHandler):
+    """完成 HTTP 升级握手后把连接交给服务的会话函数"""
+
+    def handle(self):
+        request_line = self.rfile.readline()
+        if not request_line:
+            return
+        headers = {}
+        while True:
+            line = self.rfile.readline().decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        key = headers.get('sec-websocket-key')
+        if not key:
+            self.wfile.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            return
+
+        accept = base64.b64encode(
+            hashlib.sha1((key + _WEBSOCKET_GUID).encode('ascii')).digest()).decode('ascii')
+        self.wfile.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode('ascii')
+        )
+        self.wfile.flush()
+
+        self.server.connections += 1
+        connection = WebSocketConnection(self.rfile, self.wfile)
+        try:
+            self.server.session(connection)
+        finally:
+            connection.close()
+
+
+class FakeServer(socketserver.ThreadingTCPServer):
+    """在本地随机端口上运行的模拟 WebSocket 服务"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, path, session):
+        super().__init__(('127.0.0.1', 0), _HandshakeHandler)
+        self.path = path
+        self.session = session
+        self.connections = 0
+        self._thread = threading.Thread(
+            target=self.serve_forever, name=f"fake-ws{path}", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"ws://{host}:{port}{self.path}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def spark_session(latency, token_rate, chars_per_token=2, tokens_per_frame=8):
+    """
+    星火大模型对话接口：按提示词返回问题、单题评估或最终评估，分帧流式输出
+
+    Args:
+        latency (float): 收到请求到输出首个 token 的延迟（秒）
+        token_rate (float): 每秒输出的 token 数
+        chars_per_token (int): 每个 token 对应的字符数
+        tokens_per_frame (int): 每帧包含的 token 数
+    """
+    def session(connection):
+        message = connection.recv()
+        if message is None:
+            return
+        request = json.loads(message)
+        prompt = request['payload']['message']['text'][-1]['content']
+
+        if 'overallScore' in prompt:
+            text = _final_response(prompt.count('\n问题'))
+        elif '"score"' in prompt:
+            text = EVALUATION_RESPONSE
+        else:
+            text = random.choice(QUESTION_RESPONSES)
+
+        time.sleep(latency)
+        frame_chars = chars_per_token * tokens_per_frame
+        frames = [text[i:i + frame_chars] for i in range(0, len(text), frame_chars)]
+        sid = f"cht{uuid.uuid4().hex[:16]}"
+        for index, content in enumerate(frames):
+            last = index == len(frames) - 1
+            payload = {'choices': {'status': 2 if last else 1, 'seq': index,
+                                   'text': [{'content': content, 'role': 'assistant', 'index': 0}]}}
+            if last:
+                completion = -(-len(text) // chars_per_token)
+                prompt_tokens = -(-len(prompt) // chars_per_token)
+                payload['usage'] = {'text': {
+                    'prompt_tokens': prompt_tokens,
+                    'completion_tokens': completion,
+                    'total_tokens': prompt_tokens + completion,
+                }}
+            connection.send_json({
+                'header': {'code': 0, 'message': 'Success', 'sid': sid, 'status': payload['choices']['status']},
+                'payload': payload,
+            })
+            if not last and token_rate > 0:
+                time.sleep(tokens_per_frame / token_rate)
+        # 等待客户端关闭连接
+        connection.recv()
+
+    return session
+
+
+def iat_session(latency, frames_per_result=25):
+    """
+    语音听写接口：每收到若干帧音频返回一段识别文本，收到最后一帧后返回结束结果
+
+    Args:
+        latency (float): 每次返回识别结果前的处理延迟（秒）
+        frames_per_result (int): 每多少帧音频返回一次识别结果（客户端每帧约 0.25 秒音频）
+    """
+    def result(connection, sid, status):
+        time.sleep(latency)
+        words = [{'cw': [{'w': word, 'sc': 0}], 'bg': 0}
+                 for word in random.choice(TRANSCRIPT_SNIPPETS)]
+        connection.send_json({
+            'code': 0, 'message': 'success', 'sid': sid,
+            'data': {'status': status, 'result': {'sn': 1, 'ls': status == 2, 'ws': words}},
+        })
+
+    def session(connection):
+        sid = f"iat{uuid.uuid4().hex[:16]}"
+        received = 0
+        while True:
+            message = connection.recv()
+            if message is None:
+                return
+            status = json.loads(message).get('data', {}).get('status')
+            received += 1
+            if status == 2:
+                result(connection, sid, 2)
+                # 继续读取直到客户端关闭连接
+                while connection.recv() is not None:
+                    pass
+                return
+            if received % frames_per_result == 0:
+                result(connection, sid, 1)
+
+    return session
+
+
+def tts_session(latency, realtime_factor, sample_rate=16000, seconds_per_char=0.25, chunk_bytes=8000):
+    """
+    语音合成接口：按文本长度生成静音 PCM 音频，分帧流式返回
+
+    Args:
+        latency (float): 首帧延迟（秒）
+        realtime_factor (float): 合成速度相对于实时播放的倍数（0 表示不限速）
+        sample_rate (int): 采样率
+        seconds_per_char (float): 每个字符对应的音频时长（秒）
+        chunk_bytes (int): 每帧音频的字节数
+    """
+    def session(connection):
+        message = connection.recv()
+        if message is None:
+            return
+        text = base64.b64decode(json.loads(message)['data']['text']).decode('utf-8')
+        audio = bytes(int(len(text) * seconds_per_char * sample_rate) * 2)
+
+        time.sleep(latency)
+        sid = f"tts{uuid.uuid4().hex[:16]}"
+        chunks = [audio[i:i + chunk_bytes] for i in range(0, len(audio), chunk_bytes)] or [b'']
+        for index, chunk in enumerate(chunks):
+            last = index == len(chunks) - 1
+            connection.send_json({
+                'code': 0, 'message': 'success', 'sid': sid,
+                'data': {'audio': base64.b64encode(chunk).decode('ascii'),
+                         'status': 2 if last else 1, 'ced': str(index)},
+            })
+            if not last and realtime_factor > 0:
+                time.sleep(len(chunk) / 2 / sample_rate / realtime_factor)
+        connection.recv()
+
+    return session
+
+
+def start_fakes(llm_latency=0.5, token_rate=40, stt_latency=0.05, tts_latency=0.2,
+                tts_realtime_factor=5):
+    """
+    启动三个模拟服务
+
+    Returns:
+        dict: {'spark': FakeServer, 'iat': FakeServer, 'tts': FakeServer}
+    """
+    return {
+        'spark': FakeServer('/v3.5/chat', spark_session(llm_latency, token_rate)).start(),
+        'iat': FakeServer('/v2/iat', iat_session(stt_latency)).start(),
+        'tts': FakeServer('/v2/tts', tts_session(tts_latency, tts_realtime_factor)).start(),
+    }
+
+
+def fake_environment(fakes):
+    """让应用连接模拟服务所需的环境变量（需在导入 app 之前设置）"""
+    return {
+        'XUNFEI_APP_ID': 'benchmark',
+        'XUNFEI_API_KEY': 'benchmark',
+        'XUNFEI_API_SECRET': 'benchmark',
+        'USE_MOCK_MODE': 'False',
+        'XUNFEI_SPARK_URL': fakes['spark'].url,
+        'XUNFEI_IAT_URL': fakes['iat'].url,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="运行讯飞开放平台的本地模拟服务")
+    parser.add_argument('--llm-latency', type=float, default=0.5, help="大模型首个 token 延迟（秒）")
+    parser.add_argument('--token-rate', type=float, default=40, help="大模型每秒输出的 token 数")
+    parser.add_argument('--stt-latency', type=float, default=0.05, help="语音识别每次返回结果的延迟（秒）")
+    parser.add_argument('--tts-latency', type=float, default=0.2, help="语音合成首帧延迟（秒）")
+    args = parser.parse_args()
+
+    fakes = start_fakes(args.llm_latency, args.token_rate, args.stt_latency, args.tts_latency)
+    for name, value in fake_environment(fakes).items():
+        print(f"export {name}={value}")
+    print(f"# TTS: {fakes['tts'].url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+"""
+面试流程端到端基准测试
+在本地启动星火大模型、语音听写和语音合成的模拟服务，以多个并发的脚本化面试会话
+（开始面试 -> 每题上传视频并回答 -> 多次读取结果）驱动完整应用，
+统计 /start_interview、/answer_question、/multimodal_analysis、/interview_results
+的吞吐量和 p50/p95/p99 延迟，结果连同当前提交号保存为 JSON 以便跨提交对比
+
+用法:
+    python -m benchmarks.interview_flow --sessions 20 --concurrency 4
+    python -m benchmarks.interview_flow --compare benchmarks/results/<上一次结果>.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.fakes import fake_environment, start_fakes
+from benchmarks.media import ffmpeg_available, synthetic_interview_video
+
+ENDPOINTS = ('start_interview', 'answer_question', 'multimodal_analysis', 'interview_results')
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+PASSWORD = 'benchmark-password'
+
+
+def percentile(values, p):
+    """最近秩法计算百分位数，values 需已排序"""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+
+class Recorder:
+    """线程安全地记录各接口每次请求的耗时和是否成功"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {name: [] for name in ENDPOINTS}
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        outcome = {'ok': False}
+        started = time.perf_counter()
+        try:
+            yield outcome
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._samples[name].append((elapsed, outcome['ok']))
+
+    def summary(self, wall):
+        result = {}
+        for name, samples in self._samples.items():
+            latencies = sorted(elapsed for elapsed, ok in samples if ok)
+            result[name] = {
+                'requests': len(samples),
+                'errors': sum(1 for _, ok in samples if not ok),
+                'throughput': round(len(latencies) / wall, 2) if wall else None,
+                'meanMs': round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+                **{f"p{p}Ms": round(percentile(latencies, p) * 1000, 1) if latencies else None
+                   for p in (50, 95, 99)},
+            }
+        return result
+
+
+def _request(recorder, name, send):
+    """发送请求并记录耗时，返回响应（失败时返回 None）"""
+    with recorder.measure(name) as outcome:
+        response = send()
+        # 读取完整响应体（包括流式响应）
+        response.get_data()
+        outcome['ok'] = response.status_code < 400
+    return response if outcome['ok'] else None
+
+
+def run_session(app, token, recorder, questions, video, result_reads):
+    """执行一次完整的脚本化面试"""
+    client = app.test_client()
+    headers = {'Authorization': f"Bearer {token}"}
+
+    response = _request(recorder, 'start_interview', lambda: client.post(
+        '/start_interview', headers=headers,
+        json={'positionType': '软件工程师', 'difficulty': '中级', 'questionCount': questions}))
+    if response is None:
+        return
+    session_id = response.get_json()['session_id']
+
+    for index in range(questions):
+        if video is not None:
+            _request(recorder, 'multimodal_analysis', lambda: client.post(
+                '/multimodal_analysis', headers=headers,
+                data={'video': (io.BytesIO(video), 'answer.mkv'), 'session_id': session_id},
+                content_type='multipart/form-data'))
+        if _request(recorder, 'answer_question', lambda: client.post(
+                '/answer_question', headers=headers,
+                json={'session_id': session_id,
+                      'answer': f"第{index + 1}题的回答：我主导过一个订单系统的性能优化项目。" * 3})) is None:
+            return
+
+    for _ in range(result_reads):
+        _request(recorder, 'interview_results', lambda: client.get(
+            f"/interview_results/{session_id}", headers=headers))
+
+
+def _create_users(app, count):
+    """注册基准测试用户并登录，返回令牌列表（不计入测试结果）"""
+    client = app.test_client()
+    tokens = []
+    for index in range(count):
+        username = f"bench_{index}"
+        client.post('/auth/register', json={'username': username, 'password': PASSWORD})
+        response = client.post('/auth/login', json={'username': username, 'password': PASSWORD})
+        tokens.append(response.get_json()['token'])
+    return tokens
+
+
+def measure_tts(url, requests, text="请介绍一下你在上一个项目中承担的职责。"):
+    """直接调用语音合成客户端，统计单次合成的耗时（应用接口中没有用到语音合成）"""
+    from app.services.xfyun_services import SpeechSynthesis
+
+    latencies = []
+    with tempfile.TemporaryDirectory() as workdir:
+        output = os.path.join(workdir, 'output.pcm')
+        # 语音合成客户端会打印大量调试输出
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            for _ in range(requests):
+                started = time.perf_counter()
+                SpeechSynthesis(url, 'benchmark', 'benchmark', 'benchmark', text).synthesize(output)
+                latencies.append(time.perf_counter() - started)
+
+    import websocket
+    websocket.enableTrace(False)
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        **{f"p{p}Ms": round(percentile(latencies, p) * 1000, 1) if latencies else None
+           for p in (50, 95, 99)},
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(__file__), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    """
+    运行基准测试
+
+    Returns:
+        dict: 测试结果
+    """
+    fakes = start_fakes(args.llm_latency, args.token_rate, args.stt_latency)
+    workdir = tempfile.mkdtemp(prefix='interview-bench-')
+
+    # 服务地址和凭证在应用模块导入时读取，必须先设置环境变量再导入应用
+    os.environ.update(fake_environment(fakes))
+    os.environ['DATABASE_PATH'] = os.path.join(workdir, 'benchmark.db')
+    from app import create_app
+
+    app = create_app('production')
+
+    video = None
+    skipped = None
+    if args.no_video:
+        skipped = "已通过 --no-video 跳过"
+    elif not ffmpeg_available():
+        skipped = "未安装 ffmpeg，跳过 /multimodal_analysis"
+    else:
+        path = synthetic_interview_video(
+            os.path.join(workdir, 'answer.mkv'), args.video_seconds)
+        with open(path, 'rb') as f:
+            video = f.read()
+
+    tokens = _create_users(app, args.sessions)
+    recorder = Recorder()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [
+            pool.submit(run_session, app, token, recorder,
+                        args.questions, video, args.result_reads)
+            for token in tokens
+        ]
+        for future in futures:
+            future.result()
+    wall = time.perf_counter() - started
+
+    endpoints = recorder.summary(wall)
+    if skipped:
+        endpoints['multimodal_analysis']['skipped'] = skipped
+
+    result = {
+        'benchmark': 'interview_flow',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'parameters': {key: value for key, value in vars(args).items()
+                       if key not in ('output', 'compare')},
+        'wallSeconds': round(wall, 3),
+        'sessionsPerSecond': round(args.sessions / wall, 3),
+        'endpoints': endpoints,
+        'fakeConnections': {name: server.connections for name, server in fakes.items()},
+    }
+    if args.tts_requests:
+        result['tts'] = measure_tts(fakes['tts'].url, args.tts_requests)
+
+    for server in fakes.values():
+        server.stop()
+    return result
+
+
+def compare(current, previous):
+    """打印与上一次结果相比各接口 p50/p95 的变化"""
+    print(f"对比 {(previous.get('commit') or '')[:8]} ({previous.get('timestamp')}) -> "
+          f"{(current.get('commit') or '')[:8]} ({current.get('timestamp')})")
+    for name in ENDPOINTS:
+        before = previous.get('endpoints', {}).get(name, {})
+        after = current['endpoints'].get(name, {})
+        changes = []
+        for key in ('p50Ms', 'p95Ms', 'throughput'):
+            if before.get(key) and after.get(key):
+                changes.append(f"{key} {before[key]} -> {after[key]} "
+                               f"({(after[key] / before[key] - 1) * 100:+.1f}%)")
+        print(f"  {name}: {'; '.join(changes) or '无可比数据'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="面试流程端到端基准测试")
+    parser.add_argument('--sessions', type=int, default=8, help="面试会话数")
+    parser.add_argument('--concurrency', type=int, default=4, help="并发会话数")
+    parser.add_argument('--questions', type=int, default=3, help="每个会话的问题数")
+    parser.add_argument('--result-reads', type=int, default=3, help="每个会话结束后读取结果的次数")
+    parser.add_argument('--video-seconds', type=float, default=5, help="每题上传的合成视频时长（秒）")
+    parser.add_argument('--no-video', action='store_true', help="不测试多模态分析接口")
+    parser.add_argument('--llm-latency', type=float, default=0.5, help="模拟大模型首个 token 延迟（秒）")
+    parser.add_argument('--token-rate', type=float, default=40, help="模拟大模型每秒输出的 token 数")
+    parser.add_argument('--stt-latency', type=float, default=0.05, help="模拟语音识别返回结果的延迟（秒）")
+    parser.add_argument('--tts-requests', type=int, default=5, help="语音合成测试次数（0 表示不测试）")
+    parser.add_argument('--output', help="结果文件路径，默认保存到 benchmarks/results/")
+    parser.add_argument('--compare', help="与之前保存的结果文件对比")
+    args = parser.parse_args()
+
+    result = run(args)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(
+            RESULTS_DIR,
+            f"interview_flow-{datetime.now():%Y%m%d-%H%M%S}-{(result['commit'] or 'nogit')[:8]}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(f"结果已保存到 {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(result, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
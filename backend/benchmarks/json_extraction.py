@@ -0,0 +1,114 @@
+"""
+模型输出JSON提取与校验基准测试
+对比旧版多策略提取 + 每次构建验证器的实现与当前实现的耗时
+
+语料位于 benchmarks/data/llm_outputs.json，覆盖纯JSON、```json 代码块、
+前后夹杂说明文字、截断输出和不含JSON的回复等情况
+
+用法:
+    python -m benchmarks.json_extraction --rounds 2000
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+from jsonschema import ValidationError, validate
+
+from app.schemas.validation import (INTERVIEW_EVALUATION_SCHEMA,
+                                    extract_evaluation_from_text,
+                                    validate_json)
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'llm_outputs.json')
+
+
+def legacy_extract(text):
+    """旧版实现：整体解析、代码块正则、贪婪花括号正则依次尝试"""
+    try:
+        try:
+            return json.loads(text)
+        except Exception:
+            pass
+
+        json_match = re.search(r'```json\s*([\s\S]*?)\s*```', text)
+        if json_match:
+            return json.loads(json_match.group(1))
+
+        json_match = re.search(r'(\{[\s\S]*\})', text)
+        if json_match:
+            return json.loads(json_match.group(1))
+
+        return None
+    except json.decoder.JSONDecodeError:
+        return None
+
+
+def legacy_validate(data, schema):
+    """旧版实现：每次调用都检查 Schema 并构建验证器"""
+    try:
+        validate(instance=data, schema=schema)
+        return True, None
+    except ValidationError as e:
+        return False, str(e)
+
+
+def _time(func, corpus, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in corpus:
+            func(text)
+    elapsed = time.perf_counter() - started
+    return round(elapsed / (rounds * len(corpus)) * 1e6, 2)
+
+
+def run(rounds):
+    """
+    运行基准测试
+
+    Args:
+        rounds (int): 语料重复次数
+
+    Returns:
+        dict: 每条输出的平均耗时（微秒）及两种实现的提取结果差异
+    """
+    with open(CORPUS_PATH, encoding='utf-8') as fp:
+        corpus = json.load(fp)
+
+    def legacy_pipeline(text):
+        data = legacy_extract(text)
+        if isinstance(data, dict):
+            legacy_validate(data, INTERVIEW_EVALUATION_SCHEMA)
+
+    def current_pipeline(text):
+        data = extract_evaluation_from_text(text)
+        if isinstance(data, dict):
+            validate_json(data, INTERVIEW_EVALUATION_SCHEMA)
+
+    extracted = [extract_evaluation_from_text(text) for text in corpus]
+    mismatches = sum(
+        1 for text, data in zip(corpus, extracted) if legacy_extract(text) != data
+    )
+
+    return {
+        "samples": len(corpus),
+        "extracted": sum(1 for data in extracted if data is not None),
+        "mismatchesWithLegacy": mismatches,
+        "legacyExtractUs": _time(legacy_extract, corpus, rounds),
+        "extractUs": _time(extract_evaluation_from_text, corpus, rounds),
+        "legacyPipelineUs": _time(legacy_pipeline, corpus, rounds),
+        "pipelineUs": _time(current_pipeline, corpus, rounds),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模型输出JSON提取基准测试")
+    parser.add_argument('--rounds', type=int, default=1000, help="语料重复次数")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.rounds), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+JSON序列化基准测试
+对比 Flask 默认 provider、应用 provider（标准库回退 / orjson）以及流式输出
+在 /admin/sessions 和 /interview_results 典型响应上的耗时
+
+用法:
+    python -m benchmarks.json_serialization --sessions 1000 --rounds 200
+"""
+
+import argparse
+import json
+import time
+
+import app.utils.json_provider as json_provider
+import numpy as np
+from app.utils.json_provider import AppJSONProvider, stream_json_list
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+
+def sessions_payload(count):
+    """构造 /admin/sessions 的响应数据"""
+    sessions = [
+        {
+            'sessionId': f"5f0c6a1e-0000-4000-8000-{i:012d}",
+            'positionType': ['软件工程师', '产品经理', '数据分析师'][i % 3],
+            'difficulty': ['初级', '中级', '高级'][i % 3],
+            'startTime': '2025-04-01 10:00:00.000000',
+            'endTime': '2025-04-01 10:25:30.000000',
+            'status': 'completed',
+            'questionCount': 5,
+            'answeredCount': 5,
+            'duration': 25.5,
+            'userId': i % 50,
+            'username': f"user{i % 50}"
+        }
+        for i in range(count)
+    ]
+    return {"sessions": sessions, "total": count, "limit": count, "offset": 0}
+
+
+def results_payload():
+    """构造 /interview_results 的响应数据，音频分析中包含 numpy 数值"""
+    feedback = json.dumps({
+        "score": 8,
+        "strengths": ["结构清晰", "举例具体", "表达流畅"],
+        "weaknesses": ["缺少量化结果", "对风险考虑不足"],
+        "suggestions": "补充项目中的具体数据，说明你在团队中的角色。" * 3,
+        "feedback": "整体回答较好，逻辑清楚。" * 3
+    }, ensure_ascii=False)
+    return {
+        'overallScore': 78,
+        'contentScore': 80,
+        'deliveryScore': 75,
+        'nonVerbalScore': 72,
+        'strengths': ["专业基础扎实", "沟通积极", "思路清晰"],
+        'improvements': ["回答略显冗长", "眼神交流不足", "缺少数据支撑"],
+        'questionScores': [
+            {
+                'question': f"请介绍一个你主导的项目，以及你在其中遇到的最大挑战（{i}）",
+                'answer': "在上一家公司我负责重构订单系统……" * 20,
+                'score': 80,
+                'feedback': feedback
+            }
+            for i in range(5)
+        ],
+        'videoAnalysis': {
+            "eyeContact": 7.2, "facialExpressions": 6.8,
+            "bodyLanguage": 7.5, "confidence": 7.0,
+            "recommendations": "保持良好的眼神接触和面部表情。"
+        },
+        'audioAnalysis': {
+            "clarity": np.float32(7.2), "pace": np.float32(6.5),
+            "tone": np.float32(7.8), "fillerWordsCount": np.int64(3),
+            "speechRate": np.float32(182.4), "pitchMean": np.float32(211.7)
+        },
+        'recommendations': "建议在回答中使用STAR结构，并控制每个回答的时长。"
+    }
+
+
+def _time(func, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return round((time.perf_counter() - started) / rounds * 1e6, 1)
+
+
+def run(session_count, rounds):
+    """
+    运行基准测试
+
+    Args:
+        session_count (int): 会话列表长度
+        rounds (int): 每项测试的重复次数
+
+    Returns:
+        dict: 每次序列化的平均耗时（微秒）和响应大小（字节）
+    """
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    app_provider = AppJSONProvider(app)
+    app.json = app_provider
+
+    payloads = {
+        "adminSessions": sessions_payload(session_count),
+        "interviewResults": results_payload(),
+    }
+    orjson = json_provider.orjson
+    report = {"orjson": orjson is not None}
+
+    with app.test_request_context():
+        for name, payload in payloads.items():
+            entry = {}
+
+            try:
+                entry["flaskDefaultUs"] = _time(
+                    lambda: default_provider.response(payload).get_data(), rounds)
+            except TypeError:
+                # Flask 默认 provider 无法序列化 numpy 类型
+                entry["flaskDefaultUs"] = None
+
+            json_provider.orjson = None
+            entry["stdlibUs"] = _time(
+                lambda: app_provider.response(payload).get_data(), rounds)
+            entry["bytes"] = len(app_provider.response(payload).get_data())
+            json_provider.orjson = orjson
+
+            if orjson is not None:
+                entry["orjsonUs"] = _time(
+                    lambda: app_provider.response(payload).get_data(), rounds)
+
+            if name == "adminSessions":
+                def streamed():
+                    response = stream_json_list(
+                        "sessions", iter(payload["sessions"]), count_key="total",
+                        limit=payload["limit"], offset=payload["offset"])
+                    return b''.join(response.iter_encoded())
+                entry["streamedUs"] = _time(streamed, rounds)
+
+            report[name] = entry
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON序列化基准测试")
+    parser.add_argument('--sessions', type=int, default=1000, help="会话列表长度")
+    parser.add_argument('--rounds', type=int, default=200, help="重复次数")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.sessions, args.rounds), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
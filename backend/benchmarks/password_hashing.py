@@ -0,0 +1,103 @@
+"""
+密码哈希基准测试
+按当前配置的哈希成本，统计经过有界哈希线程池的登录校验吞吐量（次/秒）
+
+用法:
+    python -m benchmarks.password_hashing --threads 8 --duration 10
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+
+from app.utils.password import (PasswordHasherBusy, hash_password,
+                                verify_password_in_pool)
+from config import config
+from flask import Flask
+
+
+def run(threads, duration, env):
+    """
+    模拟并发登录校验
+
+    Args:
+        threads (int): 并发请求线程数
+        duration (float): 测试时长（秒）
+        env (str): 配置名称
+
+    Returns:
+        dict: 测试结果
+    """
+    app = Flask(__name__)
+    app.config.from_object(config[env])
+
+    with app.app_context():
+        stored_hash = hash_password("benchmark-password")
+
+    latencies = []
+    rejected = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        nonlocal rejected
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    ok = verify_password_in_pool(
+                        "benchmark-password", stored_hash)
+                    assert ok
+                except PasswordHasherBusy:
+                    with lock:
+                        rejected += 1
+                    continue
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p):
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(len(latencies) * p))
+        return round(latencies[index] * 1000, 2)
+
+    return {
+        "hash": stored_hash.rsplit('$', 2)[0],
+        "hashWorkers": app.config['PASSWORD_HASH_WORKERS'],
+        "threads": threads,
+        "logins": len(latencies),
+        "rejected": rejected,
+        "loginsPerSecond": round(len(latencies) / wall, 1),
+        "meanMs": round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+        "p50Ms": percentile(0.50),
+        "p95Ms": percentile(0.95),
+        "p99Ms": percentile(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="密码哈希吞吐量基准测试")
+    parser.add_argument('--threads', type=int, default=4, help="并发登录线程数")
+    parser.add_argument('--duration', type=float, default=5, help="测试时长（秒）")
+    parser.add_argument('--env', default='production', help="配置名称")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.threads, args.duration, args.env),
+                     ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+启动耗时与工作进程内存基准测试
+在子进程中以 python -X importtime 创建应用，统计导入耗时最多的模块，
+并对比启动后与首次处理媒体（加载 OpenCV、librosa、numpy）后的内存占用；
+指定 --gunicorn 时分别以预加载和不预加载模式启动 gunicorn，
+报告就绪耗时以及主进程和每个工作进程的 RSS/PSS/USS
+
+用法:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --gunicorn 3
+    python -m benchmarks.startup --gunicorn 3 --pool cpu
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from app.utils.profiler import HEAVY_MODULES, process_memory
+
+# 子进程在 stderr 中输出此标记，区分启动阶段和加载媒体依赖阶段的导入记录
+MEDIA_MARKER = '--- media ---'
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程中执行：创建应用，输出内存占用，再加载媒体分析依赖后输出一次
+_WORKER_SCRIPT = """
+import json, os, sys, time
+MEDIA_MARKER = %r
+started = time.perf_counter()
+from app import create_app
+app = create_app('production')
+startup = time.perf_counter() - started
+from app.utils.profiler import HEAVY_MODULES, process_memory
+report = {
+    'startupSeconds': round(startup, 3),
+    'modules': len(sys.modules),
+    'heavyModulesAtStartup': [m for m in HEAVY_MODULES if m in sys.modules],
+    'memoryAtStartup': process_memory(os.getpid()),
+}
+print(MEDIA_MARKER, file=sys.stderr, flush=True)
+started = time.perf_counter()
+import app.services.video
+import librosa
+import numpy as np
+# 调用音频分析用到的函数，触发 librosa 按需加载的 scipy 等依赖
+y = np.zeros(16000, dtype=np.float32)
+librosa.piptrack(y=y, sr=16000)
+librosa.feature.spectral_centroid(y=y, sr=16000)
+report['mediaImportSeconds'] = round(time.perf_counter() - started, 3)
+report['heavyModulesAfterMedia'] = [m for m in HEAVY_MODULES if m in sys.modules]
+report['memoryAfterMedia'] = process_memory(os.getpid())
+print(json.dumps(report))
+""" % MEDIA_MARKER
+
+
+def _environment(workdir):
+    env = dict(os.environ)
+    env['DATABASE_PATH'] = os.path.join(workdir, 'startup.db')
+    env['TEMP_MEDIA_SWEEP_INTERVAL'] = '0'
+    return env
+
+
+def parse_importtime(lines, top):
+    """解析 -X importtime 的输出，返回总耗时和自身耗时最多的模块"""
+    modules = []
+    total = 0
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # 顶层模块（没有缩进）的累计耗时之和即总导入耗时
+        if not name.startswith('  '):
+            total += int(cumulative_us)
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    modules.sort(key=lambda module: module[1], reverse=True)
+    return {
+        'importSeconds': round(total / 1e6, 3),
+        'topSelfMs': [
+            {'module': name, 'selfMs': round(self_us / 1000, 1),
+             'cumulativeMs': round(cumulative_us / 1000, 1)}
+            for name, self_us, cumulative_us in modules[:top]
+        ],
+    }
+
+
+def measure_worker(top):
+    """在全新的子进程中创建应用并测量导入耗时和内存"""
+    with tempfile.TemporaryDirectory() as workdir:
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _WORKER_SCRIPT],
+            cwd=BACKEND_DIR, env=_environment(workdir),
+            capture_output=True, text=True, check=True
+        )
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    lines = completed.stderr.splitlines()
+    marker = lines.index(MEDIA_MARKER)
+    report['startupImports'] = parse_importtime(lines[:marker], top)
+    report['mediaImports'] = parse_importtime(lines[marker + 1:], top)
+    return report
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _children(pid):
+    """进程的直接子进程（Linux）"""
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # 进程名可能包含空格，从最后一个右括号之后解析
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def measure_gunicorn(workers, requests, extra_args=(), extra_env=None):
+    """启动 gunicorn 并报告主进程和各工作进程的内存"""
+    if shutil.which('gunicorn') is None:
+        return {'skipped': "未安装 gunicorn"}
+
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as workdir:
+        env = _environment(workdir)
+        env['FLASK_DEBUG'] = '0'
+        env.update(extra_env or {})
+        os.makedirs(os.path.join(BACKEND_DIR, 'logs'), exist_ok=True)
+        process = subprocess.Popen(
+            ['gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+             '-b', f"127.0.0.1:{port}", *extra_args, 'run:app'],
+            cwd=BACKEND_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            started = time.perf_counter()
+            ready = None
+            while time.perf_counter() - started < 120:
+                try:
+                    urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+                    ready = time.perf_counter() - started
+                    break
+                except OSError:
+                    time.sleep(0.2)
+            if ready is None:
+                return {'error': "gunicorn 启动超时"}
+
+            # 让请求分散到各个工作进程
+            for _ in range(requests):
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=5).read()
+
+            pids = _children(process.pid)
+            return {
+                'workers': workers,
+                'readySeconds': round(ready, 3),
+                'master': process_memory(process.pid),
+                'workerMemory': [{'pid': pid, **(process_memory(pid) or {})} for pid in pids],
+                'totalPssBytes': sum((process_memory(pid) or {}).get('pssBytes') or 0
+                                     for pid in [process.pid, *pids]),
+            }
+        finally:
+            process.terminate()
+            process.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时与工作进程内存基准测试")
+    parser.add_argument('--top', type=int, default=15, help="列出自身导入耗时最多的模块数")
+    parser.add_argument('--gunicorn', type=int, default=0, help="启动 gunicorn 的工作进程数（0 表示不启动）")
+    parser.add_argument('--requests', type=int, default=50, help="gunicorn 启动后发送的请求数")
+    parser.add_argument('--pool', default='mixed', choices=('mixed', 'io', 'cpu'),
+                        help="gunicorn 工作进程池类型（GUNICORN_POOL）")
+    args = parser.parse_args()
+
+    result = {'heavyModules': list(HEAVY_MODULES), 'worker': measure_worker(args.top)}
+    if args.gunicorn:
+        result['gunicorn'] = {
+            mode: measure_gunicorn(args.gunicorn, args.requests, extra_env={
+                'GUNICORN_POOL': args.pool, 'GUNICORN_PRELOAD': preload})
+            for mode, preload in (('fork', '0'), ('preload', '1'))
+        }
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,55 @@
+import gc
 import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Prometheus 多进程模式：各工作进程把指标写入该目录下的文件，/metrics 汇总所有进程的数据
+# 需在加载应用之前设置，启动时清除上次运行遗留的指标文件
+prometheus_multiproc_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(tempfile.gettempdir(), 'interview_ai_metrics')
+)
+shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+os.makedirs(prometheus_multiproc_dir, exist_ok=True)
 
 # 绑定地址和端口
 bind = '0.0.0.0:5000'
 
-# 工作进程数
-workers = multiprocessing.cpu_count() * 2 + 1
+# 工作进程池类型（GUNICORN_POOL）：
+#   mixed（默认）：所有接口混合部署
+#   io：面向等待大模型和语音服务的接口，进程数等于 CPU 核数、每个进程较多线程
+#   cpu：面向视频和音频分析接口，每个进程单线程，避免分析时争抢 GIL
+# 分开部署时由反向代理把 /multimodal_analysis 转发到 cpu 池
+worker_pool = os.getenv('GUNICORN_POOL', 'mixed')
+_cpus = multiprocessing.cpu_count()
+_pool_sizes = {
+    'mixed': (_cpus * 2 + 1, 4),
+    'io': (_cpus, 16),
+    'cpu': (_cpus, 1),
+}
+if worker_pool not in _pool_sizes:
+    raise ValueError(f"未知的 GUNICORN_POOL: {worker_pool}")
+
+# 工作进程数和每个工作进程的线程数
+workers = int(os.getenv('GUNICORN_WORKERS', _pool_sizes[worker_pool][0]))
+threads = int(os.getenv('GUNICORN_THREADS', _pool_sizes[worker_pool][1]))
+
+# 预加载模式：应用只在主进程中创建和预热一次，工作进程 fork 后通过写时复制共享内存
+# 注意预加载时 kill -HUP 不会重新加载应用代码，更新代码需要重启主进程
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() in ('true', '1', 't')
 
-# 每个工作进程的线程数
-threads = 4
+# 是否在主进程中预加载媒体分析依赖（OpenCV 分类器、librosa），cpu 池默认开启
+preload_media = os.getenv(
+    'PRELOAD_MEDIA', str(worker_pool == 'cpu')
+).lower() in ('true', '1', 't')
 
-# 请求超时时间
+if preload_app:
+    # 加载应用期间暂停垃圾回收，避免回收后留下的内存空洞被之后的分配填充，破坏页共享
+    gc.disable()
+
+# 请求超时时间（单线程的 cpu 池使用同步工作进程，视频分析期间无法发送心跳）
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 300 if threads == 1 else 30))
 keepalive = 2
 graceful_timeout = 120
 
@@ -22,3 +62,31 @@ loglevel = 'info'
 
 # 是否启用守护进程模式
 daemon = False
+
+
+def when_ready(server):
+    """预加载模式下在 fork 工作进程之前预热只读状态并冻结堆"""
+    if not preload_app:
+        return
+    from app.utils.preload import freeze_heap, warm_app
+
+    warm_app(server.app.wsgi(), media=preload_media, detectors=threads)
+    freeze_heap()
+
+
+def post_fork(server, worker):
+    """工作进程 fork 后重建从主进程继承的数据库连接和锁"""
+    if not preload_app:
+        return
+    from app.utils.preload import after_fork
+
+    after_fork(server.app.wsgi())
+
+
+def child_exit(server, worker):
+    """工作进程退出时清理其进程级指标（如正在处理的请求数）"""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
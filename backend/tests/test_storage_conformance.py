@@ -0,0 +1,186 @@
+"""
+存储后端一致性测试
+对 SQLite 和 PostgreSQL 后端运行同一组测试，保证模型层的 SQL 在两个后端上行为一致
+
+设置 TEST_DATABASE_URL 并安装 psycopg2-binary 后才会测试 PostgreSQL，
+每次测试在独立的 schema 中进行，结束后删除
+"""
+
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+from app.models.interview import (InterviewQuestion, InterviewSession,
+                                  MultimodalAnalysis)
+from app.utils.db import close_db, init_db, init_storage, transaction
+from config import Config
+from flask import Flask
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+
+def _postgres_schema():
+    """创建独立的 schema，返回 (连接串, 清理函数)"""
+    psycopg2 = pytest.importorskip('psycopg2')
+    from psycopg2.extensions import make_dsn
+
+    schema = f"conformance_{uuid.uuid4().hex[:12]}"
+    admin = psycopg2.connect(TEST_DATABASE_URL)
+    admin.autocommit = True
+    with admin.cursor() as cursor:
+        cursor.execute(f"CREATE SCHEMA {schema}")
+
+    def drop():
+        with admin.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA {schema} CASCADE")
+        admin.close()
+
+    return make_dsn(TEST_DATABASE_URL, options=f"-c search_path={schema}"), drop
+
+
+@pytest.fixture(params=[
+    'sqlite',
+    pytest.param('postgres', marks=pytest.mark.skipif(
+        not TEST_DATABASE_URL, reason="未设置 TEST_DATABASE_URL")),
+])
+def app(request, tmp_path):
+    app = Flask(__name__)
+    app.config.from_object(Config)
+
+    cleanup = None
+    if request.param == 'sqlite':
+        app.config.update(DATABASE_BACKEND='sqlite', DATABASE=str(tmp_path / 'test.db'))
+    else:
+        dsn, cleanup = _postgres_schema()
+        app.config.update(DATABASE_BACKEND='postgres', DATABASE_URL=dsn)
+
+    init_storage(app)
+    app.teardown_appcontext(close_db)
+    with app.app_context():
+        init_db()
+        yield app
+
+    app.extensions['storage'].dispose()
+    if cleanup:
+        cleanup()
+
+
+@pytest.fixture
+def db(app):
+    connection = app.extensions['storage'].connect()
+    cursor = connection.cursor()
+    cursor.execute("CREATE TABLE conformance (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                   "name TEXT UNIQUE, payload BLOB, created_at TIMESTAMP, hits INTEGER DEFAULT 0)")
+    connection.commit()
+    yield connection
+    connection.close()
+
+
+def test_init_db_is_idempotent(app):
+    init_db()
+    init_db()
+
+
+def test_lastrowid_is_autoincrement_id(db):
+    cursor = db.cursor()
+    first = cursor.execute("INSERT INTO conformance (name) VALUES (?)", ('a',)).lastrowid
+    second = cursor.execute("INSERT INTO conformance (name) VALUES (?)", ('b',)).lastrowid
+    assert second == first + 1
+
+
+def test_quoted_literals_are_not_rewritten(db):
+    cursor = db.cursor()
+    cursor.execute("INSERT INTO conformance (name) VALUES ('what? 100%')")
+    cursor.execute(
+        "SELECT name, 'it''s ?' AS quoted FROM conformance WHERE name = 'what? 100%' AND id > ?",
+        (0,)
+    )
+    row = cursor.fetchone()
+    assert row['name'] == 'what? 100%'
+    assert row['quoted'] == "it's ?"
+
+
+def test_percent_in_like_pattern(db):
+    cursor = db.cursor()
+    cursor.executemany("INSERT INTO conformance (name) VALUES (?)", [('50%',), ('500',)])
+    cursor.execute("SELECT name FROM conformance WHERE name LIKE '%\\%' ESCAPE '\\'")
+    assert [row['name'] for row in cursor.fetchall()] == ['50%']
+
+
+def test_blob_round_trip(db):
+    payload = bytes(range(256))
+    cursor = db.cursor()
+    cursor.execute("INSERT INTO conformance (name, payload) VALUES (?, ?)", ('blob', payload))
+    cursor.execute("SELECT payload FROM conformance WHERE name = ?", ('blob',))
+    assert bytes(cursor.fetchone()['payload']) == payload
+
+
+def test_timestamp_reads_back_as_iso_string(db):
+    now = datetime(2025, 4, 1, 12, 30, 45, 123456)
+    cursor = db.cursor()
+    cursor.execute("INSERT INTO conformance (name, created_at) VALUES (?, ?)", ('ts', now))
+    cursor.execute("SELECT created_at FROM conformance WHERE name = ?", ('ts',))
+    assert datetime.fromisoformat(cursor.fetchone()['created_at']) == now
+
+
+def test_upsert(db):
+    sql = """
+    INSERT INTO conformance (name, hits) VALUES (?, 1)
+    ON CONFLICT (name) DO UPDATE SET hits = conformance.hits + 1
+    """
+    cursor = db.cursor()
+    cursor.execute(sql, ('a',))
+    cursor.execute(sql, ('a',))
+    cursor.execute("SELECT hits FROM conformance WHERE name = ?", ('a',))
+    assert cursor.fetchone()['hits'] == 2
+
+
+def test_rowcount(db):
+    cursor = db.cursor()
+    cursor.executemany("INSERT INTO conformance (name) VALUES (?)", [('a',), ('b',), ('c',)])
+    assert cursor.execute("DELETE FROM conformance WHERE name <> ?", ('a',)).rowcount == 2
+
+
+def test_uncommitted_changes_are_discarded_on_close(app, db):
+    db.cursor().execute("INSERT INTO conformance (name) VALUES (?)", ('pending',))
+    db.close()
+
+    connection = app.extensions['storage'].connect()
+    cursor = connection.execute("SELECT COUNT(*) AS total FROM conformance")
+    assert cursor.fetchone()['total'] == 0
+    connection.close()
+
+
+def test_ensure_column_adds_once(app, db):
+    storage = app.extensions['storage']
+    cursor = db.cursor()
+    storage.ensure_column(cursor, 'conformance', 'extra', 'INTEGER NOT NULL DEFAULT 0')
+    storage.ensure_column(cursor, 'conformance', 'extra', 'INTEGER NOT NULL DEFAULT 0')
+    assert storage.column_exists(cursor, 'conformance', 'extra')
+    assert not storage.column_exists(cursor, 'conformance', 'missing')
+
+
+def test_transaction_rolls_back_on_error(app):
+    session_id = InterviewSession.create('开发', '中等')
+    with pytest.raises(RuntimeError):
+        with transaction():
+            InterviewQuestion.create(session_id, '问题一', 0)
+            raise RuntimeError
+    assert InterviewQuestion.count_for_session(session_id) == 0
+
+    with transaction():
+        InterviewQuestion.create(session_id, '问题一', 0)
+        InterviewQuestion.create(session_id, '问题二', 1)
+    assert InterviewQuestion.count_for_session(session_id) == 2
+
+
+def test_multimodal_aggregates(app):
+    session_id = InterviewSession.create('开发', '中等')
+    MultimodalAnalysis.create_or_update(session_id, {'eyeContact': 6, 'confidence': 8})
+    MultimodalAnalysis.create_or_update(session_id, {'eyeContact': 8, 'confidence': 4})
+
+    video, audio = MultimodalAnalysis.aggregate_for_session(session_id)
+    assert video['eyeContact'] == pytest.approx(8)
+    assert video['confidence'] == pytest.approx(4)
+    assert audio == {}